@@ -1,7 +1,15 @@
+import threading
+import time
 from bson import ObjectId
 from utils.db import getMongoDbClient
 from datetime import datetime
 
+USER_CACHE_TTL = 60  # 초. 토큰 재발급 시 사용자 조회를 줄이기 위한 워커별 캐시
+USER_CACHE_MAX_ENTRIES = 10000
+
+_user_cache = {}  # user_id(str) -> (user, cached_at)
+_user_cache_lock = threading.Lock()
+
 # 사용자 collection 가져온다
 def get_user_collection():
     db = getMongoDbClient()
@@ -23,6 +31,28 @@ def get_user_by_id(id):
     user = users_collection.find_one({ "_id" : ObjectId(id) })
     return user
 
+# DB 에서 사용자 조회 (USER_CACHE_TTL 동안 캐싱)
+def get_user_by_id_cached(id):
+    key = str(id)
+    now = time.monotonic()
+
+    cached = _user_cache.get(key)
+    if cached and now - cached[1] < USER_CACHE_TTL:
+        return cached[0]
+
+    user = get_user_by_id(key)
+    if user:
+        with _user_cache_lock:
+            if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+                _user_cache.clear()
+            _user_cache[key] = (user, now)
+    return user
+
+# 사용자 정보 변경 시 캐시 제거
+def invalidate_user_cache(id):
+    with _user_cache_lock:
+        _user_cache.pop(str(id), None)
+
 # 사용자 마지막 로그인 시간 업데이트
 def update_user_last_login(objectId, name):
     users_collection = get_user_collection()
@@ -31,6 +61,7 @@ def update_user_last_login(objectId, name):
                      "last_login_at" : datetime.now()}
     update_result = users_collection.update_one({ "_id" : objectId}, 
                                                 { "$set": last_login_at })
+    invalidate_user_cache(objectId)
 
     return str(objectId) if update_result.modified_count > 0 else None
 
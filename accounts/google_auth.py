@@ -1,19 +1,106 @@
 # Google ID Token 검증 및 사용자 생성/조회 유틸리티.
+import json
+import re
+import threading
+import time
+
+import jwt
 import requests
 from django.conf import settings
 from .db import get_user_by_email, update_user_last_login, insert_user
 
 GOOGLE_TOKEN_INFO_URL = 'https://oauth2.googleapis.com/tokeninfo'
+GOOGLE_JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
 LOGIN_PROVIDER = 'google'
 
-def verify_google_id_token(id_token: str) -> dict:
+JWKS_DEFAULT_MAX_AGE = 3600  # Cache-Control 헤더가 없을 때 공개키 캐시 시간(초)
+JWKS_MIN_REFETCH_INTERVAL = 60  # 모르는 kid가 와도 이 간격 안에서는 다시 받지 않음 (위조 토큰으로 인한 반복 요청 방지)
+CLOCK_SKEW_SECONDS = 30
+
+# kid -> PyJWK, expires_at: 캐시 만료 시각(monotonic), fetched_at: 마지막 조회 시각
+_jwks_cache = {"keys": {}, "expires_at": 0.0, "fetched_at": 0.0}
+_jwks_lock = threading.Lock()
+
+
+def _parse_max_age(cache_control: str) -> int:
+    match = re.search(r'max-age=(\d+)', cache_control or '')
+    return int(match.group(1)) if match else JWKS_DEFAULT_MAX_AGE
+
+
+def _load_jwks():
+    """
+    공개키 목록과 캐시 시간 반환. GOOGLE_JWKS_FILE이 있으면 파일에서 읽음
     """
-    Google ID Token을 Google 서버에 검증 요청.
-    성공 시 payload dict 반환, 실패 시 GoogleAuthError 발생.
+    jwks_file = getattr(settings, 'GOOGLE_JWKS_FILE', None)
+    if jwks_file:
+        with open(jwks_file, encoding='utf-8') as f:
+            return json.load(f), JWKS_DEFAULT_MAX_AGE
 
-    payload 주요 필드:
-        sub, email, email_verified, name, given_name, family_name, picture
+    response = requests.get(GOOGLE_JWKS_URL, timeout=5)
+    response.raise_for_status()
+    return response.json(), _parse_max_age(response.headers.get('Cache-Control'))
+
+
+def _refresh_jwks(force=False):
+    now = time.monotonic()
+    with _jwks_lock:
+        if not force and _jwks_cache["keys"] and now < _jwks_cache["expires_at"]:
+            return
+        if force and now - _jwks_cache["fetched_at"] < JWKS_MIN_REFETCH_INTERVAL:
+            return
+
+        _jwks_cache["fetched_at"] = now
+        try:
+            jwks, max_age = _load_jwks()
+            keys = {}
+            for jwk in jwks.get('keys', []):
+                if jwk.get('kid'):
+                    keys[jwk['kid']] = jwt.PyJWK(jwk)
+        except Exception as e:
+            # 키를 못 받아도 기존 키가 있으면 계속 사용
+            print(f"[google_auth] jwks load exception {e}")
+            return
+
+        if keys:
+            _jwks_cache["keys"] = keys
+            _jwks_cache["expires_at"] = now + max_age
+
+
+def _get_signing_key(kid):
     """
+    kid에 해당하는 공개키, 키를 구할 수 없으면 None
+    """
+    _refresh_jwks()
+    key = _jwks_cache["keys"].get(kid)
+    if key is None:
+        # 키 교체(rotation) 직후일 수 있으므로 한 번 다시 조회
+        _refresh_jwks(force=True)
+        key = _jwks_cache["keys"].get(kid)
+    return key
+
+
+def _verify_locally(id_token: str, signing_key) -> dict:
+    try:
+        payload = jwt.decode(
+            id_token,
+            signing_key,
+            algorithms=['RS256'],
+            audience=settings.GOOGLE_CLIENT_ID,
+            leeway=CLOCK_SKEW_SECONDS,
+        )
+    except jwt.InvalidAudienceError:
+        raise ValueError('Token audience가 일치하지 않습니다.')
+    except jwt.InvalidTokenError:
+        raise ValueError('유효하지 않은 Google ID Token입니다.')
+
+    if payload.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError('유효하지 않은 Google ID Token입니다.')
+
+    return payload
+
+
+def _verify_with_tokeninfo(id_token: str) -> dict:
     try:
         response = requests.get(
             GOOGLE_TOKEN_INFO_URL,
@@ -34,6 +121,30 @@ def verify_google_id_token(id_token: str) -> dict:
 
     return payload
 
+
+def verify_google_id_token(id_token: str) -> dict:
+    """
+    Google ID Token 검증.
+    캐시된 Google 공개키(JWKS)로 로컬에서 서명을 검증하고, 키를 구할 수 없을 때만 tokeninfo 엔드포인트 사용.
+    성공 시 payload dict 반환, 실패 시 ValueError 발생.
+
+    payload 주요 필드:
+        sub, email, email_verified, name, given_name, family_name, picture
+    """
+    try:
+        header = jwt.get_unverified_header(id_token or '')
+    except jwt.InvalidTokenError:
+        raise ValueError('유효하지 않은 Google ID Token입니다.')
+
+    signing_key = _get_signing_key(header.get('kid'))
+    if signing_key is None:
+        if _jwks_cache["keys"]:
+            # 키 목록은 있는데 해당 kid만 없으면 위조/폐기된 토큰
+            raise ValueError('유효하지 않은 Google ID Token입니다.')
+        return _verify_with_tokeninfo(id_token)
+
+    return _verify_locally(id_token, signing_key)
+
 def get_or_create_user_from_google(payload: dict) -> dict:
     """
     Google payload로 User를 조회하거나 신규 생성.
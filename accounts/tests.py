@@ -1,3 +1,105 @@
-from django.test import TestCase
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.test import SimpleTestCase, override_settings
+
+from accounts import google_auth
+
+TESTDATA_DIR = Path(__file__).resolve().parent / "testdata"
+# 테스트 전용 RSA 키와 그 공개키 JWKS (kid: test-key-1)
+TEST_JWKS_FILE = str(TESTDATA_DIR / "google_jwks.json")
+TEST_PRIVATE_KEY = (TESTDATA_DIR / "google_test_key.pem").read_text()
+TEST_KID = "test-key-1"
+TEST_CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+def make_id_token(kid=TEST_KID, aud=TEST_CLIENT_ID, iss="https://accounts.google.com", **claims):
+    now = datetime.now(tz=timezone.utc)
+    payload = {
+        "iss": iss,
+        "aud": aud,
+        "sub": "1234567890",
+        "email": "tester@example.com",
+        "email_verified": True,
+        "name": "테스터",
+        "iat": now,
+        "exp": now + timedelta(hours=1),
+        **claims,
+    }
+    return jwt.encode(payload, TEST_PRIVATE_KEY, algorithm="RS256", headers={"kid": kid})
+
+
+@override_settings(GOOGLE_JWKS_FILE=TEST_JWKS_FILE, GOOGLE_CLIENT_ID=TEST_CLIENT_ID)
+class GoogleIdTokenTests(SimpleTestCase):
+    """
+    Google ID Token 검증: 로컬 JWKS 검증, 모르는 kid 재조회 제한, 키가 없을 때 tokeninfo 대체
+    네트워크 없이 testdata의 키 세트 사용
+    """
+
+    def setUp(self):
+        google_auth._jwks_cache.update({"keys": {}, "expires_at": 0.0, "fetched_at": 0.0})
+        self.addCleanup(google_auth._jwks_cache.update, {"keys": {}, "expires_at": 0.0, "fetched_at": 0.0})
+
+        # JWKS 캐시 시각만 고정 값으로 진행 (토큰 exp 검증은 실제 시각 사용)
+        self.now = 1000.0
+        clock = SimpleNamespace(monotonic=lambda: self.now, time=time.time)
+        patcher = mock.patch.object(google_auth, "time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.load_jwks = mock.patch.object(google_auth, "_load_jwks", wraps=google_auth._load_jwks).start()
+        self.requests_get = mock.patch.object(google_auth.requests, "get").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_verifies_locally_with_cached_keys(self):
+        payload = google_auth.verify_google_id_token(make_id_token())
+        self.assertEqual(payload["email"], "tester@example.com")
+
+        google_auth.verify_google_id_token(make_id_token())
+        self.assertEqual(self.load_jwks.call_count, 1)
+        self.requests_get.assert_not_called()
+
+    def test_rejects_wrong_audience(self):
+        with self.assertRaises(ValueError):
+            google_auth.verify_google_id_token(make_id_token(aud="other-client"))
+
+    def test_unknown_kid_forces_one_rate_limited_refetch(self):
+        google_auth.verify_google_id_token(make_id_token())
+        self.assertEqual(self.load_jwks.call_count, 1)
+
+        # 모르는 kid: 캐시가 유효해도 한 번 강제 재조회, 그래도 없으면 거절
+        self.now += google_auth.JWKS_MIN_REFETCH_INTERVAL
+        with self.assertRaises(ValueError):
+            google_auth.verify_google_id_token(make_id_token(kid="unknown-kid"))
+        self.assertEqual(self.load_jwks.call_count, 2)
+
+        # JWKS_MIN_REFETCH_INTERVAL 안에서는 다시 받지 않음
+        self.now += google_auth.JWKS_MIN_REFETCH_INTERVAL - 1
+        with self.assertRaises(ValueError):
+            google_auth.verify_google_id_token(make_id_token(kid="unknown-kid"))
+        self.assertEqual(self.load_jwks.call_count, 2)
+
+        self.now += 1
+        with self.assertRaises(ValueError):
+            google_auth.verify_google_id_token(make_id_token(kid="unknown-kid"))
+        self.assertEqual(self.load_jwks.call_count, 3)
+        self.requests_get.assert_not_called()
+
+    @override_settings(GOOGLE_JWKS_FILE=str(TESTDATA_DIR / "missing_jwks.json"))
+    def test_falls_back_to_tokeninfo_without_keys(self):
+        token = make_id_token()
+        self.requests_get.return_value = mock.Mock(
+            status_code=200,
+            json=mock.Mock(return_value={"aud": TEST_CLIENT_ID, "email": "tester@example.com", "name": "테스터"}),
+        )
+
+        payload = google_auth.verify_google_id_token(token)
+
+        self.assertEqual(payload["email"], "tester@example.com")
+        self.requests_get.assert_called_once_with(
+            google_auth.GOOGLE_TOKEN_INFO_URL, params={"id_token": token}, timeout=5,
+        )
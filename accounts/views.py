@@ -76,4 +76,6 @@ def me(request):
     GET /api/auth/me/
     Header: Authorization: Bearer <Access Token>
     """
-    return json_response(request.jwt_user, status=200)
+    if not request.jwt_user:
+        return error_response("로그인이 필요합니다.", status=401)
+    return json_response(dict(request.jwt_user), status=200)
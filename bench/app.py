@@ -0,0 +1,29 @@
+"""
+벤치마크용 앱 엔트리포인트
+- 외부 서비스 가짜 클라이언트와 Mongo 백엔드를 설치한 뒤 Django 앱을 로드하고, 정책이 없으면 합성 데이터 저장
+- mongomock은 프로세스 내 저장소이므로 워커 1개로 실행 (bench.run이 자동으로 띄움)
+
+    uvicorn bench.app:application --port 8765             # ASGI
+    gunicorn --workers 1 bench.app:wsgi_application        # WSGI
+"""
+import os
+
+from bench import fakes, mongo
+
+fakes.install()
+mongo.install()
+os.environ["DJANGO_SETTINGS_MODULE"] = "bench.settings"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+
+from bench import seed  # noqa: E402
+
+seed.ensure_seeded()
+
+application = get_asgi_application()
+wsgi_application = get_wsgi_application()
@@ -0,0 +1,260 @@
+"""
+벤치마크용 외부 서비스 가짜 클라이언트 (Gemini / OpenAI / Tavily / S3)
+- 네트워크 호출 없이 입력에 대해 항상 같은 결과를 반환 (결정적)
+- 제공자별 지연시간을 환경 변수로 설정 (BENCH_<PROVIDER>_LATENCY_MS)
+- 임베딩은 글자 bigram 해시 벡터 + 공통 성분으로 생성해 같은 단어를 공유하는 텍스트끼리 점수가 높게 나옴
+- install()은 앱 모듈을 import하기 전에 호출해야 함 (모듈 로드 시점에 만드는 클라이언트까지 교체)
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+EMBED_DIM = 3072
+# 모든 임베딩이 공유하는 성분 비율. 실제 Gemini 임베딩처럼 무관한 문서끼리도 코사인 유사도가 이 값 근처로 나옴
+EMBED_BASELINE = float(os.getenv("BENCH_EMBED_BASELINE", "0.7"))
+
+LATENCY_MS = {
+    "gemini": float(os.getenv("BENCH_GEMINI_LATENCY_MS", "400")),
+    "gemini_embed": float(os.getenv("BENCH_GEMINI_EMBED_LATENCY_MS", "80")),
+    "openai": float(os.getenv("BENCH_OPENAI_LATENCY_MS", "600")),
+    "openai_embed": float(os.getenv("BENCH_OPENAI_EMBED_LATENCY_MS", "80")),
+    "tavily": float(os.getenv("BENCH_TAVILY_LATENCY_MS", "300")),
+    "s3": float(os.getenv("BENCH_S3_LATENCY_MS", "50")),
+}
+
+_calls = {name: 0 for name in LATENCY_MS if name != "tavily"}  # Tavily는 FakeTavilyClient.calls로 집계
+
+
+def _sleep(kind):
+    _calls[kind] += 1
+    if LATENCY_MS[kind]:
+        time.sleep(LATENCY_MS[kind] / 1000)
+
+
+async def _asleep(kind):
+    _calls[kind] += 1
+    if LATENCY_MS[kind]:
+        await asyncio.sleep(LATENCY_MS[kind] / 1000)
+
+
+def fake_embedding(text, dim=EMBED_DIM):
+    """
+    결정적 임베딩: 공백을 제거한 글자 bigram을 해시 버킷에 모은 뒤 정규화하고 공통 성분(0번 차원)을 더함
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    compact = "".join(str(text or "").split())
+    for i in range(len(compact) - 1):
+        vec[1 + zlib.crc32(compact[i:i + 2].encode("utf-8")) % (dim - 1)] += 1.0
+
+    norm = np.linalg.norm(vec)
+    if norm:
+        vec *= math.sqrt(1 - EMBED_BASELINE) / norm
+    vec[0] = math.sqrt(EMBED_BASELINE) if norm else 1.0
+    return vec.tolist()
+
+
+def _seed_of(*parts):
+    raw = json.dumps(parts, ensure_ascii=False, default=str)
+    return int(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:8], 16)
+
+
+# ============================================================================
+# Gemini (google.genai / google.generativeai)
+# ============================================================================
+
+def _gemini_text(contents, config=None):
+    seed = _seed_of(contents)
+    if getattr(config, "response_mime_type", None) == "application/json":
+        # 요약(items) / 시뮬레이션(questions) / 서류 입력칸(fields) 응답 형식을 모두 포함
+        items = [
+            {"type": "condition", "text": f"벤치마크 조건 {seed % 97}"},
+            {"type": "exclusion", "text": f"벤치마크 제외 대상 {seed % 89}"},
+        ]
+        return json.dumps({
+            "items": items,
+            "questions": [{**item, "question": f"{item['text']}에 해당하시나요?"} for item in items],
+            "fields": [{"id": f"field_{seed % 13}", "label": "신청 동기", "questions": ["지원 동기를 적어주세요."]}],
+        }, ensure_ascii=False)
+    return f"벤치마크용 가짜 응답입니다. (#{seed % 10000})"
+
+
+class _FakeGeminiModels:
+    def generate_content(self, model=None, contents=None, config=None, **kwargs):
+        _sleep("gemini")
+        return SimpleNamespace(text=_gemini_text(contents, config))
+
+    def embed_content(self, model=None, contents=None, config=None, **kwargs):
+        _sleep("gemini_embed")
+        texts = contents if isinstance(contents, list) else [contents]
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=fake_embedding(t)) for t in texts])
+
+
+class _FakeGeminiAsyncModels:
+    async def generate_content(self, model=None, contents=None, config=None, **kwargs):
+        await _asleep("gemini")
+        return SimpleNamespace(text=_gemini_text(contents, config))
+
+    async def embed_content(self, model=None, contents=None, config=None, **kwargs):
+        await _asleep("gemini_embed")
+        texts = contents if isinstance(contents, list) else [contents]
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=fake_embedding(t)) for t in texts])
+
+
+class FakeGeminiClient:
+    """google.genai.Client 대체"""
+    def __init__(self, *args, **kwargs):
+        self.models = _FakeGeminiModels()
+        self.aio = SimpleNamespace(models=_FakeGeminiAsyncModels())
+
+
+class FakeGenerativeModel:
+    """google.generativeai.GenerativeModel 대체"""
+    def __init__(self, model_name=None, *args, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents, *args, **kwargs):
+        _sleep("gemini")
+        return SimpleNamespace(text=_gemini_text(contents, kwargs.get("generation_config")))
+
+
+def fake_legacy_embed_content(model=None, content=None, **kwargs):
+    """google.generativeai.embed_content 대체 (문자열이면 벡터 하나, 리스트면 벡터 리스트)"""
+    _sleep("gemini_embed")
+    dim = kwargs.get("output_dimensionality") or EMBED_DIM
+    if isinstance(content, list):
+        return {"embedding": [fake_embedding(t, dim) for t in content]}
+    return {"embedding": fake_embedding(content, dim)}
+
+
+# ============================================================================
+# OpenAI
+# ============================================================================
+
+def _openai_content(messages, response_format=None, max_tokens=None):
+    last = (messages or [{}])[-1].get("content", "")
+    if (response_format or {}).get("type") == "json_object":
+        return json.dumps({"is_policy": True, "regions": "전국", "search_keyword": last}, ensure_ascii=False)
+    if max_tokens is not None and max_tokens <= 5:
+        return "YES"
+    return f"벤치마크용 가짜 답변입니다. (#{_seed_of(messages) % 10000})"
+
+
+def _completion(messages, response_format=None, max_tokens=None):
+    content = _openai_content(messages, response_format, max_tokens)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _embedding_response(input):
+    texts = input if isinstance(input, list) else [input]
+    return SimpleNamespace(data=[SimpleNamespace(embedding=fake_embedding(t)) for t in texts])
+
+
+class _FakeCompletions:
+    def create(self, model=None, messages=None, response_format=None, max_tokens=None, **kwargs):
+        _sleep("openai")
+        return _completion(messages, response_format, max_tokens)
+
+
+class _FakeEmbeddings:
+    def create(self, input=None, model=None, **kwargs):
+        _sleep("openai_embed")
+        return _embedding_response(input)
+
+
+class _FakeAsyncCompletions:
+    async def create(self, model=None, messages=None, response_format=None, max_tokens=None, **kwargs):
+        await _asleep("openai")
+        return _completion(messages, response_format, max_tokens)
+
+
+class _FakeAsyncEmbeddings:
+    async def create(self, input=None, model=None, **kwargs):
+        await _asleep("openai_embed")
+        return _embedding_response(input)
+
+
+class FakeOpenAI:
+    """openai.OpenAI 대체"""
+    def __init__(self, *args, **kwargs):
+        self.chat = SimpleNamespace(completions=_FakeCompletions())
+        self.embeddings = _FakeEmbeddings()
+
+
+class FakeAsyncOpenAI:
+    """openai.AsyncOpenAI 대체"""
+    def __init__(self, *args, **kwargs):
+        self.chat = SimpleNamespace(completions=_FakeAsyncCompletions())
+        self.embeddings = _FakeAsyncEmbeddings()
+
+
+# ============================================================================
+# S3
+# ============================================================================
+
+class FakeS3Client:
+    """boto3 S3 클라이언트 대체 (메모리에 보관)"""
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, **kwargs):
+        _sleep("s3")
+        self.objects[(bucket, key)] = fileobj.read()
+
+    def put_object(self, Bucket=None, Key=None, Body=b"", **kwargs):
+        _sleep("s3")
+        self.objects[(Bucket, Key)] = Body
+        return {"ETag": hashlib.md5(Body if isinstance(Body, bytes) else str(Body).encode()).hexdigest()}
+
+    def generate_presigned_url(self, ClientMethod=None, Params=None, ExpiresIn=3600, **kwargs):
+        params = Params or {}
+        return f"https://{params.get('Bucket')}.s3.fake.local/{params.get('Key')}?expires={ExpiresIn}"
+
+
+_s3_client = FakeS3Client()
+
+
+def fake_boto3_client(service_name, *args, **kwargs):
+    if service_name != "s3":
+        raise ValueError(f"벤치마크에서 지원하지 않는 AWS 서비스입니다: {service_name}")
+    return _s3_client
+
+
+# ============================================================================
+# 설치
+# ============================================================================
+
+def install():
+    """
+    외부 SDK 진입점을 가짜로 교체. 앱 모듈 import 전에 호출
+    """
+    import boto3
+    import google.generativeai as legacy_genai
+    import openai
+    from google import genai
+
+    genai.Client = FakeGeminiClient
+    legacy_genai.configure = lambda *args, **kwargs: None
+    legacy_genai.embed_content = fake_legacy_embed_content
+    legacy_genai.GenerativeModel = FakeGenerativeModel
+    openai.OpenAI = FakeOpenAI
+    openai.AsyncOpenAI = FakeAsyncOpenAI
+    boto3.client = fake_boto3_client
+
+    # Tavily는 앱에 내장된 FakeTavilyClient 사용
+    os.environ["TAVILY_FAKE"] = "1"
+    os.environ["TAVILY_FAKE_LATENCY"] = str(LATENCY_MS["tavily"] / 1000)
+
+    # 키가 없으면 클라이언트를 만들지 않는 코드 경로가 있으므로 더미 키 지정 (실제 .env 키로 호출되지 않도록 덮어씀)
+    for key in ("GEMINI_API_KEY", "OPENAI_API_KEY", "TAVILY_API_KEY"):
+        os.environ[key] = "bench-fake-key"
+
+
+def get_stats():
+    return {"latency_ms": dict(LATENCY_MS), "calls": dict(_calls)}
@@ -0,0 +1,132 @@
+"""
+동시 요청 처리량 측정 스크립트 (표준 라이브러리만 사용)
+
+같은 엔드포인트에 동시성 단계별로 closed-loop 부하를 주고 처리량과 지연시간 분위수를 출력한다.
+WSGI/ASGI 모드를 각각 워커 1개로 띄워 비교하면 워커당 동시 처리 능력을 확인할 수 있다.
+ASGI에서도 동기 전용 미들웨어(WhiteNoise)는 요청마다 sync 어댑터를 거치므로 결과 해석 시 감안한다.
+
+    # WSGI (기존)
+    gunicorn --bind 0.0.0.0:8000 --workers 1 config.wsgi:application
+    # ASGI
+    gunicorn --bind 0.0.0.0:8001 --workers 1 -k uvicorn_worker.UvicornWorker config.asgi:application
+
+    python -m bench.load_test --base-url http://localhost:8000 --path "/api/policy-summary/?id=<policy_id>" \\
+        --concurrency 1,8,32 --duration 20
+    python -m bench.load_test --base-url http://localhost:8001 --path /chat/api/chat_response --method POST \\
+        --data '{"message": "대전 청년 월세 지원"}' --concurrency 1,8,32
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def _request_once(url, method, body, headers, timeout):
+    data = body.encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as res:
+            res.read()
+            ok = 200 <= res.status < 400
+    except urllib.error.HTTPError as e:
+        ok = False
+        e.read()
+    except Exception:
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def run_load(url, concurrency, duration, method="GET", body=None, headers=None, timeout=60.0):
+    """
+    concurrency 개 클라이언트가 duration 초 동안 응답을 받는 즉시 다음 요청을 보냄
+    url/body에 리스트를 주면 요청마다 순서대로 돌아가며 사용 (캐시만 측정하지 않도록 입력 다양화)
+    반환: {"requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+    """
+    headers = headers or {}
+    urls = list(url) if isinstance(url, (list, tuple)) else [url]
+    bodies = list(body) if isinstance(body, (list, tuple)) else [body]
+    if bodies[0] is not None:
+        headers.setdefault("Content-Type", "application/json")
+    sequence = itertools.count()
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def _client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            n = next(sequence)
+            elapsed, ok = _request_once(urls[n % len(urls)], method, bodies[n % len(bodies)], headers, timeout)
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(_client)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def format_row(label, concurrency, stats):
+    return (f"{label:<40} c={concurrency:<4} req={stats['requests']:<6} err={stats['errors']:<4} "
+            f"rps={stats['rps']:<8} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엔드포인트 동시 요청 처리량 측정")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", required=True, help="측정할 경로 (여러 번 지정 가능)")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--data", default=None, help="요청 바디 (JSON 문자열)")
+    parser.add_argument("--header", action="append", default=[], help="'Name: value' 형식 (예: 세션 쿠키)")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="쉼표로 구분한 동시성 단계")
+    parser.add_argument("--duration", type=float, default=15.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    headers = dict(h.split(":", 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    results = []
+    for path in args.path:
+        url = args.base_url.rstrip("/") + path
+        for concurrency in levels:
+            stats = run_load(url, concurrency, args.duration, args.method.upper(), args.data, dict(headers))
+            results.append({"path": path, "concurrency": concurrency, **stats})
+            if not args.json:
+                print(format_row(path, concurrency, stats), flush=True)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+벤치마크용 MongoDB 백엔드
+- BENCH_MONGODB_URI가 없으면 프로세스 내 mongomock 사용 (모든 MongoClient가 같은 저장소를 공유)
+- 있으면 로컬 mongod 사용 (실제 Atlas 클러스터 보호를 위해 localhost만 허용)
+- Atlas 전용 $vectorSearch 단계는 numpy로 에뮬레이션하고 나머지 파이프라인은 백엔드에서 그대로 실행
+"""
+import os
+import threading
+import uuid
+from urllib.parse import urlparse
+
+import numpy as np
+import pymongo
+from mongomock.filtering import filter_applies
+from pymongo.collection import Collection
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+SCORE_FIELD = "_vs_score"
+# mongomock에 없는 연산자 -> 같은 결과를 내는 연산자 (mongomock의 $substr는 바이트가 아니라 글자 단위)
+MONGOMOCK_OPERATOR_ALIASES = {"$substrCP": "$substr"}
+
+_vector_cache = {}  # (collection full_name, path) -> {"count", "docs", "matrix"}
+_vector_lock = threading.Lock()
+
+
+def get_uri():
+    return os.getenv("BENCH_MONGODB_URI", "").strip()
+
+
+def is_local_uri(uri):
+    if uri.startswith("mongodb+srv://"):
+        return False
+    host = urlparse(uri).hostname or ""
+    return host in LOCAL_HOSTS
+
+
+def install():
+    """
+    Mongo 백엔드 선택 + $vectorSearch 에뮬레이션 설치. 앱 모듈 import 전에 호출
+    """
+    uri = get_uri()
+    if uri:
+        if not is_local_uri(uri) and os.getenv("BENCH_ALLOW_REMOTE_MONGO") != "1":
+            raise ValueError(f"벤치마크는 로컬 mongod만 사용합니다: {uri} (BENCH_ALLOW_REMOTE_MONGO=1로 해제)")
+        os.environ["MONGODB_URI"] = uri
+    else:
+        import mongomock
+
+        shared_client = mongomock.MongoClient()
+        pymongo.MongoClient = lambda *args, **kwargs: shared_client
+        os.environ["MONGODB_URI"] = "mongodb://mongomock"
+        _patch_aggregate(mongomock.collection.Collection, _run_on_temp_collection, MONGOMOCK_OPERATOR_ALIASES)
+        _patch_bulk_write(mongomock.collection.Collection)
+
+    _patch_aggregate(Collection, _run_with_documents_stage)
+
+
+def _patch_aggregate(cls, run_rest, operator_aliases=None):
+    original = cls.aggregate
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        if operator_aliases:
+            pipeline = _rename_operators(pipeline, operator_aliases)
+        if pipeline and "$vectorSearch" in pipeline[0]:
+            docs = _vector_search(self, pipeline[0]["$vectorSearch"])
+            return run_rest(self, original, docs, _replace_score_meta(pipeline[1:]), *args, **kwargs)
+        return original(self, pipeline, *args, **kwargs)
+
+    cls.aggregate = aggregate
+
+
+def _patch_bulk_write(cls):
+    """
+    mongomock 4.x의 bulk_write는 pymongo 4.9+ 연산 객체(UpdateOne 등)의 새 인자를 받지 못하므로
+    연산별 단건 메서드로 풀어서 실행
+    """
+    from pymongo.operations import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+    from pymongo.results import BulkWriteResult
+
+    def bulk_write(self, requests, ordered=True, *args, **kwargs):
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+        for op in requests:
+            if isinstance(op, InsertOne):
+                self.insert_one(op._doc)
+                counts["nInserted"] += 1
+                continue
+            if isinstance(op, (DeleteOne, DeleteMany)):
+                method = self.delete_one if isinstance(op, DeleteOne) else self.delete_many
+                counts["nRemoved"] += method(op._filter).deleted_count
+                continue
+            if isinstance(op, ReplaceOne):
+                result = self.replace_one(op._filter, op._doc, upsert=bool(op._upsert))
+            else:
+                method = self.update_one if isinstance(op, UpdateOne) else self.update_many
+                result = method(op._filter, op._doc, upsert=bool(op._upsert))
+            counts["nMatched"] += result.matched_count
+            counts["nModified"] += result.modified_count
+            if result.upserted_id is not None:
+                counts["nUpserted"] += 1
+                counts["upserted"].append({"index": 0, "_id": result.upserted_id})
+        return BulkWriteResult(counts, True)
+
+    cls.bulk_write = bulk_write
+
+
+def _run_with_documents_stage(collection, original, docs, rest, *args, **kwargs):
+    # MongoDB 5.1+ : 컬렉션 없이 문서 배열로 파이프라인 시작 ($lookup 등 나머지 단계는 그대로 동작)
+    return collection.database.aggregate([{"$documents": docs}, *rest], *args, **kwargs)
+
+
+def _run_on_temp_collection(collection, original, docs, rest, *args, **kwargs):
+    # mongomock은 $documents를 지원하지 않으므로 임시 컬렉션에 넣고 실행
+    temp = collection.database[f"_bench_vs_{uuid.uuid4().hex}"]
+    try:
+        if docs:
+            temp.insert_many(docs)
+        return iter(list(original(temp, rest, *args, **kwargs)))
+    finally:
+        temp.drop()
+
+
+def _rename_operators(value, aliases):
+    if isinstance(value, dict):
+        return {aliases.get(k, k): _rename_operators(v, aliases) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rename_operators(v, aliases) for v in value]
+    return value
+
+
+def _replace_score_meta(value):
+    if isinstance(value, dict):
+        if value == {"$meta": "vectorSearchScore"}:
+            return f"${SCORE_FIELD}"
+        return {k: _replace_score_meta(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_score_meta(v) for v in value]
+    return value
+
+
+def _load_vectors(collection, path):
+    """
+    path 필드가 있는 문서와 정규화된 벡터 행렬을 캐시 (컬렉션 문서 수가 바뀌면 다시 읽음)
+    """
+    key = (collection.full_name, path)
+    count = collection.estimated_document_count()
+    with _vector_lock:
+        cached = _vector_cache.get(key)
+        if cached and cached["count"] == count:
+            return cached
+
+    docs = []
+    vectors = []
+    for doc in collection.find({path: {"$exists": True}}):
+        vectors.append(doc[path])
+        # 이후 단계에서 쓰지 않는 임베딩 필드는 제거해 파이프라인을 가볍게 유지
+        docs.append({k: v for k, v in doc.items() if not k.startswith("embedding_")})
+
+    matrix = np.asarray(vectors, dtype=np.float32) if vectors else np.zeros((0, 0), dtype=np.float32)
+    if len(matrix):
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    cached = {"count": count, "docs": docs, "matrix": matrix}
+    with _vector_lock:
+        _vector_cache[key] = cached
+    return cached
+
+
+def _vector_search(collection, stage):
+    """
+    Atlas cosine 인덱스와 같은 점수((1 + cos) / 2)로 상위 limit개 문서 반환 (점수 내림차순)
+    """
+    cached = _load_vectors(collection, stage["path"])
+    if not cached["docs"]:
+        return []
+
+    query = np.asarray(stage["queryVector"], dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+    scores = (1 + cached["matrix"] @ query) / 2
+
+    if stage.get("filter"):
+        # 임베딩을 뺀 캐시 문서에 MQL 필터를 직접 적용 (벡터 필드를 매번 다시 읽지 않음)
+        mask = np.fromiter(
+            (filter_applies(stage["filter"], doc) for doc in cached["docs"]),
+            dtype=bool, count=len(cached["docs"]),
+        )
+        scores = np.where(mask, scores, -np.inf)
+
+    limit = min(int(stage.get("limit", 10)), int(stage.get("numCandidates", stage.get("limit", 10))))
+    top = np.argsort(-scores)[:limit]
+    return [
+        {**cached["docs"][i], SCORE_FIELD: float(scores[i])}
+        for i in top
+        if np.isfinite(scores[i])
+    ]
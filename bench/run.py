@@ -0,0 +1,232 @@
+"""
+핫패스 벤치마크 실행기
+- bench.app(가짜 외부 서비스 + mongomock 또는 로컬 mongod + 합성 정책)을 워커 1개 서버로 띄우고
+  주요 엔드포인트(메인, 캘린더, 검색, 설문 추천, 챗봇)에 동시성 단계별 부하를 줘 처리량과 p50/p95/p99를 출력
+- --output으로 결과(JSON, 커밋 해시 포함)를 저장하고 --baseline과 비교하면 회귀가 있을 때 종료 코드 1 반환
+
+    python -m bench.run                                    # mongomock + ASGI(uvicorn)
+    python -m bench.run --server wsgi --scenario search --scenario recommend
+    python -m bench.run --mongodb-uri mongodb://localhost:27017 --output bench-results/$(git rev-parse --short HEAD).json
+    python -m bench.run --baseline bench-results/abc1234.json --tolerance 0.2
+    python -m bench.run --latency openai=1500 --latency gemini=800   # 외부 API 지연 가정 변경
+
+mongomock은 CPU/쿼리 비용이 실제 mongod와 다르므로 절대값보다 커밋 간 상대 비교용으로 사용하고,
+실제 수치가 필요하면 로컬 mongod를 지정 ($vectorSearch는 양쪽 모두 bench.mongo에서 에뮬레이션)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlencode
+
+from bench.load_test import format_row, run_load
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+READY_TIMEOUT = 300  # 초. 서버 기동 + 합성 데이터 저장 대기
+
+SEARCH_QUERIES = ["월세", "청년 창업", "취업 지원금", "자격증 응시료", "심리 상담", "전세 대출 이자", "디지털 교육", "근속 장려금"]
+CHAT_MESSAGES = [
+    f"{region} {topic}"
+    for region in ("서울", "부산", "대전", "경기", "전남")
+    for topic in ("청년 월세 지원 알려줘", "창업 지원 정책 있어?", "취업 준비 지원금 받을 수 있어?", "심리 상담 지원 있나요?")
+]
+SURVEY_ANSWERS = {"1": "27", "2": "취업", "3": "서울", "4": "대학교", "5": "졸업", "6": "미취업자", "7": "중위소득 100% 이하"}
+
+SCENARIOS = {
+    "index": {"method": "GET", "paths": ["/"]},
+    "calendar": {"method": "GET", "paths": ["/calendar/"]},
+    "filter_options": {"method": "GET", "paths": ["/search/api/filter-options"]},
+    "search": {"method": "GET", "paths": [f"/search/api/search?{urlencode({'query': q})}" for q in SEARCH_QUERIES]},
+    "recommend": {"method": "GET", "paths": ["/survey/api/recommend/"]},
+    "chat": {
+        "method": "POST",
+        "paths": ["/chat/api/chat_response"],
+        "bodies": [json.dumps({"message": m}, ensure_ascii=False) for m in CHAT_MESSAGES],
+    },
+}
+
+
+def _server_command(server, port, wsgi_threads):
+    if server == "asgi":
+        return [sys.executable, "-m", "uvicorn", "bench.app:application", "--host", "127.0.0.1",
+                "--port", str(port), "--workers", "1", "--log-level", "warning", "--no-access-log"]
+    return [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", "1",
+            "--threads", str(wsgi_threads), "--timeout", "120", "bench.app:wsgi_application"]
+
+
+def start_server(args):
+    env = {**os.environ, "PYTHONUNBUFFERED": "1", "BENCH_POLICIES": str(args.policies)}
+    if args.mongodb_uri:
+        env["BENCH_MONGODB_URI"] = args.mongodb_uri
+    if args.reseed:
+        env["BENCH_RESEED"] = "1"
+    for item in args.latency:
+        provider, _, ms = item.partition("=")
+        env[f"BENCH_{provider.strip().upper()}_LATENCY_MS"] = ms.strip()
+
+    log = tempfile.NamedTemporaryFile(prefix="bench-server-", suffix=".log", delete=False)
+    proc = subprocess.Popen(
+        _server_command(args.server, args.port, args.wsgi_threads),
+        cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    return proc, log.name
+
+
+def wait_ready(base_url, proc, timeout=READY_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{base_url}/health/", timeout=2) as res:
+                if res.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def create_session(base_url):
+    """
+    설문을 저장해 프로필이 있는 익명 세션 쿠키를 만듦 (추천/메인/챗봇이 프로필 기반 경로를 타도록)
+    """
+    body = json.dumps({"answers": SURVEY_ANSWERS}, ensure_ascii=False).encode("utf-8")
+    req = urllib.request.Request(f"{base_url}/survey/api/save/", data=body, method="POST",
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=30) as res:
+        cookies = [c.split(";", 1)[0] for c in res.headers.get_all("Set-Cookie") or []]
+    return "; ".join(cookies)
+
+
+def warm_up(base_url, scenario, headers):
+    """
+    측정 전 입력마다 한 번씩 호출 (벡터 행렬 로드, 워커별 캐시/인덱스 준비를 측정에서 제외)
+    """
+    bodies = scenario.get("bodies") or [None]
+    for path in scenario["paths"]:
+        for body in bodies:
+            req = urllib.request.Request(
+                base_url + path, method=scenario["method"], headers=dict(headers),
+                data=body.encode("utf-8") if body is not None else None,
+            )
+            if body is not None:
+                req.add_header("Content-Type", "application/json")
+            try:
+                with urllib.request.urlopen(req, timeout=120) as res:
+                    res.read()
+            except urllib.error.HTTPError as e:
+                print(f"[bench.run] warm-up {path} status {e.code}", flush=True)
+
+
+def compare(results, baseline, tolerance):
+    """
+    같은 (시나리오, 동시성) 기준 p95가 tolerance 이상 늘거나 처리량이 tolerance 이상 줄면 회귀
+    """
+    base = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get((r["scenario"], r["concurrency"]))
+        if not b:
+            continue
+        label = f"{r['scenario']} c={r['concurrency']}"
+        if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label} p95 {b['p95_ms']}ms -> {r['p95_ms']}ms")
+        if b["rps"] and r["rps"] < b["rps"] * (1 - tolerance):
+            regressions.append(f"{label} rps {b['rps']} -> {r['rps']}")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="핫패스 엔드포인트 벤치마크 (가짜 외부 서비스 + 합성 데이터)")
+    parser.add_argument("--server", choices=["asgi", "wsgi"], default="asgi")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--wsgi-threads", type=int, default=1, help="WSGI 워커 스레드 수 (Dockerfile 기본값 1)")
+    parser.add_argument("--mongodb-uri", default=None, help="로컬 mongod URI (생략 시 mongomock)")
+    parser.add_argument("--policies", type=int, default=900, help="합성 정책 수")
+    parser.add_argument("--reseed", action="store_true", help="기존 데이터를 지우고 다시 생성")
+    parser.add_argument("--latency", action="append", default=[],
+                        help="가짜 외부 API 지연 'provider=ms' (gemini, gemini_embed, openai, openai_embed, tavily, s3)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="측정할 시나리오 (생략 시 전체)")
+    parser.add_argument("--concurrency", default="1,8,32", help="쉼표로 구분한 동시성 단계")
+    parser.add_argument("--duration", type=float, default=10.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀 판정 허용 비율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    names = args.scenario or list(SCENARIOS)
+
+    proc, log_path = start_server(args)
+    try:
+        if not wait_ready(base_url, proc):
+            print(f"[bench.run] 서버 기동 실패, 로그: {log_path}", flush=True)
+            return 2
+
+        cookie = create_session(base_url)
+        headers = {"Cookie": cookie} if cookie else {}
+
+        results = []
+        for name in names:
+            scenario = SCENARIOS[name]
+            warm_up(base_url, scenario, headers)
+            urls = [base_url + path for path in scenario["paths"]]
+            for concurrency in levels:
+                stats = run_load(urls, concurrency, args.duration, scenario["method"],
+                                 scenario.get("bodies"), dict(headers))
+                results.append({"scenario": name, "concurrency": concurrency, **stats})
+                print(format_row(name, concurrency, stats), flush=True)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "server": args.server,
+        "mongo": "mongod" if args.mongodb_uri else "mongomock",
+        "policies": args.policies,
+        "latency": args.latency,
+        "duration": args.duration,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[bench.run] 결과 저장: {args.output}", flush=True)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[bench.run] 회귀: {line}", flush=True)
+        if regressions:
+            return 1
+        print(f"[bench.run] 기준({baseline.get('commit')}) 대비 회귀 없음", flush=True)
+
+    print(f"[bench.run] 서버 로그: {log_path}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+벤치마크용 합성 정책 데이터 생성
+- 온통청년 API 응답(전처리 후) 형태의 항목을 만들어 실제 수집 경로(transform_api_data_for_db_insert,
+  save_data_to_mongodb)로 저장하므로 문서 스키마가 운영 데이터와 같게 유지됨
+- 같은 시드면 항상 같은 데이터 (결정적)
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+from site_admin.preprocess import codes
+
+SEED_BATCH_SIZE = 100  # 수집 API 페이지 크기와 비슷하게 나눠 저장
+DEFAULT_POLICY_COUNT = int(os.getenv("BENCH_POLICIES", "900"))
+DEFAULT_SEED = int(os.getenv("BENCH_SEED", "42"))
+
+# 출장소는 도 단위 지역이 아니므로 제외
+REGIONS = sorted({name for name in codes.area_codes.values() if not name.endswith("출장소")})
+
+# (대분류, 중분류, 키워드, 정책명, 설명, 지원내용)
+TOPICS = [
+    ("일자리", "취업", "취업지원,구직", "청년 구직활동 지원금",
+     "미취업 청년의 구직활동을 돕기 위해 면접 정장 대여와 구직활동비를 지원합니다.", "월 50만원 최대 6개월 구직활동비 지급"),
+    ("일자리", "창업", "창업,사업화", "청년 창업 사관학교",
+     "예비창업자에게 사업화 자금과 창업 교육, 전문가 멘토링을 제공합니다.", "사업화 자금 최대 1억원 및 창업 공간 제공"),
+    ("일자리", "재직자", "근속,장려금", "청년 근속 장려금",
+     "중소기업에 취업한 청년의 장기근속을 위해 장려금을 지급합니다.", "6개월 근속 시 300만원 지급"),
+    ("주거", "주거지원", "월세,주거비", "청년 월세 지원",
+     "무주택 청년의 주거비 부담을 줄이기 위해 월세를 지원합니다.", "월 최대 20만원 12개월 월세 지원"),
+    ("주거", "전세", "전세자금,대출이자", "청년 전세자금 대출 이자 지원",
+     "전세자금 대출을 받은 청년에게 대출 이자를 지원합니다.", "대출 이자 연 2% 이내 지원"),
+    ("교육", "직업훈련", "교육,역량강화", "청년 디지털 역량 강화 교육",
+     "데이터 분석과 인공지능 실무 교육 과정을 무료로 제공합니다.", "교육비 전액 및 훈련수당 지급"),
+    ("교육", "자격증", "자격증,응시료", "청년 자격증 응시료 지원",
+     "국가기술자격 시험 응시료를 지원해 취업 역량을 높입니다.", "연 최대 30만원 응시료 지원"),
+    ("복지문화", "심리상담", "상담,마음건강", "청년 마음건강 상담 바우처",
+     "우울과 불안을 겪는 청년에게 전문 심리상담 바우처를 제공합니다.", "상담 바우처 10회 제공"),
+    ("참여권리", "청년참여", "정책참여,네트워크", "청년 정책 네트워크",
+     "청년이 직접 정책을 제안하고 지역 의사결정에 참여하는 활동을 지원합니다.", "활동비 및 정책 제안 워크숍 지원"),
+]
+
+JOB_TYPES = list(codes.job_code.values())
+SUBMIT_DOCUMENTS = [
+    ("신청서", True), ("개인정보 수집 이용 동의서", True), ("사업계획서", False),
+    ("주민등록등본", True), ("재학증명서", False), ("임대차계약서 사본", False),
+]
+SUB_CATEGORY_BY_TOPIC = {"취업": ["취업"], "창업": ["창업"], "직업훈련": ["교육"], "자격증": ["교육", "지원금"],
+                         "심리상담": ["심리/재도전"], "재직자": ["지원금"], "주거지원": ["지원금"], "전세": ["지원금"]}
+
+
+def _ymd(dt):
+    return dt.strftime("%Y%m%d")
+
+
+def build_api_items(count=DEFAULT_POLICY_COUNT, seed=DEFAULT_SEED, today=None):
+    """
+    전처리(preprocess_policy_data)를 마친 API 항목과 같은 형태의 합성 정책 목록
+    """
+    rng = random.Random(seed)
+    today = today or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    items = []
+
+    for idx in range(count):
+        category, sub_category, keywords, name, content, support = rng.choice(TOPICS)
+        nationwide = rng.random() < 0.2
+        regions = list(REGIONS) if nationwide else [rng.choice(REGIONS)]
+        region_label = "전국" if nationwide else regions[0]
+
+        always_open = rng.random() < 0.25
+        start = today - timedelta(days=rng.randint(0, 60))
+        end = today + timedelta(days=rng.randint(-10, 90))
+        age_min, age_max = rng.choice([(18, 34), (19, 39), (15, 29), (0, 0)])
+        documents = rng.sample(SUBMIT_DOCUMENTS, rng.randint(1, 4))
+        job_types = rng.sample(JOB_TYPES, rng.randint(1, 3))
+
+        items.append({
+            "plcyNo": f"BENCH{idx:06d}",
+            "plcyNm": f"{region_label} {name} {idx % 7 + 1}기",
+            "plcyKywdNm": keywords,
+            "plcyExplnCn": f"{region_label} 거주 {content}",
+            "lclsfNm": category,
+            "mclsfNm": sub_category,
+            "plcySprtCn": support,
+            "sprvsnInstCdNm": f"{region_label} 청년정책과",
+            "operInstCdNm": f"{region_label} 청년센터",
+            "aplyYmd": "" if always_open else f"{_ymd(start)} ~ {_ymd(end)}",
+            "apply_period_start": None if always_open else _ymd(start),
+            "apply_period_end": None if always_open else _ymd(end),
+            "aplyPrdSeCd": "상시" if always_open else "특정기간",
+            "bizPrdSeCd": "특정기간",
+            "plcyAplyMthdCn": "온라인 신청 (청년센터 홈페이지)",
+            "srngMthdCn": "서류 심사 후 선정",
+            "aplyUrlAddr": f"https://example.com/apply/{idx}",
+            "sbmsnDcmntCn": ", ".join(doc for doc, _ in documents),
+            "sprtSclCnt": str(rng.choice([0, 30, 100, 500])),
+            "sprtTrgtMinAge": str(age_min),
+            "sprtTrgtMaxAge": str(age_max),
+            "addAplyQlfcCndCn": rng.choice(["", "공고일 기준 해당 지역 거주자", "중위소득 150% 이하"]),
+            "earnMinAmt": "0",
+            "earnMaxAmt": str(rng.choice([0, 50000000])),
+            "earnEtcCn": "",
+            "inqCnt": str(rng.randint(0, 5000)),
+            "frstRegDt": (today - timedelta(days=120)).strftime("%Y-%m-%d %H:%M:%S"),
+            "lastMdfcnDt": (today - timedelta(days=rng.randint(0, 90))).strftime("%Y-%m-%d %H:%M:%S"),
+            "submit_documents": [{"document_name": doc, "is_mandatory": mandatory} for doc, mandatory in documents],
+            "zipCd": [],
+            "earnCndSeCd": rng.choice(["무관", "연소득", "기타"]),
+            "jobCd": job_types,
+            "mrgSttsCd": "제한없음",
+            "plcyMajorCd": ["제한없음"],
+            "plcyPvsnMthdCd": ["현금(금융)지원"],
+            "sbizCd": ["제한없음"],
+            "pvsnInstGroupCd": "지자체",
+            "schoolCd": ["제한없음"],
+            "ptcpPrpTrgtCn": rng.choice(["", "공무원 재직자 제외"]),
+            "region": regions,
+            "sub_categories": SUB_CATEGORY_BY_TOPIC.get(sub_category, []),
+        })
+
+    return items
+
+
+def seed_policies(count=DEFAULT_POLICY_COUNT, seed=DEFAULT_SEED):
+    """
+    합성 정책을 수집 경로 그대로 저장 (임베딩은 bench.fakes의 가짜 임베딩)
+    """
+    from site_admin.data import save_data_to_mongodb, transform_api_data_for_db_insert
+
+    items = build_api_items(count, seed)
+    for start in range(0, len(items), SEED_BATCH_SIZE):
+        data_docs, vector_docs = transform_api_data_for_db_insert(items[start:start + SEED_BATCH_SIZE])
+        for vector_doc in vector_docs:
+            # 검색/챗봇은 v2, 추천은 v3 필드로 벡터 검색하므로 둘 다 채움 (본문 패시지 청크는 운영과 같게 v3만)
+            if vector_doc["chunk_id"] != 1:
+                continue
+            vector_doc["embedding_gemini_v2"] = vector_doc["embedding_gemini_v3"]
+            vector_doc["content_chunk_v2"] = vector_doc["content_chunk_v3"]
+        save_data_to_mongodb(data_docs, vector_docs)
+    return len(items)
+
+
+def ensure_seeded(count=DEFAULT_POLICY_COUNT, seed=DEFAULT_SEED, reseed=None):
+    """
+    정책이 없으면(또는 BENCH_RESEED=1이면) 합성 데이터 저장. 저장한 정책 수 반환 (건너뛰면 0)
+    """
+    from utils.db import getMongoDbClient
+
+    if reseed is None:
+        reseed = os.getenv("BENCH_RESEED", "0") == "1"
+
+    db = getMongoDbClient()
+    if db["policies"].estimated_document_count() and not reseed:
+        return 0
+
+    for name in ("policies", "policy_vectors", "policy_summary_cache", "policy_simulation_cache",
+                 "policy_form_field_cache", "chat_sessions", "chat_messages", "user_profiles"):
+        db[name].drop()
+
+    inserted = seed_policies(count, seed)
+    print(f"[bench.seed] policies:{inserted}, regions:{len(REGIONS)}, topics:{len(TOPICS)}", flush=True)
+    return inserted
@@ -0,0 +1,10 @@
+"""
+벤치마크 서버 설정 (config.settings 기반)
+- 운영과 같은 조건으로 측정하도록 DEBUG 끔
+- 세션은 서명 쿠키에 저장 (sqlite 마이그레이션 없이 설문 프로필/채팅 세션 사용)
+"""
+from config.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
@@ -0,0 +1,159 @@
+"""
+챗봇 시맨틱 답변 캐시
+- 질문 임베딩의 코사인 유사도가 임계값 이상이고
+  (지역, 프로필 버킷, 코퍼스 버전)이 같으면 이전 final_answer 재사용
+- 항목별 TTL, 적중률/유사도 분포 지표 제공 (임계값 튜닝용)
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from utils.corpus import get_corpus_version
+
+SIMILARITY_THRESHOLD = float(os.getenv("CHAT_ANSWER_CACHE_THRESHOLD", "0.95"))
+DEFAULT_TTL_SECONDS = int(os.getenv("CHAT_ANSWER_CACHE_TTL", "21600"))  # 내부 DB 기반 답변: 6시간
+WEB_TTL_SECONDS = int(os.getenv("CHAT_ANSWER_CACHE_WEB_TTL", "1800"))   # 웹 검색 기반 답변: 30분
+MAX_ENTRIES_PER_BUCKET = 500
+
+# 유사도 분포 구간 (최고 유사도 기준, 하한값)
+SIMILARITY_BINS = [0.0, 0.80, 0.85, 0.90, 0.92, 0.94, 0.96, 0.98]
+
+_lock = threading.Lock()
+_buckets = {}  # bucket_key -> {"vectors": np.ndarray, "entries": [dict]}
+_stats = {
+    "lookups": 0,
+    "hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "expired": 0,
+    "similarity_hist": [0] * len(SIMILARITY_BINS),
+}
+
+
+def build_profile_bucket(profile: dict | None) -> str:
+    """
+    답변에 영향을 주는 프로필 값만으로 버킷 키 생성 (비로그인/프로필 없음은 anon)
+    """
+    if not profile:
+        return "anon"
+
+    parts = [f"{key}:{profile.get(key)}" for key in ("age", "job", "region") if profile.get(key)]
+    return "|".join(parts) if parts else "anon"
+
+
+def _bucket_key(regions, profile_bucket, corpus_version):
+    normalized_regions = tuple(sorted({r for r in (regions or []) if r}))
+    return (normalized_regions, profile_bucket, corpus_version)
+
+
+def _normalize(vector):
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    if norm == 0:
+        return None
+    return arr / norm
+
+
+def _record_similarity(similarity):
+    idx = 0
+    for i, lower in enumerate(SIMILARITY_BINS):
+        if similarity >= lower:
+            idx = i
+    _stats["similarity_hist"][idx] += 1
+
+
+def _drop_expired(bucket, now):
+    alive = [i for i, e in enumerate(bucket["entries"]) if e["expires_at"] > now]
+    if len(alive) == len(bucket["entries"]):
+        return
+    _stats["expired"] += len(bucket["entries"]) - len(alive)
+    bucket["entries"] = [bucket["entries"][i] for i in alive]
+    bucket["vectors"] = bucket["vectors"][alive] if alive else None
+
+
+def lookup(query_vector, regions, profile_bucket):
+    """
+    캐시 조회. 적중하면 (answer, similarity), 아니면 (None, best_similarity) 반환
+    """
+    q = _normalize(query_vector)
+    if q is None:
+        return None, 0.0
+
+    key = _bucket_key(regions, profile_bucket, get_corpus_version())
+    now = time.time()
+
+    with _lock:
+        _stats["lookups"] += 1
+        bucket = _buckets.get(key)
+        if bucket:
+            _drop_expired(bucket, now)
+
+        if not bucket or bucket["vectors"] is None:
+            _stats["misses"] += 1
+            return None, 0.0
+
+        sims = bucket["vectors"] @ q
+        best_idx = int(np.argmax(sims))
+        best_sim = float(sims[best_idx])
+        _record_similarity(best_sim)
+
+        if best_sim >= SIMILARITY_THRESHOLD:
+            _stats["hits"] += 1
+            entry = bucket["entries"][best_idx]
+            print(f"[answer_cache] hit similarity:{best_sim:.4f}, cached_query:{entry['query']}")
+            return entry["answer"], best_sim
+
+        _stats["misses"] += 1
+        return None, best_sim
+
+
+def store(query_vector, regions, profile_bucket, query, answer, ttl=DEFAULT_TTL_SECONDS):
+    """
+    답변 저장 (항목별 TTL). 버킷이 가득 차면 가장 오래된 항목부터 제거
+    """
+    q = _normalize(query_vector)
+    if q is None or not answer:
+        return
+
+    key = _bucket_key(regions, profile_bucket, get_corpus_version())
+    entry = {"query": query, "answer": answer, "expires_at": time.time() + ttl}
+
+    with _lock:
+        bucket = _buckets.setdefault(key, {"vectors": None, "entries": []})
+        if bucket["vectors"] is None:
+            bucket["vectors"] = q[np.newaxis, :]
+        else:
+            bucket["vectors"] = np.vstack([bucket["vectors"], q])
+        bucket["entries"].append(entry)
+
+        overflow = len(bucket["entries"]) - MAX_ENTRIES_PER_BUCKET
+        if overflow > 0:
+            bucket["entries"] = bucket["entries"][overflow:]
+            bucket["vectors"] = bucket["vectors"][overflow:]
+
+        _stats["stores"] += 1
+
+
+def get_stats():
+    """
+    적중률 및 최고 유사도 분포 반환
+    """
+    with _lock:
+        lookups = _stats["lookups"]
+        hist = {
+            f">={lower:.2f}": count
+            for lower, count in zip(SIMILARITY_BINS, _stats["similarity_hist"])
+        }
+        return {
+            "threshold": SIMILARITY_THRESHOLD,
+            "lookups": lookups,
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+            "stores": _stats["stores"],
+            "expired": _stats["expired"],
+            "entries": sum(len(b["entries"]) for b in _buckets.values()),
+            "similarity_hist": hist,
+        }
@@ -3,6 +3,12 @@ from datetime import datetime, timedelta
 CHAT_CACHE = {}
 CACHE_TTL = timedelta(minutes=30)
 MAX_MESSAGES = 6
+# 아직 요약되지 않은 메시지는 MAX_MESSAGES를 넘어도 캐시/프롬프트에 유지 (요약 실패 시 상한)
+MAX_UNSUMMARIZED_MESSAGES = MAX_MESSAGES * 4
+
+
+def _window(pending):
+    return min(max(MAX_MESSAGES, pending), MAX_UNSUMMARIZED_MESSAGES)
 
 def get_cached_messages(session_id):
     data = CHAT_CACHE.get(session_id)
@@ -15,13 +21,15 @@ def get_cached_messages(session_id):
         return None
 
     print(f"[get_cached_messages] session_id:{session_id}, messages:{data['messages']}")
-    
+
     return data["messages"]
 
 
-def set_cached_messages(session_id, messages):
+def set_cached_messages(session_id, messages, summary="", pending=0):
     CHAT_CACHE[session_id] = {
-        "messages": messages[-MAX_MESSAGES:],
+        "messages": messages[-_window(pending):],
+        "summary": summary,
+        "pending": pending, # 마지막 요약 이후 추가된 메시지 수
         "updated_at": datetime.now()
     }
 
@@ -34,12 +42,36 @@ def append_message(session_id, role, content):
     if not data:
         CHAT_CACHE[session_id] = {
             "messages": [{"role": role, "content": content}],
+            "summary": "",
+            "pending": 1,
             "updated_at": datetime.now()
         }
         return
 
     data["messages"].append({"role": role, "content": content})
-    data["messages"] = data["messages"][-MAX_MESSAGES:]
+    data["pending"] = data.get("pending", 0) + 1
+    data["messages"] = data["messages"][-_window(data["pending"]):]
     data["updated_at"] = datetime.now()
 
     print(f"[append_message] session_id:{session_id}, role:{role}, content:{content}")
+
+
+def get_cached_summary(session_id):
+    data = CHAT_CACHE.get(session_id)
+    return data.get("summary", "") if data else ""
+
+
+def get_pending_count(session_id):
+    data = CHAT_CACHE.get(session_id)
+    return data.get("pending", 0) if data else 0
+
+
+def set_cached_summary(session_id, summary, summarized_count):
+    data = CHAT_CACHE.get(session_id)
+    if not data:
+        return
+
+    data["summary"] = summary
+    # 요약 중에 추가된 메시지는 다음 요약 대상으로 남김
+    data["pending"] = max(0, data.get("pending", 0) - summarized_count)
+    data["messages"] = data["messages"][-_window(data["pending"]):]
@@ -7,7 +7,12 @@ from openai import AsyncOpenAI
 from google import genai
 from google.genai import types
 from utils.db import getMongoDbClient
-from tavily import TavilyClient
+from utils import llm_gateway, retrieval
+import chat.answer_cache as answer_cache
+import chat.intent as intent
+import chat.relevance as relevance
+import chat.web_search as web_search
+import chat.history as chat_history
 from langgraph.graph import StateGraph, START, END
 from dotenv import load_dotenv
 
@@ -15,14 +20,15 @@ from dotenv import load_dotenv
 load_dotenv()
 openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 gemini_client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
-tavily_client = TavilyClient(api_key=os.getenv('TAVILY_API_KEY'))
 
 # 2. 보조 함수
 async def get_query_vector_async(text):
     try:
-        res = await openai_client.embeddings.create(
+        res = await llm_gateway.acall(
+            "openai", openai_client.embeddings.create,
             input=text,
-            model="text-embedding-3-large"
+            model="text-embedding-3-large",
+            dedup_key=llm_gateway.prompt_key("text-embedding-3-large", text)
         )
         return res.data[0].embedding
     except Exception as e:
@@ -32,6 +38,7 @@ async def get_query_vector_async(text):
 # 3. LangGraph 상태 정의
 class PolicyState(TypedDict):
     messages: list[dict]
+    summary: str
     user_query: str
     user_name: str
     user_profile: dict
@@ -40,11 +47,15 @@ class PolicyState(TypedDict):
     target_regions: list[str]
     query_vector: list[float]
     search_keyword: str
+    standalone: bool
     web_res_raw: Any
     top_5: list[dict]
     max_score: float
+    score_margin: float
+    retrieval: dict
     is_sufficient: bool
     final_answer: str
+    cache_hit: bool
     start_time: float
 
 # 4. 노드 정의
@@ -52,35 +63,67 @@ class PolicyState(TypedDict):
 async def analyze_node(state: PolicyState):
     user_query = state["user_query"]
     profile = state.get("user_profile", {})
-    history_context = "\n".join([f"{m['role']}: {m['content']}" for m in state["messages"][-2:]]) if len(state["messages"]) > 1 else ""
 
+    # 대화 이력 없이 지역명 + 정책 키워드가 명확한 질문만 LLM 의도 분석 생략
+    has_history = len(state["messages"]) > 1 or bool(state.get("summary"))
+    fast = intent.classify(user_query, has_history=has_history)
+    if fast:
+        query_vector = await get_query_vector_async(user_query)
+        return {
+            "is_policy": fast["is_policy"],
+            "target_regions": fast["regions"],
+            "query_vector": query_vector,
+            "search_keyword": fast["search_keyword"],
+            "standalone": True
+        }
+
+    history_context = chat_history.format_context(state.get("summary"), state["messages"][-2:] if len(state["messages"]) > 1 else [])
+
+    intent_messages = [{"role": "system", "content": f"문맥[{history_context}] 참고. JSON: {{'is_policy': true, 'regions': '지역명', 'search_keyword': '보정된 검색어'}}"}]
     tasks = [
-        openai_client.chat.completions.create(
+        llm_gateway.acall(
+            "openai", openai_client.chat.completions.create,
             model="gpt-4o-mini",
-            messages=[{"role": "system", "content": f"문맥[{history_context}] 참고. JSON: {{'is_policy': true, 'regions': '지역명', 'search_keyword': '보정된 검색어'}}"}],
-            response_format={"type": "json_object"}
+            messages=intent_messages,
+            response_format={"type": "json_object"},
+            dedup_key=llm_gateway.prompt_key("gpt-4o-mini", "intent", intent_messages)
         ),
         get_query_vector_async(user_query)
     ]
     intent_res, query_vector = await asyncio.gather(*tasks)
     analysis = json.loads(intent_res.choices[0].message.content)
+    search_keyword = analysis.get("search_keyword", user_query)
     
     return {
         "is_policy": analysis.get("is_policy", True),
         "target_regions": [r.strip().replace("시", "").replace("도", "") for r in analysis.get("regions", "전국").split(',')],
         "query_vector": query_vector,
-        "search_keyword": analysis.get("search_keyword", user_query)
+        "search_keyword": search_keyword,
+        # 맥락 의존 질문(이전 대화를 참고해 검색어가 보정된 경우)은 답변 캐시 조회/저장 대상에서 제외
+        "standalone": not has_history or str(search_keyword).strip() == user_query.strip()
     }
 
+async def answer_cache_node(state: PolicyState):
+    # 맥락 의존 질문은 캐시를 사용하지 않음 (analyze_node에서 판정)
+    if not state.get("standalone"):
+        return {"cache_hit": False}
+
+    answer, similarity = answer_cache.lookup(
+        state["query_vector"],
+        state["target_regions"],
+        answer_cache.build_profile_bucket(state.get("user_profile")),
+    )
+    if answer is None:
+        return {"cache_hit": False}
+
+    print(f"📊 [LangGraph] 캐시 응답 (similarity:{similarity:.4f}) 소요시간: {time.time()-state['start_time']:.2f}s")
+    return {"cache_hit": True, "final_answer": answer}
+
 async def vector_search_node(state: PolicyState):
     db = getMongoDbClient()
+    params = retrieval.get_params("chat")
     vector_results = list(db['policy_vectors'].aggregate([
-        {"$vectorSearch": {
-            "index": "vector_index_v2", 
-            "path": "embedding_gemini_v2", 
-            "queryVector": state["query_vector"], 
-            "numCandidates": 50, "limit": 20
-        }},
+        retrieval.vector_search_stage("chat", state["query_vector"], params),
         {"$addFields": {"score": {"$meta": "vectorSearchScore"}}}
     ]))
     
@@ -90,70 +133,127 @@ async def vector_search_node(state: PolicyState):
         title = meta.get('policy_name', '').strip()
         if title in seen_titles: continue
         
-        region_val = meta.get('region', ['전국'])[0]
-        item = {"title": title, "region": region_val, "content": doc.get('content_chunk_v2') or meta.get('support_content')}
+        regions = meta.get('region') or ['전국']
+        region_val = regions[0]
+        item = {"policy_id": doc.get('policy_id'), "title": title, "region": region_val, "regions": regions,
+                "content": doc.get('content_chunk_v2') or meta.get('support_content')}
         
         if state["target_regions"] and any(reg in region_val or reg in title for reg in state["target_regions"]):
             region_specific.append(item)
         elif any(k in region_val for k in ["전국", "중앙", "국가"]):
             nationwide.append(item)
         seen_titles.add(title)
-        
-    return {"top_5": (region_specific + nationwide)[:5], "max_score": vector_results[0].get('score', 0) if vector_results else 0}
+
+    top_5 = (region_specific + nationwide)[:5]
+
+    # 로컬 관련성 검증용 신청기간 정보 (상위 5개만 한 번에 조회)
+    policy_ids = [item["policy_id"] for item in top_5 if item.get("policy_id")]
+    if policy_ids:
+        dates_by_id = {p["_id"]: p.get("dates") for p in db['policies'].find({"_id": {"$in": policy_ids}}, {"dates": 1})}
+        for item in top_5:
+            item["dates"] = dates_by_id.get(item.get("policy_id"))
+    for item in top_5:
+        item["policy_id"] = str(item.get("policy_id"))
+
+    scores = [doc.get('score', 0) for doc in vector_results]
+    max_score = scores[0] if scores else 0
+    score_margin = max_score - scores[min(4, len(scores) - 1)] if scores else 0
+
+    return {"top_5": top_5, "max_score": max_score, "score_margin": score_margin, "retrieval": params}
 
 async def verify_relevance_node(state: PolicyState):
     if not state.get("top_5") or state["max_score"] < 0.6:
-        web_res = await asyncio.to_thread(tavily_client.search, query=state["search_keyword"], max_results=3)
+        web_res = await web_search.search(state["search_keyword"], max_results=3)
         return {"is_sufficient": False, "web_res_raw": web_res}
 
-    v_res = await openai_client.chat.completions.create(
-        model="gpt-4o-mini", 
-        messages=[
+    # 메타데이터/점수로 판정 가능하면 LLM 검증 생략, 애매한 경우에만 LLM 호출
+    is_sufficient = relevance.verify(
+        state["user_query"], state["target_regions"], state["top_5"],
+        state["max_score"], state.get("score_margin", 0.0)
+    )
+    if is_sufficient is None:
+        verify_messages = [
             {"role": "system", "content": "질문의 연도/지역/대상이 일치하면 YES, 아니면 NO라고 하세요."},
             {"role": "user", "content": f"질문: {state['user_query']}\n데이터: {[d['title'] for d in state['top_5']]}"}
-        ],
-        max_tokens=5, temperature=0
-    )
-    is_sufficient = "YES" in v_res.choices[0].message.content.strip().upper()
+        ]
+        v_res = await llm_gateway.acall(
+            "openai", openai_client.chat.completions.create,
+            model="gpt-4o-mini", 
+            messages=verify_messages,
+            max_tokens=5, temperature=0,
+            dedup_key=llm_gateway.prompt_key("gpt-4o-mini", "verify", verify_messages)
+        )
+        is_sufficient = "YES" in v_res.choices[0].message.content.strip().upper()
     
     if not is_sufficient:
-        web_res = await asyncio.to_thread(tavily_client.search, query=state["search_keyword"], max_results=3)
+        web_res = await web_search.search(state["search_keyword"], max_results=3)
         return {"is_sufficient": False, "web_res_raw": web_res}
 
     return {"is_sufficient": True}
 
 async def generate_final_answer(state: PolicyState):
     is_sufficient = state["is_sufficient"]
-    data_to_use = (state["top_5"] if is_sufficient else state["web_res_raw"].get('results', []))[:3]
-    source_info = "내부 DB" if is_sufficient else "실시간 웹 검색"
+    web_res = state.get("web_res_raw")
+    # 웹 검색이 타임아웃/차단된 경우 내부 DB 결과로 대체 답변
+    degraded = not is_sufficient and not web_res
+    use_internal = is_sufficient or degraded
+    data_to_use = (state["top_5"] if use_internal else web_res.get('results', []))[:3]
+    source_info = "내부 DB" if use_internal else "실시간 웹 검색"
     
-    response = await openai_client.chat.completions.create(
+    # 대화 맥락은 요약 + 최근 K개 메시지로 제한 (대화가 길어져도 프롬프트 길이 일정)
+    conversation_context = chat_history.format_context(state.get("summary"), state["messages"][:-1])
+    context_line = f"대화 맥락: {conversation_context}\n" if conversation_context else ""
+
+    answer_messages = [
+        {"role": "system", "content": f"당신은 {source_info} 기반 정책 전문가입니다. 최대 3개만 요약하고 맺음말은 생략하세요."},
+        {"role": "user", "content": f"{context_line}데이터: {data_to_use}\n질문: {state['user_query']}"}
+    ]
+    response = await llm_gateway.acall(
+        "openai", openai_client.chat.completions.create,
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": f"당신은 {source_info} 기반 정책 전문가입니다. 최대 3개만 요약하고 맺음말은 생략하세요."},
-            {"role": "user", "content": f"데이터: {data_to_use}\n질문: {state['user_query']}"}
-        ],
-        temperature=0.5
+        messages=answer_messages,
+        temperature=0.5,
+        dedup_key=llm_gateway.prompt_key("gpt-4o-mini", "answer", answer_messages)
     )
-    print(f"📊 [LangGraph] 소요시간: {time.time()-state['start_time']:.2f}s")
-    return {"final_answer": response.choices[0].message.content.strip()}
+    params = state.get("retrieval") or {}
+    print(f"📊 [LangGraph] 소요시간: {time.time()-state['start_time']:.2f}s (numCandidates:{params.get('num_candidates')}, limit:{params.get('limit')})")
+    final_answer = response.choices[0].message.content.strip()
+
+    # 대화 맥락이 들어간 답변은 다른 세션의 비슷한 질문에 맞지 않으므로 저장하지 않음
+    if degraded or not state.get("standalone") or conversation_context:
+        return {"final_answer": final_answer}
+
+    answer_cache.store(
+        state["query_vector"],
+        state["target_regions"],
+        answer_cache.build_profile_bucket(state.get("user_profile")),
+        state["user_query"],
+        final_answer,
+        ttl=answer_cache.DEFAULT_TTL_SECONDS if is_sufficient else answer_cache.WEB_TTL_SECONDS,
+    )
+    return {"final_answer": final_answer}
 
 async def off_topic_node(state: PolicyState):
     return {"final_answer": "정책 상담과 관련된 질문을 해주시면 자세히 안내해 드릴게요! 😊"}
 
 # 5. 그래프 조립
 def route_intent(state: PolicyState):
-    return "vector_search" if state["is_policy"] else "off_topic"
+    return "answer_cache" if state["is_policy"] else "off_topic"
+
+def route_cache(state: PolicyState):
+    return "cache_hit" if state.get("cache_hit") else "vector_search"
 
 workflow = StateGraph(PolicyState)
 workflow.add_node("analyze", analyze_node)
+workflow.add_node("answer_cache", answer_cache_node)
 workflow.add_node("vector_search", vector_search_node)
 workflow.add_node("verify", verify_relevance_node)
 workflow.add_node("generate", generate_final_answer)
 workflow.add_node("off_topic", off_topic_node)
 
 workflow.add_edge(START, "analyze")
-workflow.add_conditional_edges("analyze", route_intent, {"vector_search": "vector_search", "off_topic": "off_topic"})
+workflow.add_conditional_edges("analyze", route_intent, {"answer_cache": "answer_cache", "off_topic": "off_topic"})
+workflow.add_conditional_edges("answer_cache", route_cache, {"cache_hit": END, "vector_search": "vector_search"})
 workflow.add_edge("vector_search", "verify")
 workflow.add_edge("verify", "generate")
 workflow.add_edge("generate", END)
@@ -161,20 +261,17 @@ workflow.add_edge("off_topic", END)
 app = workflow.compile()
 
 # 6. 인터페이스 함수
-async def get_AI_response(messages, user=None):
+async def get_AI_response(messages, user=None, summary="", profile=None):
     is_auth = user.is_authenticated if user and not user.is_anonymous else False
     user_profile = {}
-    if is_auth:
-        try:
-            db = getMongoDbClient()
-            p = db['user_profiles'].find_one({"user_id": str(user.id)})
-            if p: user_profile = {"age": p.get("age"), "job": p.get("job_status"), "region": p.get("region", "전국")}
-        except: pass
+    # 설문 프로필은 호출 측에서 프로필 서비스(캐시)로 조회해 전달
+    if profile:
+        user_profile = {"age": profile.get("age"), "job": profile.get("job_status"), "region": profile.get("region", "전국")}
 
     result = await app.ainvoke({
-        "messages": messages, "user_query": messages[-1]['content'], 
+        "messages": messages, "summary": summary, "user_query": messages[-1]['content'], 
         "user_name": user.username if is_auth else "고객", "user_profile": user_profile,
-        "is_authenticated": is_auth, "start_time": time.time(), "is_sufficient": False,
+        "is_authenticated": is_auth, "start_time": time.time(), "is_sufficient": False, "cache_hit": False, "web_res_raw": None,
         "target_regions": [user_profile.get("region")] if user_profile.get("region") else []
     })
     return result["final_answer"]
\ No newline at end of file
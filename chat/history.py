@@ -0,0 +1,113 @@
+"""
+챗봇 대화 이력 관리
+- 캐시 미스 시 인덱스 조회 한 번으로 최근 메시지 + 세션 요약 복원
+- N개 메시지마다 백그라운드에서 세션 요약(rolling summary) 갱신
+- 프롬프트는 "요약 + 요약 이후 메시지(최소 최근 K개)"로 구성해 대화가 길어져도 토큰 수 일정 유지
+  (요약 주기 <= K이므로 요약에도 최근 메시지에도 없는 메시지가 생기지 않음)
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+import chat.cache as chat_cache
+import chat.utils as chat_utils
+from utils import llm_gateway
+
+# user+assistant 3턴. 프롬프트의 최근 메시지 수(MAX_MESSAGES)를 넘지 않게 제한
+SUMMARY_EVERY_N_MESSAGES = min(int(os.getenv("CHAT_SUMMARY_EVERY_N_MESSAGES", "6")), chat_cache.MAX_MESSAGES)
+SUMMARY_MAX_CHARS = 600
+SUMMARY_MODEL = "gpt-4o-mini"
+
+_summary_client = None
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+_in_progress = set()
+_lock = threading.Lock()
+
+
+def _get_summary_client():
+    global _summary_client
+    if _summary_client is None:
+        _summary_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    return _summary_client
+
+
+def load_context(session_id):
+    """
+    캐시에 대화가 없으면 DB에서 최근 메시지와 요약을 복원해 캐시에 저장
+    반환: (messages, summary)
+    """
+    messages = chat_cache.get_cached_messages(session_id)
+    if messages is not None:
+        return messages, chat_cache.get_cached_summary(session_id)
+
+    summary, summarized_until = chat_utils.get_session_summary(session_id)
+    # 요약 이후 메시지 수를 DB에서 복원 (워커 재시작 후에도 요약 주기 유지)
+    pending = len(chat_utils.get_messages_since(session_id, summarized_until, limit=chat_cache.MAX_UNSUMMARIZED_MESSAGES))
+    messages = chat_utils.get_last_messages(session_id, None, limit=max(chat_cache.MAX_MESSAGES, pending))
+    chat_cache.set_cached_messages(session_id, messages, summary, pending)
+    return messages, summary
+
+
+def format_context(summary, messages, last_k=None):
+    """
+    프롬프트용 대화 맥락 문자열 (요약 + 메시지). last_k가 없으면 캐시의 메시지(요약 이후 전체) 모두 사용
+    """
+    lines = []
+    if summary:
+        lines.append(f"[이전 대화 요약] {summary}")
+    messages = messages or []
+    if last_k:
+        messages = messages[-last_k:]
+    for m in messages:
+        lines.append(f"{m['role']}: {m['content']}")
+    return "\n".join(lines)
+
+
+def _summarize(previous_summary, new_messages):
+    conversation = "\n".join(f"{m['role']}: {m['content']}" for m in new_messages)
+    response = llm_gateway.call(
+        "openai", _get_summary_client().chat.completions.create,
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": f"정책 상담 대화를 {SUMMARY_MAX_CHARS}자 이내로 요약하세요. 사용자의 조건(나이/지역/상황)과 관심 정책, 이미 안내한 내용을 유지하세요."},
+            {"role": "user", "content": f"기존 요약: {previous_summary or '없음'}\n새 대화:\n{conversation}"}
+        ],
+        temperature=0
+    )
+    return response.choices[0].message.content.strip()[:SUMMARY_MAX_CHARS]
+
+
+def _refresh_summary(session_id):
+    try:
+        previous_summary, summarized_until = chat_utils.get_session_summary(session_id)
+        new_messages = chat_utils.get_messages_since(session_id, summarized_until)
+        if not new_messages:
+            return
+
+        summary = _summarize(previous_summary, new_messages)
+        chat_utils.update_session_summary(session_id, summary, new_messages[-1]["created_at"])
+        chat_cache.set_cached_summary(session_id, summary, len(new_messages))
+
+        print(f"[chat_history] summary updated session_id:{session_id}, messages:{len(new_messages)}")
+    except Exception as e:
+        print(f"[chat_history] summary exception {e}")
+    finally:
+        with _lock:
+            _in_progress.discard(session_id)
+
+
+def maybe_schedule_summary(session_id):
+    """
+    마지막 요약 이후 메시지가 N개 이상 쌓이면 백그라운드 요약 갱신 (응답 지연 없음)
+    """
+    if chat_cache.get_pending_count(session_id) < SUMMARY_EVERY_N_MESSAGES:
+        return
+
+    with _lock:
+        if session_id in _in_progress:
+            return
+        _in_progress.add(session_id)
+
+    _executor.submit(_refresh_summary, session_id)
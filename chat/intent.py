@@ -0,0 +1,138 @@
+"""
+챗봇 의도 분류 fast path
+- 첫 질문에서 지역명(area_codes) + 정책 도메인 명사 + 요청 신호어가 모두 있으면 LLM 없이 분류
+- "교육", "지원", "청년"처럼 정책 밖에서도 흔한 단어만으로는 fast path를 타지 않음
+- "<도> <시>"(예: 경기도 광주)는 광역시명보다 먼저 도 단위로 해석
+- 대화 이력이 있거나 확신이 없으면 None을 반환해 기존 LLM 분석(맥락 반영 검색어 보정)으로 위임
+"""
+import re
+import threading
+
+import site_admin.preprocess.codes as codes
+import site_admin.preprocess.sub_categories as sub_categories
+
+# 법정동코드 → 도단위 지역명 (출장소 등 행정 구분은 제외)
+REGION_NAMES = sorted(
+    {name for name in codes.area_codes.values() if "출장소" not in name},
+    key=len,
+    reverse=True,
+)
+
+# 정식 명칭 → area_codes 지역명
+REGION_ALIASES = {
+    "충청남도": "충남",
+    "충청북도": "충북",
+    "전라남도": "전남",
+    "전라북도": "전북",
+    "전북특별자치도": "전북",
+    "경상남도": "경남",
+    "경상북도": "경북",
+    "강원특별자치도": "강원",
+    "제주특별자치도": "제주",
+    "세종특별자치시": "세종",
+}
+
+# 정책 밖 일상 대화에서도 흔해 단독으로는 정책 질문 근거가 되지 않는 단어
+GENERIC_WORDS = {
+    "교육", "과정", "프로그램", "강의", "캠프", "연수", "수료", "아이디어", "지원", "청년", "사업",
+    "동기", "불안", "의욕", "자신감", "스트레스", "우울", "회복", "치유", "상담", "코칭", "정서", "쉬고", "고립",
+}
+
+# 정책 도메인 명사: 분류 규칙 키워드 + 지원금 신호어 + 주거/금융 정책 용어 (일반어 제외)
+POLICY_KEYWORDS = sorted(
+    ({kw for keywords in sub_categories.RULES.values() for kw in keywords}
+     | set(sub_categories.MONEY_SIGNAL_WORDS)
+     | {"정책", "월세", "주거", "전세", "대출", "청년정책", "지원사업"})
+    - GENERIC_WORDS,
+    key=len,
+    reverse=True,
+)
+
+# 정보를 찾는 요청 신호어
+INTENT_SIGNALS = [
+    "신청", "자격", "혜택", "조건", "대상", "방법", "기간", "서류", "알려", "추천", "찾아", "소개",
+    "있어", "있나", "있을까", "있는지", "뭐", "무엇", "어떤", "어떻게", "받을", "받고", "받는", "가능",
+]
+
+# 도 단위 지역명 (정식 명칭, 약칭, "약칭+도")
+PROVINCE_NAMES = sorted(
+    set(REGION_ALIASES)
+    | {name for name in REGION_NAMES if name in ("경기", "강원", "충남", "충북", "전남", "전북", "경남", "경북", "제주")}
+    | {"경기도", "강원도", "제주도"},
+    key=len,
+    reverse=True,
+)
+METRO_NAMES = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종"]
+# "경기도 광주", "경기 광주시"처럼 도 뒤에 오는 광역시명은 그 도의 시 이름이므로 도만 남김
+PROVINCE_CITY_RE = re.compile(rf"({'|'.join(PROVINCE_NAMES)})\s*(?:{'|'.join(METRO_NAMES)})")
+
+# 이전 대화를 가리키는 표현이 있으면 맥락 보정이 필요하므로 LLM으로 위임
+CONTEXT_REFERENCE_WORDS = ["그거", "그건", "그것", "이거", "이건", "거기", "아까", "방금", "위에", "그럼", "그러면"]
+
+MIN_QUERY_LENGTH = 4
+
+_lock = threading.Lock()
+_stats = {"total": 0, "fast_path": 0, "deferred": 0}
+
+
+def _find_regions(text: str) -> list[str]:
+    text = PROVINCE_CITY_RE.sub(lambda m: m.group(1), text)
+    found = []
+    for alias, name in REGION_ALIASES.items():
+        if alias in text and name not in found:
+            found.append(name)
+    for name in REGION_NAMES:
+        if name in text and name not in found:
+            found.append(name)
+    return found
+
+
+def _find_policy_keywords(text: str) -> list[str]:
+    lowered = text.lower()
+    return [kw for kw in POLICY_KEYWORDS if kw.lower() in lowered]
+
+
+def classify(user_query: str, has_history: bool = False) -> dict | None:
+    """
+    대화 이력이 없는 질문 중 지역명 + 정책 도메인 명사 + 요청 신호어가 모두 있는 질문만 로컬에서 분류.
+    반환값은 analyze_node의 LLM 결과와 같은 형태, 확신이 없으면 None
+    """
+    text = (user_query or "").strip()
+
+    result = None
+    if (
+        not has_history
+        and len(text) >= MIN_QUERY_LENGTH
+        and not any(w in text for w in CONTEXT_REFERENCE_WORDS)
+        and any(w in text for w in INTENT_SIGNALS)
+    ):
+        regions = _find_regions(text)
+        keywords = _find_policy_keywords(text)
+        if regions and keywords:
+            result = {
+                "is_policy": True,
+                "regions": regions,
+                "search_keyword": text,
+            }
+
+    with _lock:
+        _stats["total"] += 1
+        _stats["fast_path" if result else "deferred"] += 1
+
+    if result:
+        print(f"[intent] fast path regions:{result['regions']}, query:{text}")
+    return result
+
+
+def get_stats():
+    """
+    fast path 적중 비율 반환
+    """
+    with _lock:
+        total = _stats["total"]
+        return {
+            "total": total,
+            "fast_path": _stats["fast_path"],
+            "deferred": _stats["deferred"],
+            "fast_path_rate": round(_stats["fast_path"] / total, 4) if total else 0.0,
+        }
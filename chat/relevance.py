@@ -0,0 +1,110 @@
+"""
+챗봇 검색 결과 관련성 로컬 검증
+- 이미 가진 메타데이터(지역, 연도, 신청기간 상태)와 벡터 점수/마진으로 YES/NO 판정
+- 점수가 애매한 구간에서 판단 근거가 부족할 때만 None을 반환해 LLM 검증으로 위임
+"""
+import re
+import threading
+from datetime import datetime
+
+ACCEPT_SCORE = 0.75   # 이 점수 이상이면 메타데이터 충돌이 없는 한 YES
+REJECT_SCORE = 0.6    # 이 점수 미만이면 NO (웹 검색)
+MIN_SCORE_MARGIN = 0.03  # 애매 구간에서 1위와 5위 점수 차가 이 이상이면 뚜렷한 매칭으로 간주
+
+NATIONWIDE_TOKENS = ["전국", "중앙", "국가"]
+YEAR_PATTERN = re.compile(r"(20\d{2})\s*년?")
+NO_END_DATE = "99991231"
+
+_lock = threading.Lock()
+_stats = {"total": 0, "local_yes": 0, "local_no": 0, "llm": 0}
+
+
+def _is_nationwide(region: str) -> bool:
+    return any(token in (region or "") for token in NATIONWIDE_TOKENS)
+
+
+def _specific_regions(target_regions) -> list[str]:
+    return [r for r in (target_regions or []) if r and not _is_nationwide(r)]
+
+
+def _matches_region(item: dict, regions: list[str]) -> bool:
+    item_regions = item.get("regions") or [item.get("region", "")]
+    return any(reg in r for reg in regions for r in item_regions) or any(reg in item.get("title", "") for reg in regions)
+
+
+def _matches_year(item: dict, years: list[str]) -> bool:
+    dates = item.get("dates") or {}
+    haystack = " ".join([
+        item.get("title", ""),
+        str(item.get("content") or "")[:500],
+        str(dates.get("apply_period_start") or ""),
+        str(dates.get("apply_period_end") or ""),
+        str(dates.get("apply_period") or ""),
+    ])
+    return any(year in haystack for year in years)
+
+
+def _is_closed(item: dict, today_str: str) -> bool:
+    dates = item.get("dates")
+    if not dates:
+        return False
+    if dates.get("apply_period_type") == "마감":
+        return True
+    end = str(dates.get("apply_period_end") or "").strip()
+    return bool(end) and end != NO_END_DATE and end < today_str
+
+
+def _judge(user_query, target_regions, top_5, max_score, score_margin):
+    if not top_5 or max_score < REJECT_SCORE:
+        return False
+
+    # 1. 연도: 질문에 연도가 있는데 어떤 결과에도 해당 연도 흔적이 없으면 NO
+    years = YEAR_PATTERN.findall(user_query or "")
+    if years and not any(_matches_year(item, years) for item in top_5):
+        return False
+
+    # 2. 신청기간: 결과가 모두 마감된 정책이면 최신 정보가 필요하므로 NO
+    today_str = datetime.now().strftime("%Y%m%d")
+    if all(_is_closed(item, today_str) for item in top_5):
+        return False
+
+    # 3. 지역: 특정 지역을 물었으면 해당 지역 결과가 하나는 있어야 확신 가능
+    regions = _specific_regions(target_regions)
+    region_ok = not regions or any(_matches_region(item, regions) for item in top_5)
+
+    if max_score >= ACCEPT_SCORE:
+        return True if region_ok else None
+
+    # 애매한 점수 구간: 지역이 맞고 상위 결과가 뚜렷하게 앞서면 YES, 아니면 LLM에 위임
+    if region_ok and regions and score_margin >= MIN_SCORE_MARGIN:
+        return True
+    return None
+
+
+def verify(user_query, target_regions, top_5, max_score, score_margin=0.0):
+    """
+    관련성 판정. True(YES) / False(NO) / None(LLM 검증 필요)
+    """
+    verdict = _judge(user_query, target_regions, top_5, max_score, score_margin)
+
+    with _lock:
+        _stats["total"] += 1
+        if verdict is None:
+            _stats["llm"] += 1
+        else:
+            _stats["local_yes" if verdict else "local_no"] += 1
+
+    return verdict
+
+
+def get_stats():
+    """
+    로컬 판정 비율 반환
+    """
+    with _lock:
+        total = _stats["total"]
+        local = _stats["local_yes"] + _stats["local_no"]
+        return {
+            **_stats,
+            "local_rate": round(local / total, 4) if total else 0.0,
+        }
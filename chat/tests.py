@@ -1,3 +1,88 @@
-from django.test import TestCase
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from chat import web_search
+from chat.web_search import CircuitBreaker, FakeTavilyClient
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """
+    웹 검색 서킷 브레이커 상태 전이 (closed -> open -> half_open -> closed)
+    시간은 web_search 모듈의 time.monotonic을 고정 값으로 바꿔 진행
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        # asyncio 이벤트 루프 시계는 그대로 두고 web_search 모듈의 time만 교체
+        clock = SimpleNamespace(monotonic=lambda: self.now, time=time.time, sleep=time.sleep)
+        patcher = mock.patch.object(web_search, "time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = FakeTavilyClient(fail=True)
+        web_search.set_client(self.client)
+        web_search._breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        self.addCleanup(web_search.set_client, None)
+
+    def search(self, keyword):
+        return asyncio.run(web_search.search(keyword))
+
+    def test_open_half_open_closed(self):
+        breaker = web_search._breaker
+
+        # 연속 실패가 임계값에 닿으면 open
+        for i in range(3):
+            self.assertIsNone(self.search(f"실패 {i}"))
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(self.client.calls, 3)
+
+        # open 동안은 클라이언트를 호출하지 않음
+        self.assertIsNone(self.search("차단"))
+        self.assertEqual(self.client.calls, 3)
+
+        # reset_seconds가 지나면 half_open: 시험 호출 1건만 허용
+        self.now += 60
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        # 시험 호출 성공 -> closed
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.client.fail = False
+        self.assertIsNotNone(self.search("복구"))
+        self.assertEqual(self.client.calls, 4)
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = web_search._breaker
+        for i in range(3):
+            self.search(f"실패 {i}")
+
+        self.now += 60
+        self.assertIsNone(self.search("시험 호출"))
+        self.assertEqual(self.client.calls, 4)
+        self.assertEqual(breaker.state, "open")
+
+        # 다시 reset_seconds 동안 차단
+        self.now += 30
+        self.assertFalse(breaker.allow())
+        self.now += 30
+        self.assertTrue(breaker.allow())
+
+    def test_lost_probe_is_retried_after_reset(self):
+        breaker = web_search._breaker
+        for i in range(3):
+            self.search(f"실패 {i}")
+
+        # 결과가 기록되지 않은(취소된) 시험 호출은 reset_seconds 뒤 다시 허용
+        self.now += 60
+        self.assertTrue(breaker.allow())
+        self.now += 59
+        self.assertFalse(breaker.allow())
+        self.now += 1
+        self.assertTrue(breaker.allow())
@@ -6,4 +6,5 @@ urlpatterns = [
     path("", views.chat, name="chat"),
     path("api/chat_init", views.chat_init, name="chat_init"),
     path("api/chat_response", views.chat_response, name="chat_response"),
+    path("api/chat_stats", views.chat_stats, name="chat_stats"),
 ]
\ No newline at end of file
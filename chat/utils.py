@@ -1,27 +1,38 @@
-
-
 from datetime import datetime
 
 from bson import ObjectId
-from utils.db import getMongoDbClient
+from pymongo import ASCENDING, DESCENDING
+from utils.db import getMongoDbClient, ensure_index
+
+HISTORY_LIMIT = 20
+
+def _get_messages_collection():
+    db = getMongoDbClient()
+    chat_messages_coll = db['chat_messages']
+    # 세션별 최근 메시지 조회를 인덱스 한 번으로 처리
+    ensure_index(chat_messages_coll, [("session_id", ASCENDING), ("created_at", DESCENDING)])
+    return chat_messages_coll
 
-# 처음 로딩시 과거 대화 내역 가져오기
-def get_chat_history(user_id):
+def _get_sessions_collection():
+    db = getMongoDbClient()
+    chat_sessions_coll = db['chat_sessions']
+    ensure_index(chat_sessions_coll, [("user_id", ASCENDING), ("started_at", DESCENDING)])
+    return chat_sessions_coll
 
-    chat_history = []
-    # TODO: 과거 대화 내역 가져오는 로직 추가
+# 처음 로딩시 현재 세션의 과거 대화 내역 가져오기
+def get_chat_history(session_id, limit=HISTORY_LIMIT):
+    if not session_id:
+        return []
 
-    return chat_history
+    return get_last_messages(session_id, None, limit=limit)
 
 # 캐시에 메세지 없을 때 과거 대화 내역 가져와서 캐시에 저장
 def get_last_messages(session_id, user_id, limit=6):
-    # TODO: 과거 대화 내역 가져오는 로직 추가
-    
-    db = getMongoDbClient()
-    chat_messages_coll = db['chat_messages']
+    chat_messages_coll = _get_messages_collection()
 
     messages_cursor = chat_messages_coll.find(
-        {"session_id": ObjectId(session_id)}
+        {"session_id": ObjectId(session_id)},
+        {"_id": 0, "role": 1, "content": 1}
     ).sort("created_at", -1).limit(limit)
 
     messages = []
@@ -34,17 +45,58 @@ def get_last_messages(session_id, user_id, limit=6):
     messages.reverse()  # 시간 순서대로 정렬
     return messages
 
+# 요약 이후에 추가된 메시지 조회 (요약 갱신용)
+def get_messages_since(session_id, since, limit=50):
+    chat_messages_coll = _get_messages_collection()
+
+    query = {"session_id": ObjectId(session_id)}
+    if since:
+        query["created_at"] = {"$gt": since}
+
+    messages_cursor = chat_messages_coll.find(
+        query,
+        {"_id": 0, "role": 1, "content": 1, "created_at": 1}
+    ).sort("created_at", 1).limit(limit)
+
+    return list(messages_cursor)
+
+# 세션 요약 조회
+def get_session_summary(session_id):
+    chat_sessions_coll = _get_sessions_collection()
+
+    session = chat_sessions_coll.find_one(
+        {"_id": ObjectId(session_id)},
+        {"summary": 1, "summarized_until": 1}
+    )
+    if not session:
+        return "", None
+
+    return session.get("summary") or "", session.get("summarized_until")
+
+# 세션 요약 저장
+def update_session_summary(session_id, summary, summarized_until):
+    chat_sessions_coll = _get_sessions_collection()
+
+    chat_sessions_coll.update_one(
+        {"_id": ObjectId(session_id)},
+        {"$set": {
+            "summary": summary,
+            "summarized_until": summarized_until,
+            "summary_updated_at": datetime.now()
+        }}
+    )
+
 
 # 세션 DB 저장
 def insert_session(user_id):
-    db = getMongoDbClient()
-    chat_sessions_coll = db['chat_sessions']
+    chat_sessions_coll = _get_sessions_collection()
 
     session_document ={
         "user_id": user_id,
         "started_at": datetime.now(),
         "ended_at": None, # 상담 종료 시 업데이트 필요
         "summary": "",
+        "summarized_until": None, # 요약에 반영된 마지막 메시지 시각
         "ended_reason": ""
     }
 
@@ -54,8 +106,7 @@ def insert_session(user_id):
 
 # 메시지 DB 저장
 def insert_message(session_id, role, content):
-    db = getMongoDbClient()
-    chat_messages_coll = db['chat_messages']
+    chat_messages_coll = _get_messages_collection()
     message_document = {
         "session_id": ObjectId(session_id),
         "role": role,
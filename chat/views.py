@@ -6,6 +6,14 @@ from asgiref.sync import sync_to_async  # 장고 세션/DB 안전 처리를 위
 import chat.utils as chat_utils
 import chat.cache as chat_cache
 import chat.chatbot as chatbot
+import chat.answer_cache as answer_cache
+import chat.intent as intent
+import chat.relevance as relevance
+import chat.web_search as web_search
+import chat.history as chat_history
+import survey.profile as profile_service
+from utils.llm_gateway import LLMGatewayBusy
+from utils.auth import staff_required
 import asyncio
 
 USER_ID = 'test_user'
@@ -16,10 +24,23 @@ def chat(request):
 @csrf_exempt
 def chat_init(request):
     try:
-        return JsonResponse({"status": "success", "data": []}, json_dumps_params={'ensure_ascii': False}, safe=False)
+        history = chat_utils.get_chat_history(request.session.get("session_id"))
+        return JsonResponse({"status": "success", "data": history}, json_dumps_params={'ensure_ascii': False}, safe=False)
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
 
+@staff_required
+def chat_stats(request):
+    # 챗봇 파이프라인 지표: 시맨틱 답변 캐시 적중률/유사도 분포, 의도 분류 fast path 비율,
+    # 로컬 관련성 판정 비율, 웹 검색 캐시/서킷 브레이커 상태
+    data = {
+        "answer_cache": answer_cache.get_stats(),
+        "intent": intent.get_stats(),
+        "relevance": relevance.get_stats(),
+        "web_search": web_search.get_stats(),
+    }
+    return JsonResponse({"status": "success", "data": data}, json_dumps_params={'ensure_ascii': False})
+
 @csrf_exempt
 async def chat_response(request):
     body_unicode = request.body.decode('utf-8')
@@ -40,25 +61,32 @@ async def chat_response(request):
 
         # 2. sync_to_async를 사용하여 세션 작업 수행
         session_id = await sync_to_async(get_or_create_session)()
+        profile = await sync_to_async(profile_service.get_request_profile)(request)
 
-        # 3. DB 및 캐시 작업 (기존 방식 유지하되 안전하게 실행)
+        # 3. 캐시 미스 시 최근 메시지 + 세션 요약 복원 후 DB 및 캐시 작업
+        await asyncio.to_thread(chat_history.load_context, session_id)
         await asyncio.to_thread(chat_utils.insert_message, session_id, 'user', user_input)
         await asyncio.to_thread(chat_cache.append_message, session_id, "user", user_input)
 
         messages = await asyncio.to_thread(chat_cache.get_cached_messages, session_id)
+        summary = chat_cache.get_cached_summary(session_id)
 
         # 4. LLM 호출 (비동기 병렬 처리의 핵심)
-        ai_response = await chatbot.get_AI_response(messages)
+        ai_response = await chatbot.get_AI_response(messages, summary=summary, profile=profile)
 
-        # 5. DB 및 캐시에 결과 저장
+        # 5. DB 및 캐시에 결과 저장, 필요 시 백그라운드 요약 갱신
         await asyncio.to_thread(chat_utils.insert_message, session_id, "assistant", ai_response)
         await asyncio.to_thread(chat_cache.append_message, session_id, "assistant", ai_response)
+        chat_history.maybe_schedule_summary(session_id)
 
         return JsonResponse({
             "status": "success", 
             "data": {"answer": ai_response}
         }, json_dumps_params={'ensure_ascii': False}, safe=False)
 
+    except LLMGatewayBusy as e:
+        print(f"Busy in chat_response: {e}")
+        return JsonResponse({"status": "error", "message": "상담 요청이 많아 잠시 후 다시 시도해 주세요."}, status=503)
     except Exception as e:
         print(f"Error in chat_response: {e}")
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+챗봇 실시간 웹 검색 (Tavily) 래퍼
+- (검색어, 시간 버킷) 단위 결과 캐시
+- 하드 타임아웃 + 서킷 브레이커: 외부 서비스가 느리거나 실패하면 None을 반환해
+  내부 DB 기반 답변으로 대체
+- TAVILY_FAKE=1 또는 set_client()로 로컬 가짜 클라이언트 사용 가능 (테스트/벤치마크용)
+"""
+import asyncio
+import os
+import threading
+import time
+
+from tavily import TavilyClient
+
+WEB_SEARCH_TIMEOUT = float(os.getenv("TAVILY_TIMEOUT", "3.0"))  # 초
+CACHE_BUCKET_SECONDS = int(os.getenv("TAVILY_CACHE_BUCKET", "3600"))  # 같은 버킷 안에서는 같은 결과 재사용
+CACHE_MAX_ENTRIES = 1000
+BREAKER_FAILURE_THRESHOLD = 3   # 연속 실패(타임아웃 포함) 횟수
+BREAKER_RESET_SECONDS = 60      # open 상태 유지 시간. 이후 한 번 시험 호출(half-open)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 임계값을 넘으면 일정 시간 호출을 차단
+    - closed: 모두 허용
+    - open: reset_seconds 동안 모두 거절
+    - half_open: 시험 호출 1건만 허용하고 결과가 기록될 때까지 나머지는 거절
+      (성공하면 closed, 실패하면 다시 open. 결과 없이 reset_seconds가 지나면 시험 호출을 다시 허용)
+    """
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "open":
+                return False
+            now = time.monotonic()
+            if self.probe_started_at is not None and now - self.probe_started_at < self.reset_seconds:
+                return False
+            self.probe_started_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                # half-open 시험 호출 실패 시에도 다시 open
+                self.opened_at = time.monotonic()
+                self.probe_started_at = None
+
+
+class FakeTavilyClient:
+    """
+    네트워크 없이 동작하는 Tavily 대체 클라이언트 (지연/실패 설정 가능)
+    """
+    def __init__(self, latency=0.0, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def search(self, query, max_results=3, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("fake tavily failure")
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"{query} 관련 정책 안내 {i + 1}",
+                    "url": f"https://example.com/policy/{i + 1}",
+                    "content": f"{query}에 대한 가짜 검색 결과입니다.",
+                }
+                for i in range(max_results)
+            ],
+        }
+
+
+_client = None
+_breaker = CircuitBreaker()
+_cache = {}  # (keyword, max_results, bucket) -> result
+_lock = threading.Lock()
+_stats = {"requests": 0, "cache_hits": 0, "calls": 0, "timeouts": 0, "errors": 0, "short_circuited": 0}
+
+
+def get_client():
+    global _client
+    if _client is None:
+        if os.getenv("TAVILY_FAKE", "0") == "1":
+            _client = FakeTavilyClient(latency=float(os.getenv("TAVILY_FAKE_LATENCY", "0")))
+        else:
+            _client = TavilyClient(api_key=os.getenv('TAVILY_API_KEY'))
+    return _client
+
+
+def set_client(client):
+    """
+    클라이언트 교체 (테스트에서 FakeTavilyClient 주입용). 캐시와 브레이커도 초기화
+    """
+    global _client, _breaker
+    _client = client
+    _breaker = CircuitBreaker()
+    with _lock:
+        _cache.clear()
+
+
+def _cache_key(keyword, max_results):
+    normalized = " ".join((keyword or "").split()).lower()
+    return (normalized, max_results, int(time.time() // CACHE_BUCKET_SECONDS))
+
+
+def _cache_put(key, value):
+    with _lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            # 이전 시간 버킷 항목부터 정리, 그래도 많으면 전체 비움
+            current_bucket = key[2]
+            for old_key in [k for k in _cache if k[2] != current_bucket]:
+                _cache.pop(old_key, None)
+            if len(_cache) >= CACHE_MAX_ENTRIES:
+                _cache.clear()
+        _cache[key] = value
+
+
+async def search(keyword, max_results=3):
+    """
+    웹 검색 결과 반환. 타임아웃/실패/차단 시 None (호출 측에서 내부 DB 답변으로 대체)
+    """
+    key = _cache_key(keyword, max_results)
+
+    with _lock:
+        _stats["requests"] += 1
+        cached = _cache.get(key)
+        if cached is not None:
+            _stats["cache_hits"] += 1
+            return cached
+
+    if not _breaker.allow():
+        with _lock:
+            _stats["short_circuited"] += 1
+        print(f"[web_search] circuit open, skip keyword:{keyword}")
+        return None
+
+    client = get_client()
+    try:
+        with _lock:
+            _stats["calls"] += 1
+        result = await asyncio.wait_for(
+            asyncio.to_thread(client.search, query=keyword, max_results=max_results),
+            timeout=WEB_SEARCH_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        _breaker.record_failure()
+        with _lock:
+            _stats["timeouts"] += 1
+        print(f"[web_search] timeout({WEB_SEARCH_TIMEOUT}s) keyword:{keyword}")
+        return None
+    except Exception as e:
+        _breaker.record_failure()
+        with _lock:
+            _stats["errors"] += 1
+        print(f"[web_search] exception {e}")
+        return None
+
+    _breaker.record_success()
+    _cache_put(key, result)
+    return result
+
+
+def get_stats():
+    with _lock:
+        return {**_stats, "breaker_state": _breaker.state, "cached": len(_cache)}
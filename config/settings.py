@@ -34,6 +34,8 @@ AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME")
 
 # 로그인
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+# Google 공개키(JWKS) 파일 경로. 지정하면 네트워크 대신 이 파일로 ID Token 서명 검증 (테스트/오프라인용)
+GOOGLE_JWKS_FILE = os.getenv("GOOGLE_JWKS_FILE")
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -71,6 +73,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.auth.JWTAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -16,12 +16,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
-from .views import health_check
+from .views import health_check, llm_gateway_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include("main.urls")),
     path("health/", health_check),
+    path("health/llm/", llm_gateway_stats),
     path('survey/', include("survey.urls")),
     path('policy/', include("policy.urls")),
     path('chat/', include("chat.urls")),
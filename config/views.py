@@ -1,4 +1,11 @@
 from django.http import JsonResponse
+from utils import llm_gateway
+from utils.auth import staff_required
 
 def health_check(request):
-    return JsonResponse({"status": "ok"}, status=200)
\ No newline at end of file
+    return JsonResponse({"status": "ok"}, status=200)
+
+@staff_required
+def llm_gateway_stats(request):
+    # provider별 동시 호출/대기 시간/거절/중복 제거 지표
+    return JsonResponse({"status": "ok", "data": llm_gateway.get_stats()}, status=200)
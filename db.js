@@ -95,6 +95,25 @@ var Vector_Search_Index = [
       ],
     },
   },
+  {
+    // 검색/챗봇(v2), 설문 추천(v3) 공용. filter 필드는 search/prefilter.py FILTER_FIELDS와 동일하게 유지
+    name: "vector_index_v2",
+    type: "vectorSearch",
+    definition: {
+      fields: [
+        { type: "vector", path: "embedding_gemini_v2", numDimensions: 3072, similarity: "cosine" },
+        { type: "vector", path: "embedding_gemini_v3", numDimensions: 3072, similarity: "cosine" },
+        { type: "filter", path: "metadata.region" },
+        { type: "filter", path: "metadata.job_type" },
+        { type: "filter", path: "metadata.category_tokens" },
+        { type: "filter", path: "metadata.sub_category" },
+        { type: "filter", path: "metadata.age_min" },
+        { type: "filter", path: "metadata.age_max" },
+        { type: "filter", path: "metadata.apply_period_type" },
+        { type: "filter", path: "metadata.apply_end" },
+      ],
+    },
+  },
 ];
 
 var fit_policy = {
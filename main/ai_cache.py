@@ -0,0 +1,391 @@
+"""
+정책별 AI 생성 결과 read-through 캐시 (정책 요약, 자격 시뮬레이션 질문, 서류별 작성 질문)
+- 캐시 미스 시 항목 단위 Mongo 리스(lease)로 한 워커만 생성하고 나머지는 결과를 기다림 (single-flight)
+- 생성 결과는 캐시 컬렉션에 write-back
+- 정책 modified_at 또는 프롬프트 버전이 바뀌면 무효화. 이전 결과는 바로 반환하고 백그라운드에서 재생성
+  (stale-while-revalidate)
+- ttl이 지정된 종류는 expires_at TTL 인덱스로 만료
+- 관리자가 수정한 항목(is_edited)은 자동 재생성으로 덮어쓰지 않음
+- async 뷰는 aget_or_generate()로 대기 중 스레드를 점유하지 않음
+- warm_policies()로 전체 정책을 제한된 동시성으로 미리 생성 (관리 명령/수집 후처리용)
+"""
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from main import policy_ai
+from utils.db import getMongoDbClient, ensure_index
+
+LEASE_COLLECTION = "policy_ai_cache_lease"
+LEASE_SECONDS = int(os.getenv("POLICY_AI_LEASE_SECONDS", "60"))  # 생성 워커가 죽어도 이 시간 뒤 다른 워커가 생성
+POLL_INTERVAL = 0.3   # 초. 다른 워커의 생성 결과를 기다릴 때 조회 간격
+WAIT_TIMEOUT = float(os.getenv("POLICY_AI_WAIT_TIMEOUT", "30"))  # 초. 넘기면 직접 생성
+REFRESH_WORKERS = 2
+
+# collection: 캐시 컬렉션, field: 생성 결과 필드, generate: 생성 함수
+# key_field/sub_keys: 정책 하나에 여러 항목을 캐싱할 때 하위 키 필드와 정책별 하위 키 목록 함수
+# prompt_version: 프롬프트를 바꾸면 올려서 기존 캐시 무효화, ttl: 만료 시간(초)
+CACHE_KINDS = {
+    "summary": {
+        "collection": "policy_summary_cache",
+        "field": "items",
+        "generate": policy_ai.generate_policy_summary,
+        "prompt_version": policy_ai.SUMMARY_PROMPT_VERSION,
+    },
+    "simulation": {
+        "collection": "policy_simulation_cache",
+        "field": "questions",
+        "generate": policy_ai.generate_policy_simulation,
+    },
+    "form_fields": {
+        "collection": "policy_form_field_cache",
+        "field": "fields",
+        "generate": policy_ai.generate_form_fields,
+        "key_field": "doc_name",
+        "sub_keys": policy_ai.get_ai_document_names,
+        "prompt_version": policy_ai.FORM_FIELDS_PROMPT_VERSION,
+        "ttl": int(os.getenv("POLICY_FORM_FIELDS_TTL", str(30 * 24 * 3600))),
+    },
+}
+
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="policy-ai-refresh")
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "waited": 0, "generated": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def get_spec(kind):
+    spec = CACHE_KINDS.get(kind)
+    if spec is None:
+        raise ValueError(f"등록되지 않은 캐시 종류입니다: {kind}")
+    return spec
+
+
+def get_cache_collection(spec):
+    db = getMongoDbClient()
+    coll = db[spec["collection"]]
+    if spec.get("key_field"):
+        ensure_index(coll, [("policy_id", ASCENDING), (spec["key_field"], ASCENDING)], unique=True)
+    else:
+        ensure_index(coll, [("policy_id", ASCENDING)], unique=True)
+    if spec.get("ttl"):
+        ensure_index(coll, [("expires_at", ASCENDING)], expireAfterSeconds=0)
+    return coll
+
+
+def _get_lease_collection():
+    db = getMongoDbClient()
+    coll = db[LEASE_COLLECTION]
+    # 만료된 리스는 Mongo TTL 모니터가 정리
+    ensure_index(coll, [("expires_at", ASCENDING)], expireAfterSeconds=0)
+    return coll
+
+
+def policy_version(policy):
+    """
+    캐시 무효화 기준값 (정책 최종 수정일, 없으면 DB 갱신 시각)
+    """
+    return str(policy.get("modified_at") or policy.get("updated_at") or "")
+
+
+def _cache_filter(spec, policy, sub_key=None):
+    query = {"policy_id": policy["policy_id"]}
+    if spec.get("key_field"):
+        query[spec["key_field"]] = sub_key
+    return query
+
+
+def _lease_id(spec, policy, sub_key=None):
+    if spec.get("key_field"):
+        return f"{spec['collection']}:{policy['policy_id']}:{sub_key}"
+    return f"{spec['collection']}:{policy['policy_id']}"
+
+
+def _has_payload(doc, spec):
+    return bool(doc) and isinstance(doc.get(spec["field"]), list)
+
+
+def _is_expired(doc):
+    # TTL 모니터는 주기적으로 돌기 때문에 조회 시점에도 한 번 더 확인
+    expires_at = doc.get("expires_at")
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+def _is_fresh(doc, spec, policy):
+    if not _has_payload(doc, spec):
+        return False
+    if doc.get("is_edited"):
+        return True
+    if _is_expired(doc):
+        return False
+    if doc.get("prompt_version") != spec.get("prompt_version"):
+        return False
+    cached_version = doc.get("policy_version")
+    # 버전 정보가 없는 기존 캐시는 그대로 사용 (prewarm 시 버전과 함께 재생성)
+    return cached_version is None or cached_version == policy_version(policy)
+
+
+def _acquire_lease(lease_id):
+    """
+    리스 획득 시 토큰 반환, 다른 워커가 보유 중이면 None
+    """
+    now = datetime.now(timezone.utc)
+    token = uuid.uuid4().hex
+    try:
+        _get_lease_collection().update_one(
+            {"_id": lease_id, "expires_at": {"$lt": now}},
+            {"$set": {"token": token, "expires_at": now + timedelta(seconds=LEASE_SECONDS)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # 만료되지 않은 리스가 이미 있어 upsert가 같은 _id로 insert를 시도한 경우
+        return None
+    return token
+
+
+def _release_lease(lease_id, token):
+    try:
+        _get_lease_collection().delete_one({"_id": lease_id, "token": token})
+    except Exception as e:
+        print(f"[ai_cache] release lease exception {e}")
+
+
+def _is_lease_held(lease_id):
+    now = datetime.now(timezone.utc)
+    return _get_lease_collection().count_documents({"_id": lease_id, "expires_at": {"$gte": now}}, limit=1) > 0
+
+
+def _generate_and_store(spec, policy, sub_key=None, overwrite_edited=False):
+    if spec.get("key_field"):
+        payload = spec["generate"](policy, sub_key)
+    else:
+        payload = spec["generate"](policy)
+
+    doc = {
+        **_cache_filter(spec, policy, sub_key),
+        "policy_name": policy.get("policy_name", ""),
+        **payload,
+        "policy_version": policy_version(policy),
+        "prompt_version": spec.get("prompt_version"),
+        "generated_at": datetime.now(),
+        "is_edited": False,
+    }
+    if spec.get("ttl"):
+        doc["expires_at"] = datetime.now(timezone.utc) + timedelta(seconds=spec["ttl"])
+
+    query = _cache_filter(spec, policy, sub_key)
+    if not overwrite_edited:
+        query["is_edited"] = {"$ne": True}
+
+    try:
+        get_cache_collection(spec).update_one(
+            query,
+            {"$set": doc},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # 생성 중에 관리자가 수정한 경우. 수정본 유지
+        pass
+
+    _count("generated")
+    return doc
+
+
+def _refresh_in_background(spec, policy, sub_key, lease_id, token):
+    try:
+        _generate_and_store(spec, policy, sub_key)
+    except Exception as e:
+        _count("errors")
+        print(f"[ai_cache] refresh exception policy_id:{policy.get('policy_id')}, {e}")
+    finally:
+        _release_lease(lease_id, token)
+
+
+def _lookup(spec, policy, sub_key=None):
+    """
+    캐시 조회, 미스면 리스를 잡아 직접 생성
+    반환: (doc, source). 다른 워커가 생성 중이면 (None, None) -> 호출 측에서 대기
+    """
+    coll = get_cache_collection(spec)
+    doc = coll.find_one(_cache_filter(spec, policy, sub_key), {"_id": 0})
+    if _is_fresh(doc, spec, policy):
+        _count("hits")
+        return doc, "cache"
+
+    lease_id = _lease_id(spec, policy, sub_key)
+
+    # 정책/프롬프트가 바뀐 경우: 이전 결과를 반환하고 재생성은 백그라운드로
+    if _has_payload(doc, spec) and not _is_expired(doc):
+        _count("stale_hits")
+        token = _acquire_lease(lease_id)
+        if token:
+            _refresh_executor.submit(_refresh_in_background, spec, policy, sub_key, lease_id, token)
+        return doc, "stale"
+
+    _count("misses")
+    token = _acquire_lease(lease_id)
+    if token:
+        try:
+            return _generate_and_store(spec, policy, sub_key), "generated"
+        finally:
+            _release_lease(lease_id, token)
+
+    _count("waited")
+    return None, None
+
+
+def _poll(spec, policy, sub_key=None):
+    """
+    다른 워커의 생성 결과 확인 1회. 반환: (doc, done)
+    done=True이고 doc이 None이면 생성 워커가 리스를 놓은 것 (실패) -> 직접 생성
+    """
+    doc = get_cache_collection(spec).find_one(_cache_filter(spec, policy, sub_key), {"_id": 0})
+    if _is_fresh(doc, spec, policy):
+        return doc, True
+    return None, not _is_lease_held(_lease_id(spec, policy, sub_key))
+
+
+def get_or_generate(kind, policy, sub_key=None):
+    """
+    캐시된 결과 반환, 없으면 single-flight로 생성 후 write-back
+    반환: (doc, source)  source: cache | stale | cache_wait | generated
+    """
+    spec = get_spec(kind)
+    doc, source = _lookup(spec, policy, sub_key)
+    if source:
+        return doc, source
+
+    # 다른 워커가 생성 중이면 결과가 저장될 때까지 대기
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        doc, done = _poll(spec, policy, sub_key)
+        if doc is not None:
+            return doc, "cache_wait"
+        if done:
+            break
+
+    # 생성 워커가 실패했거나 너무 오래 걸리면 직접 생성
+    return _generate_and_store(spec, policy, sub_key), "generated"
+
+
+async def aget_or_generate(kind, policy, sub_key=None):
+    """
+    get_or_generate의 async 뷰용 버전
+    DB 조회/생성만 스레드에서 실행하고, 다른 워커의 생성을 기다리는 동안은 스레드를 점유하지 않음
+    """
+    spec = get_spec(kind)
+    doc, source = await asyncio.to_thread(_lookup, spec, policy, sub_key)
+    if source:
+        return doc, source
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        doc, done = await asyncio.to_thread(_poll, spec, policy, sub_key)
+        if doc is not None:
+            return doc, "cache_wait"
+        if done:
+            break
+
+    return await asyncio.to_thread(_generate_and_store, spec, policy, sub_key), "generated"
+
+
+def regenerate(kind, policy, sub_key=None):
+    """
+    관리자 요청으로 즉시 재생성 (수동 수정본도 덮어씀)
+    """
+    spec = get_spec(kind)
+    lease_id = _lease_id(spec, policy, sub_key)
+    token = _acquire_lease(lease_id)
+    try:
+        return _generate_and_store(spec, policy, sub_key, overwrite_edited=True)
+    finally:
+        if token:
+            _release_lease(lease_id, token)
+
+
+def warm_policies(kind, policies, concurrency=4, force=False):
+    """
+    정책 목록의 캐시를 미리 생성 (이미 최신이면 건너뜀)
+    반환: {"generated": n, "skipped": n, "failed": n}
+    """
+    spec = get_spec(kind)
+    coll = get_cache_collection(spec)
+    result = {"generated": 0, "skipped": 0, "failed": 0}
+    projection = {"_id": 0, spec["field"]: 1, "policy_version": 1, "prompt_version": 1,
+                  "expires_at": 1, "is_edited": 1}
+
+    targets = []
+    for policy in policies:
+        if not policy.get("policy_id"):
+            continue
+        sub_keys = spec["sub_keys"](policy) if spec.get("key_field") else [None]
+        for sub_key in sub_keys:
+            doc = coll.find_one(_cache_filter(spec, policy, sub_key), projection)
+            if doc and doc.get("is_edited"):
+                result["skipped"] += 1
+                continue
+            if not force and _is_fresh(doc, spec, policy) and doc.get("policy_version") is not None:
+                result["skipped"] += 1
+                continue
+            targets.append((policy, sub_key))
+
+    def _warm_one(policy, sub_key):
+        lease_id = _lease_id(spec, policy, sub_key)
+        token = _acquire_lease(lease_id)
+        if not token:
+            return "skipped"  # 다른 워커가 생성 중
+        try:
+            _generate_and_store(spec, policy, sub_key)
+            return "generated"
+        finally:
+            _release_lease(lease_id, token)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="policy-ai-warm") as executor:
+        futures = {executor.submit(_warm_one, policy, sub_key): (policy, sub_key) for policy, sub_key in targets}
+        for future in as_completed(futures):
+            policy, sub_key = futures[future]
+            try:
+                result[future.result()] += 1
+            except Exception as e:
+                result["failed"] += 1
+                _count("errors")
+                print(f"[ai_cache] warm exception policy_id:{policy.get('policy_id')}, {sub_key}, {e}")
+
+    return result
+
+
+def warm_policies_in_background(policies, kinds=None):
+    """
+    새로 수집한 정책 캐시를 응답 지연 없이 백그라운드에서 생성
+    """
+    def _run():
+        for kind in kinds or CACHE_KINDS:
+            try:
+                result = warm_policies(kind, policies, concurrency=REFRESH_WORKERS)
+                print(f"[ai_cache] warm {kind}: {result}")
+            except Exception as e:
+                print(f"[ai_cache] warm exception {kind}, {e}")
+
+    threading.Thread(target=_run, name="policy-ai-warm-ingest", daemon=True).start()
+
+
+def get_stats():
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main import ai_cache
+from utils.db import getMongoDbClient
+
+
+class Command(BaseCommand):
+    help = "정책별 AI 생성 결과(요약, 자격 시뮬레이션 질문) 캐시를 미리 생성합니다. 이미 최신인 항목은 건너뜁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", action="append", choices=sorted(ai_cache.CACHE_KINDS),
+                            help="생성할 캐시 종류 (여러 번 지정 가능, 기본: 전체)")
+        parser.add_argument("--concurrency", type=int, default=4, help="동시 생성 수 (LLM 게이트웨이 한도 내에서 동작)")
+        parser.add_argument("--force", action="store_true", help="최신 캐시도 다시 생성 (관리자 수정본은 제외)")
+        parser.add_argument("--limit", type=int, default=0, help="처리할 정책 수 제한 (0: 전체)")
+        parser.add_argument("--policy-id", action="append", dest="policy_ids", help="특정 정책만 생성")
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or sorted(ai_cache.CACHE_KINDS)
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency는 1 이상이어야 합니다.")
+
+        query = {"policy_id": {"$exists": True}}
+        if options["policy_ids"]:
+            query["policy_id"] = {"$in": options["policy_ids"]}
+
+        db = getMongoDbClient()
+        cursor = db["policies"].find(query).sort("_id", 1)
+        if options["limit"]:
+            cursor = cursor.limit(options["limit"])
+        policies = list(cursor)
+
+        self.stdout.write(f"대상 정책 {len(policies)}건, 종류: {', '.join(kinds)}")
+        for kind in kinds:
+            result = ai_cache.warm_policies(kind, policies, concurrency=options["concurrency"], force=options["force"])
+            self.stdout.write(self.style.SUCCESS(
+                f"[{kind}] generated:{result['generated']}, skipped:{result['skipped']}, failed:{result['failed']}"
+            ))
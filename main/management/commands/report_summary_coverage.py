@@ -0,0 +1,59 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from main.policy_ai import SUMMARY_MIN_RULE_CARDS, build_rule_based_summary
+from utils.db import getMongoDbClient
+
+POLICY_PROJECTION = {
+    "_id": 0, "policy_id": 1, "policy_name": 1, "restricted_target": 1, "eligibility": 1, "region": 1,
+    "job_type": 1, "school_type": 1, "income_condition_type": 1, "earn": 1, "policy_specific_type": 1,
+    "support_content": 1,
+}
+
+
+class Command(BaseCommand):
+    help = "정책 조건 요약 카드를 규칙만으로 만들 수 있는 비율(LLM 호출 없이 처리되는 정책 비율)을 보고합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--show", type=int, default=0, help="LLM이 필요한 정책 예시 출력 수")
+
+    def handle(self, *args, **options):
+        db = getMongoDbClient()
+        counts = Counter()
+        residual_labels = Counter()
+        card_counts = Counter()
+        examples = []
+
+        for policy in db["policies"].find({}, POLICY_PROJECTION):
+            cards, residual = build_rule_based_summary(policy)
+            if len(cards) < SUMMARY_MIN_RULE_CARDS:
+                generator = "llm"
+            elif residual:
+                generator = "hybrid"
+            else:
+                generator = "rule"
+
+            counts[generator] += 1
+            card_counts[min(len(cards), 5)] += 1
+            residual_labels.update(residual.keys())
+            if generator != "rule" and len(examples) < options["show"]:
+                examples.append((policy.get("policy_id"), policy.get("policy_name"), generator, list(residual)))
+
+        total = sum(counts.values())
+        if not total:
+            self.stdout.write("정책 데이터가 없습니다.")
+            return
+
+        self.stdout.write(f"전체 정책: {total}건")
+        for generator, label in (("rule", "규칙만으로 처리 (LLM 호출 없음)"),
+                                 ("hybrid", "규칙 + 잔여 텍스트 LLM"),
+                                 ("llm", f"전체 LLM (규칙 카드 {SUMMARY_MIN_RULE_CARDS}개 미만)")):
+            self.stdout.write(f"- {label}: {counts[generator]}건 ({counts[generator] / total:.1%})")
+
+        self.stdout.write("규칙 카드 수 분포: " + ", ".join(f"{n}개 {card_counts[n]}건" for n in sorted(card_counts)))
+        if residual_labels:
+            self.stdout.write("LLM 처리 사유: " + ", ".join(f"{label} {n}건" for label, n in residual_labels.most_common()))
+
+        for policy_id, policy_name, generator, labels in examples:
+            self.stdout.write(f"  [{generator}] {policy_id} {policy_name} {labels}")
@@ -0,0 +1,132 @@
+"""
+검색 필터 옵션(facet) 사전 계산
+- 카테고리별 서브카테고리, 직업 상태/지역별 정책 수를 $facet 집계 한 번으로 계산해 search_facets 문서에 저장
+- 정책 수집(import) 시 갱신하고, 코퍼스 버전이 바뀌었는데 문서가 이전 버전이면 조회 시 다시 계산
+- 워커별로 코퍼스 버전 단위 메모리 캐시 (필터 옵션 API는 평소 DB 조회 없이 응답)
+- 응답 내용 해시를 ETag로 제공
+"""
+import hashlib
+import json
+import threading
+from collections import Counter
+from datetime import datetime
+
+from utils.corpus import get_corpus_version
+from utils.db import getMongoDbClient
+
+FACETS_COLLECTION = "search_facets"
+FACETS_ID = "filter_options"
+
+# 현재 UI 정책상 상위 카테고리는 일자리/교육으로 고정
+CATEGORIES = ["일자리", "교육"]
+MIN_JOB_STATUS_COUNT = 20
+
+_cache = {"version": None, "facets": None}
+_lock = threading.Lock()
+
+
+def split_tokens(value):
+    if value is None:
+        return []
+    raw = value if isinstance(value, list) else str(value).split(",")
+    return [token for token in (str(item).strip() for item in raw) if token]
+
+
+def _count_tokens(groups):
+    """
+    {"_id": 원본 값(문자열/배열), "count": n} 목록을 토큰별 정책 수로 변환
+    """
+    counter = Counter()
+    for group in groups:
+        for token in split_tokens(group["_id"]):
+            counter[token] += group["count"]
+    return counter
+
+
+def _sorted_by_count(counter, exclude, min_count=0):
+    return [
+        token for token, count in sorted(counter.items(), key=lambda x: (-x[1], x[0]))
+        if token != exclude and count >= min_count
+    ]
+
+
+def build_facets(db=None):
+    """
+    policies 전체를 $facet 집계 한 번으로 훑어 필터 옵션 계산
+    (원본 값 단위로 묶은 뒤 쉼표/배열 분해는 Python에서 처리해 문자열/배열 혼재 데이터도 동일하게 집계)
+    """
+    db = db or getMongoDbClient()
+
+    branches = {
+        "job_type": [{"$group": {"_id": "$job_type", "count": {"$sum": 1}}}],
+        "region": [{"$group": {"_id": "$region", "count": {"$sum": 1}}}],
+    }
+    for idx, category in enumerate(CATEGORIES):
+        branches[f"sub_category_{idx}"] = [
+            {"$match": {"category": {"$regex": category}}},
+            {"$group": {"_id": "$sub_category", "count": {"$sum": 1}}},
+        ]
+
+    result = next(iter(db["policies"].aggregate([{"$facet": branches}])), {})
+
+    sub_categories = {
+        category: sorted(_count_tokens(result.get(f"sub_category_{idx}", [])))
+        for idx, category in enumerate(CATEGORIES)
+    }
+
+    return {
+        "categories": list(CATEGORIES),
+        "sub_categories": sub_categories,
+        # UI에서는 이미 fallback OR(제한없음)을 사용하므로 직업 상태 옵션에서는 제외
+        "job_statuses": _sorted_by_count(_count_tokens(result.get("job_type", [])), "제한없음", MIN_JOB_STATUS_COUNT),
+        # UI에서 특정 지역 선택 시 '전국'은 자동 포함되므로 옵션 목록에서는 제외
+        "regions": _sorted_by_count(_count_tokens(result.get("region", [])), "전국"),
+    }
+
+
+def _etag_of(facets):
+    raw = json.dumps(facets, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def refresh_facets(version=None):
+    """
+    필터 옵션을 다시 계산해 search_facets에 저장 (정책 수집 직후 호출)
+    """
+    db = getMongoDbClient()
+    version = get_corpus_version() if version is None else version
+    facets = build_facets(db)
+    doc = {
+        "facets": facets,
+        "etag": _etag_of(facets),
+        "corpus_version": version,
+        "updated_at": datetime.now(),
+    }
+    db[FACETS_COLLECTION].replace_one({"_id": FACETS_ID}, doc, upsert=True)
+
+    with _lock:
+        _cache["version"] = version
+        _cache["facets"] = doc
+
+    print(f"[search_facets] refreshed version:{version}, regions:{len(facets['regions'])}, job_statuses:{len(facets['job_statuses'])}")
+    return doc
+
+
+def get_facets():
+    """
+    현재 코퍼스 버전의 필터 옵션 문서 {"facets", "etag", "corpus_version"}
+    """
+    version = get_corpus_version()
+    with _lock:
+        if _cache["facets"] is not None and _cache["version"] == version:
+            return _cache["facets"]
+
+    doc = getMongoDbClient()[FACETS_COLLECTION].find_one({"_id": FACETS_ID})
+    # 다른 워커가 더 새 버전으로 갱신해 둔 문서는 그대로 사용 (워커별 버전 캐시 시차)
+    if not doc or doc.get("corpus_version", -1) < version:
+        return refresh_facets(version)
+
+    with _lock:
+        _cache["version"] = version
+        _cache["facets"] = doc
+    return doc
@@ -0,0 +1,218 @@
+"""
+정책 검색용 로컬 역색인 (BM25)
+- 토큰(한글/영문/숫자 연속 문자열)과 한글 글자 bigram으로 색인해 조사/복합어가 붙은 표현도 부분 일치
+- 필드 가중치: policy_name > keywords > support_content = content_chunk_v3 (BM25F 방식으로 합산)
+- 워커별 메모리 색인. 첫 검색 때 전체 구축, 이후 코퍼스 버전이 바뀌면 updated_at 기준 변경분만 반영
+- 수집(import) 시 add_documents()로 해당 워커에 즉시 반영
+- 색인 변경과 검색은 색인 잠금으로 직렬화 (DB 조회는 잠금 밖에서 하고 반영만 잠금 안에서)
+- 벡터 검색 순위와는 RRF(reciprocal rank fusion)로 결합
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from utils.corpus import get_corpus_version
+from utils.db import getMongoDbClient
+
+FIELD_WEIGHTS = {
+    "policy_name": 3.0,
+    "keywords": 2.0,
+    "support_content": 1.0,
+    "content_chunk_v3": 1.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+TEMPLATE_CHUNK_ID = 1  # 수집 템플릿 청크 (site_admin.chunker). 본문 패시지 청크는 색인하지 않음
+SYNC_OVERLAP = timedelta(seconds=5)  # 워커 간 시계/저장 시차 여유
+
+TOKEN_RE = re.compile(r"[0-9a-z가-힣]+")
+HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def tokenize(text):
+    """
+    색인/질의 공용 토큰화: 토큰 자체 + 3글자 이상 한글 토큰의 글자 bigram
+    """
+    terms = []
+    for token in TOKEN_RE.findall(str(text or "").lower()):
+        terms.append(token)
+        if len(token) > 2 and HANGUL_RE.search(token):
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return terms
+
+
+class LexicalIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc_id: 가중 tf}
+        self.doc_terms = {}  # doc_id -> Counter (갱신 시 기존 posting 제거용)
+        self.doc_len = {}
+        self.total_len = 0.0
+        # 결과 캐시 미리 계산 스레드 등에서 검색과 변경이 동시에 일어나므로 dict 순회/변경을 직렬화
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def upsert_many(self, items):
+        """
+        [(doc_id, fields)]를 한 번의 잠금으로 반영
+        """
+        with self._lock:
+            for doc_id, fields in items:
+                self._upsert(doc_id, fields)
+
+    def upsert(self, doc_id, fields):
+        with self._lock:
+            self._upsert(doc_id, fields)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _upsert(self, doc_id, fields):
+        self._remove(doc_id)
+
+        weighted = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(fields.get(field)):
+                weighted[term] += weight
+        if not weighted:
+            return
+
+        for term, tf in weighted.items():
+            self.postings[term][doc_id] = tf
+        self.doc_terms[doc_id] = weighted
+        length = sum(weighted.values())
+        self.doc_len[doc_id] = length
+        self.total_len += length
+
+    def _remove(self, doc_id):
+        old = self.doc_terms.pop(doc_id, None)
+        if old is None:
+            return
+        for term in old:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(doc_id, 0.0)
+
+    def search(self, query, limit=None):
+        """
+        BM25 점수 내림차순 [(doc_id, score), ...]
+        """
+        terms = set(tokenize(query))
+        scores = defaultdict(float)
+        with self._lock:
+            n_docs = len(self.doc_terms)
+            if not n_docs:
+                return []
+            avg_len = self.total_len / n_docs
+
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[doc_id] / avg_len)
+                    scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda x: -x[1])
+        return ranked[:limit] if limit else ranked
+
+
+_index = LexicalIndex()
+_state = {"version": None, "synced_at": None}
+_lock = threading.Lock()
+
+
+def _load_fields(db, policy_match):
+    """
+    policies의 텍스트 필드 + policy_vectors 템플릿 청크의 content_chunk_v3를 정책 _id 기준으로 결합
+    (본문 패시지 청크는 policies 필드와 내용이 겹치므로 제외)
+    """
+    fields_by_id = {
+        p["_id"]: p
+        for p in db["policies"].find(policy_match, {"policy_name": 1, "keywords": 1, "support_content": 1})
+    }
+    if fields_by_id:
+        chunk_match = {"chunk_id": TEMPLATE_CHUNK_ID}
+        if policy_match:
+            chunk_match["policy_id"] = {"$in": list(fields_by_id)}
+        for v in db["policy_vectors"].find(chunk_match, {"policy_id": 1, "content_chunk_v3": 1}):
+            policy = fields_by_id.get(v.get("policy_id"))
+            if policy is not None and v.get("content_chunk_v3"):
+                # 청크가 여러 개면 이어 붙여 한 문서로 색인
+                policy["content_chunk_v3"] = " ".join(filter(None, [policy.get("content_chunk_v3"), v["content_chunk_v3"]]))
+    return fields_by_id
+
+
+def _sync():
+    """
+    코퍼스 버전이 바뀌었을 때만 DB 확인: 최초에는 전체 구축, 이후에는 updated_at 기준 변경분만 반영
+    """
+    version = get_corpus_version()
+    if _state["version"] == version:
+        return
+
+    with _lock:
+        if _state["version"] == version:
+            return
+
+        started_at = datetime.now()
+        db = getMongoDbClient()
+        if _state["synced_at"] is None:
+            policy_match = {}
+        else:
+            policy_match = {"updated_at": {"$gte": _state["synced_at"] - SYNC_OVERLAP}}
+
+        fields_by_id = _load_fields(db, policy_match)
+        _index.upsert_many(fields_by_id.items())
+
+        _state["version"] = version
+        _state["synced_at"] = started_at
+        print(f"[lexical] synced version:{version}, changed:{len(fields_by_id)}, docs:{len(_index)}")
+
+
+def add_documents(data_docs, vector_docs=()):
+    """
+    수집 직후 현재 워커 색인에 바로 반영 (다른 워커는 코퍼스 버전 변경 시 변경분 동기화)
+    """
+    chunks = defaultdict(list)
+    for v in vector_docs:
+        if v.get("chunk_id", TEMPLATE_CHUNK_ID) == TEMPLATE_CHUNK_ID and v.get("content_chunk_v3"):
+            chunks[v.get("policy_id")].append(v["content_chunk_v3"])
+
+    _index.upsert_many(
+        (doc["_id"], {**doc, "content_chunk_v3": " ".join(chunks.get(doc["_id"], []))})
+        for doc in data_docs
+    )
+
+
+def search(query, limit=None):
+    try:
+        _sync()
+    except Exception as e:
+        print(f"[lexical] sync exception {e}")
+    return _index.search(query, limit)
+
+
+def rrf_fuse(*rankings, k=RRF_K):
+    """
+    여러 순위 목록(doc_id 리스트, 앞쪽이 상위)을 RRF 점수로 결합 -> {doc_id: score}
+    """
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return fused
+
+
+def get_stats():
+    with _index._lock:
+        return {"docs": len(_index), "terms": len(_index.postings), "version": _state["version"]}
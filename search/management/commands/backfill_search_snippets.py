@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from search import snippets
+
+
+class Command(BaseCommand):
+    help = "검색 결과 카드용 요약/금액 문구(policies.search_snippet)를 미리 계산해 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing-only", action="store_true", help="search_snippet이 없는 정책만 계산")
+        parser.add_argument("--policy-id", action="append", dest="policy_ids", help="특정 정책(policies.policy_id)만 계산")
+
+    def handle(self, *args, **options):
+        policy_match = {}
+        if options["policy_ids"]:
+            policy_match["policy_id"] = {"$in": options["policy_ids"]}
+        if options["missing_only"]:
+            policy_match["search_snippet"] = {"$exists": False}
+
+        stored = snippets.store_snippets(policy_match)
+        with_summary = sum(1 for snippet in stored.values() if snippet.get("summary_text"))
+        with_amount = sum(1 for snippet in stored.values() if snippet.get("amount_text"))
+        self.stdout.write(self.style.SUCCESS(
+            f"search_snippet 저장: {len(stored)}건 (요약 {with_summary}건, 금액 {with_amount}건)"
+        ))
@@ -0,0 +1,43 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils import retrieval
+
+
+def _embedder(site):
+    # 각 호출 지점이 실제로 쓰는 질의 임베딩 함수로 보정
+    if site == "search":
+        from search.services import embed_query
+        return embed_query
+    if site == "recommend":
+        from survey.recommend import embed_query_gemini
+        return embed_query_gemini
+    from chat.chatbot import get_query_vector_async
+    return lambda text: asyncio.run(get_query_vector_async(text))
+
+
+class Command(BaseCommand):
+    help = ("train_dataset 라벨로 벡터 검색 점수 임계값과 후보 재현율을 보정해 retrieval_calibration에 저장합니다. "
+            "각 웹 워커는 최대 5분 안에 새 임계값을 반영합니다. (라벨 추가 또는 임베딩 재생성 후 실행)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", choices=sorted(retrieval.SITES), action="append",
+                            help="보정할 호출 지점 (여러 번 지정 가능, 기본: 전체)")
+        parser.add_argument("--max-queries", type=int, default=None, help="사용할 train_dataset 질의 수 상한")
+
+    def handle(self, *args, **options):
+        if options["max_queries"] is not None and options["max_queries"] < 1:
+            raise CommandError("--max-queries는 1 이상이어야 합니다.")
+
+        for site in options["site"] or sorted(retrieval.SITES):
+            doc = retrieval.calibrate(site, _embedder(site), max_queries=options["max_queries"])
+            if doc is None:
+                self.stdout.write(f"  {site}: 점수를 얻은 정답 라벨이 부족해 보정하지 않았습니다. (기존 값 유지)")
+                continue
+            applied = "적용" if retrieval.SITES[site]["default_threshold"] is not None else "미적용(순위만 사용)"
+            self.stdout.write(self.style.SUCCESS(
+                f"  {site}: 임계값 {doc['score_threshold']} ({applied}), 정답 통과율 {doc['threshold_recall']}, 정답 포함률 {doc['coverage']}, "
+                f"오답 통과율 {doc['negative_pass_rate']}, 후보 재현율 {doc['candidate_recall']} "
+                f"(numCandidates {doc['num_candidates']}, limit {doc['limit']}, 질의 {doc['queries']}개)"
+            ))
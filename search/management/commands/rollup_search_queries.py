@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search import query_log
+
+
+class Command(BaseCommand):
+    help = ("검색 질의 로그를 집계해 인기 검색어(search_popular_queries)와 결과 없는 검색어(search_zero_result_queries)를 "
+            "갱신합니다. cron 등으로 주기 실행 (예: 매시간)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="집계 기간(일)")
+        parser.add_argument("--top", type=int, default=500, help="저장할 검색어 수")
+        parser.add_argument("--show", type=int, default=10, help="출력할 검색어 수")
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["top"] < 1:
+            raise CommandError("--days, --top은 1 이상이어야 합니다.")
+
+        query_log.flush()
+        result = query_log.rollup(days=options["days"], top_n=options["top"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"최근 {options['days']}일 검색 {result['events']}건, 검색어 {result['queries']}개 "
+            f"(인기 {len(result['popular'])}개, 결과 없음 {len(result['zero_result'])}개)"
+        ))
+        scores = result["top_score"]
+        self.stdout.write(f"첫 페이지 최고 벡터 점수 p10/p50/p90: {scores['p10']} / {scores['p50']} / {scores['p90']}")
+
+        self.stdout.write("인기 검색어:")
+        for row in result["popular"][:options["show"]]:
+            self.stdout.write(f"  {row['count']:>6}  {row['_id']}  (요청자 {row['sessions']}명, 결과 없음 {row['zero_count']}회)")
+        self.stdout.write("결과 없는 검색어:")
+        for row in result["zero_result"][:options["show"]]:
+            self.stdout.write(f"  {row['count']:>6}  {row['_id']}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from search import prefilter
+
+
+class Command(BaseCommand):
+    help = "policies 기준으로 policy_vectors.metadata의 검색 필터 필드($vectorSearch.filter용)를 다시 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--policy-id", action="append", dest="policy_ids", help="특정 정책(policies.policy_id)만 갱신")
+
+    def handle(self, *args, **options):
+        policy_match = {"policy_id": {"$in": options["policy_ids"]}} if options["policy_ids"] else {}
+        updated = prefilter.sync_vector_metadata(policy_match)
+        self.stdout.write(self.style.SUCCESS(f"벡터 메타데이터 갱신: {updated}건"))
+        self.stdout.write("Atlas vector_index_v2에 filter 필드가 등록되어 있어야 합니다: " + ", ".join(prefilter.FILTER_FIELDS))
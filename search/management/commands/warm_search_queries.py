@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search import services
+from search.query_log import POPULAR_QUERIES_COLLECTION
+from search.result_cache import normalize_query
+from utils.db import getMongoDbClient
+
+
+class Command(BaseCommand):
+    help = ("인기 검색어 상위 N개의 임베딩을 미리 만들어 search_query_embeddings에 저장합니다. "
+            "각 웹 워커는 첫 검색 요청 때 이 임베딩으로 인기 검색어 결과 캐시를 예열합니다. (rollup_search_queries 이후 실행)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=100, help="예열할 인기 검색어 수")
+        parser.add_argument("--search", action="store_true", help="임베딩 후 1페이지 검색도 실행해 결과를 확인")
+
+    def handle(self, *args, **options):
+        if options["top"] < 1:
+            raise CommandError("--top은 1 이상이어야 합니다.")
+
+        rows = getMongoDbClient()[POPULAR_QUERIES_COLLECTION].find({}, {"query": 1}).sort("count", -1).limit(options["top"])
+        # 워커 예열(result_cache.warm_popular)과 같은 검색어 문자열로 임베딩해야 저장소에서 재사용됨
+        queries = [row["query"] for row in rows if normalize_query(row.get("query"))]
+        if not queries:
+            self.stdout.write("인기 검색어가 없습니다. rollup_search_queries를 먼저 실행하세요.")
+            return
+
+        failed = 0
+        for query in queries:
+            try:
+                services.embed_query(query)
+                if options["search"]:
+                    result = services.search_policies(query=query, page=1)
+                    self.stdout.write(f"  {query}: {result.get('total', result.get('error'))}")
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"  {query}: {e}")
+
+        stats = services.get_embedding_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"검색어 {len(queries)}개 예열 (새로 임베딩 {stats['misses']}개, 저장소 재사용 {stats['store_hits']}개, 실패 {failed}개)"
+        ))
@@ -0,0 +1,152 @@
+"""
+검색 필터용 벡터 메타데이터 (policy_vectors.metadata)
+- 필터 대상 필드(지역, 직업상태, 카테고리 토큰, 나이 정수, 신청 마감일)를 정책 문서에서 계산해 벡터 문서에 복제
+- 검색 필터를 $vectorSearch.filter 조건으로 변환해 벡터 검색 단계에서 바로 걸러냄 ($lookup 후 필터링하지 않음)
+- 조건 의미는 services._build_policy_match(policies 컬렉션 기준)와 같게 유지
+- Atlas vector_index_v2에 FILTER_FIELDS가 filter 타입으로 등록되어 있어야 함 (db.js 참고)
+"""
+from datetime import date
+
+from pymongo import UpdateMany
+
+from utils.db import getMongoDbClient
+
+from .facets import split_tokens
+
+FILTER_FIELDS = [
+    "metadata.region",
+    "metadata.job_type",
+    "metadata.category_tokens",
+    "metadata.sub_category",
+    "metadata.age_min",
+    "metadata.age_max",
+    "metadata.apply_period_type",
+    "metadata.apply_end",
+]
+
+# 비정상 나이 값은 _build_policy_match의 $convert sentinel과 같게 처리 (비교에서 제외)
+AGE_MIN_INVALID = 999
+AGE_MAX_INVALID = -1
+# 기한 정보가 없으면 상시모집으로 간주
+APPLY_END_ALWAYS = "99991231"
+SYNC_BATCH_SIZE = 500
+
+POLICY_PROJECTION = {"region": 1, "job_type": 1, "category": 1, "sub_category": 1, "eligibility": 1, "dates": 1}
+
+
+def _age_int(value, invalid):
+    if value is None:
+        return invalid
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return invalid
+
+
+def _apply_end(dates):
+    """
+    신청 마감일(YYYYMMDD 문자열). _build_policy_match의 openOnly 조건과 같은 의미로 계산:
+    apply_period_end와 apply_period('~' 뒤) 중 늦은 날짜 (어느 한쪽이라도 오늘 이후면 모집중), 둘 다 비어 있으면 상시
+    """
+    end = dates.get("apply_period_end") or ""
+    period = dates.get("apply_period") or ""
+    if not end and not period:
+        return APPLY_END_ALWAYS
+    candidates = [str(end)]
+    if period:
+        parts = str(period).split("~")
+        candidates.append(parts[1].strip() if len(parts) > 1 else "")
+    return max(candidates)
+
+
+def build_vector_metadata(policy):
+    """
+    정책 문서 -> policy_vectors.metadata에 복제할 필터 필드
+    """
+    eligibility = policy.get("eligibility") or {}
+    dates = policy.get("dates") or {}
+    return {
+        "region": split_tokens(policy.get("region")),
+        "job_type": split_tokens(policy.get("job_type")),
+        "category_tokens": split_tokens(policy.get("category")),
+        "sub_category": policy.get("sub_category") or "",
+        "age_min": _age_int(eligibility.get("age_min"), AGE_MIN_INVALID),
+        "age_max": _age_int(eligibility.get("age_max"), AGE_MAX_INVALID),
+        "apply_period_type": dates.get("apply_period_type") or "",
+        "apply_end": _apply_end(dates),
+    }
+
+
+def build_vector_filter(filters):
+    """
+    검색 필터 -> $vectorSearch.filter 조건 (필터가 없으면 None)
+    """
+    if not filters:
+        return None
+
+    conditions = []
+
+    category = filters.get("category")
+    if category and category != "all":
+        conditions.append({"metadata.category_tokens": category})
+
+    sub_category = filters.get("sub_category")
+    if sub_category and sub_category != "all":
+        conditions.append({"metadata.sub_category": sub_category})
+
+    age = filters.get("age")
+    if age is not None:
+        try:
+            age_int = int(age)
+            conditions.append({
+                "$or": [
+                    {"metadata.age_min": 0},  # 연령 제한 없음
+                    {"$and": [
+                        {"metadata.age_min": {"$lte": age_int}},
+                        {"$or": [{"metadata.age_max": 0}, {"metadata.age_max": {"$gte": age_int}}]},
+                    ]},
+                ]
+            })
+        except (ValueError, TypeError):
+            pass
+
+    region = filters.get("region")
+    if region and region != "all":
+        conditions.append({"metadata.region": {"$in": [region, "전국"]}})
+
+    job_status = filters.get("jobStatus")
+    if job_status and job_status != "all":
+        conditions.append({"metadata.job_type": {"$in": [job_status, "제한없음"]}})
+
+    if filters.get("openOnly"):
+        conditions.append({"metadata.apply_period_type": {"$ne": "마감"}})
+        conditions.append({"metadata.apply_end": {"$gte": date.today().strftime("%Y%m%d")}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def sync_vector_metadata(policy_match=None, db=None):
+    """
+    policies 기준으로 policy_vectors.metadata 필터 필드를 다시 채움 (기존 데이터 백필/수동 수정 반영)
+    """
+    db = db or getMongoDbClient()
+    updated = 0
+    ops = []
+
+    def flush():
+        nonlocal updated
+        if ops:
+            updated += db["policy_vectors"].bulk_write(ops, ordered=False).modified_count
+            ops.clear()
+
+    for policy in db["policies"].find(policy_match or {}, POLICY_PROJECTION):
+        fields = {f"metadata.{k}": v for k, v in build_vector_metadata(policy).items()}
+        ops.append(UpdateMany({"policy_id": policy["_id"]}, {"$set": fields}))
+        if len(ops) >= SYNC_BATCH_SIZE:
+            flush()
+    flush()
+    return updated
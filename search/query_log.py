@@ -0,0 +1,186 @@
+"""
+검색 질의 로그
+- 검색 API 요청마다 이벤트(정규화 검색어, 필터, 페이지, 결과 수, 지연 시간, 최고 점수)를 워커 메모리 버퍼에 쌓고
+  배치 크기 또는 주기마다 search_query_log에 한 번에 insert (요청 경로에서는 DB 쓰기 없음)
+- 로그는 추가만 하고 QUERY_LOG_TTL_DAYS 뒤 Mongo TTL로 삭제
+- rollup()으로 인기 검색어(search_popular_queries)와 결과 없는 검색어(search_zero_result_queries) 집계
+  (자동완성 순위, 검색 캐시 예열, 벡터 점수 임계값 점검에 사용)
+- 인기 검색어는 자동완성으로 다른 사용자에게 노출되므로 최소 검색 횟수/서로 다른 요청자 수를 넘고
+  결과가 있었던 검색어만 포함 (요청자는 해시 값만 기록)
+"""
+import atexit
+import os
+import threading
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, UpdateOne
+
+from utils.db import getMongoDbClient, ensure_index
+
+QUERY_LOG_COLLECTION = "search_query_log"
+POPULAR_QUERIES_COLLECTION = "search_popular_queries"
+ZERO_RESULT_QUERIES_COLLECTION = "search_zero_result_queries"
+
+QUERY_LOG_BATCH_SIZE = int(os.getenv("SEARCH_QUERY_LOG_BATCH_SIZE", "50"))
+QUERY_LOG_FLUSH_INTERVAL = float(os.getenv("SEARCH_QUERY_LOG_FLUSH_INTERVAL", "5"))  # 초
+QUERY_LOG_MAX_BUFFER = 5000  # DB 장애 시 버퍼 상한 (넘으면 오래된 이벤트부터 버림)
+QUERY_LOG_TTL_DAYS = 30
+POPULAR_MIN_COUNT = int(os.getenv("SEARCH_POPULAR_MIN_COUNT", "5"))
+POPULAR_MIN_SESSIONS = int(os.getenv("SEARCH_POPULAR_MIN_SESSIONS", "3"))
+
+_buffer = []
+_lock = threading.Lock()
+_flush_event = threading.Event()
+_stats = {"recorded": 0, "flushed": 0, "dropped": 0, "flush_errors": 0}
+_writer = {"thread": None}
+
+
+def record(query, filters, page, total, latency_ms, top_score=None, error=False, session=None):
+    """
+    검색 이벤트 1건을 버퍼에 추가 (배치가 차면 기록 스레드를 깨움)
+    """
+    event = {
+        "query": query or "",
+        "filters": filters or {},
+        "page": page,
+        "total": total,
+        "latency_ms": round(latency_ms, 1),
+        "top_score": top_score,
+        "error": error,
+        "session": session,
+        "created_at": datetime.now(),
+    }
+    with _lock:
+        _buffer.append(event)
+        _stats["recorded"] += 1
+        overflow = len(_buffer) - QUERY_LOG_MAX_BUFFER
+        if overflow > 0:
+            del _buffer[:overflow]
+            _stats["dropped"] += overflow
+        full = len(_buffer) >= QUERY_LOG_BATCH_SIZE
+        _start_writer()
+    if full:
+        _flush_event.set()
+
+
+def flush():
+    """
+    버퍼의 이벤트를 insert_many 한 번으로 기록. 실패하면 버퍼에 되돌려 다음 주기에 재시도
+    """
+    with _lock:
+        events = _buffer[:]
+        _buffer.clear()
+    if not events:
+        return 0
+
+    try:
+        collection = getMongoDbClient()[QUERY_LOG_COLLECTION]
+        ensure_index(collection, [("created_at", ASCENDING)], expireAfterSeconds=QUERY_LOG_TTL_DAYS * 24 * 3600)
+        collection.insert_many(events, ordered=False)
+    except Exception as e:
+        print(f"[search_query_log] flush exception {e}")
+        with _lock:
+            _buffer[:0] = events
+            _stats["flush_errors"] += 1
+        return 0
+
+    with _lock:
+        _stats["flushed"] += len(events)
+    return len(events)
+
+
+def _run_writer():
+    while True:
+        _flush_event.wait(QUERY_LOG_FLUSH_INTERVAL)
+        _flush_event.clear()
+        flush()
+
+
+def _start_writer():
+    # _lock 안에서 호출. 첫 기록 시 워커별 기록 스레드 시작
+    if _writer["thread"] is None:
+        _writer["thread"] = threading.Thread(target=_run_writer, name="search-query-log", daemon=True)
+        _writer["thread"].start()
+        atexit.register(flush)
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+def rollup(days=7, top_n=500, db=None):
+    """
+    최근 days일 로그(첫 페이지 요청, 검색어 있는 것)를 검색어별로 집계해
+    인기 검색어(결과가 있었고 POPULAR_MIN_COUNT회, POPULAR_MIN_SESSIONS명 이상이 검색한 검색어)와
+    결과 없는 검색어 컬렉션을 갱신
+    """
+    db = db or getMongoDbClient()
+    rolled_up_at = datetime.now()
+    since = rolled_up_at - timedelta(days=days)
+
+    groups = list(db[QUERY_LOG_COLLECTION].aggregate([
+        {"$match": {"created_at": {"$gte": since}, "page": 1, "query": {"$ne": ""}, "error": False}},
+        {"$group": {
+            "_id": "$query",
+            "count": {"$sum": 1},
+            "zero_count": {"$sum": {"$cond": [{"$eq": ["$total", 0]}, 1, 0]}},
+            "session_ids": {"$addToSet": "$session"},
+            "avg_latency_ms": {"$avg": "$latency_ms"},
+            "avg_top_score": {"$avg": "$top_score"},
+            "last_seen": {"$max": "$created_at"},
+        }},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]))
+    for g in groups:
+        g["sessions"] = len([s for s in g.pop("session_ids", []) if s])
+
+    popular = [
+        g for g in groups
+        if g["zero_count"] < g["count"] and g["count"] >= POPULAR_MIN_COUNT and g["sessions"] >= POPULAR_MIN_SESSIONS
+    ][:top_n]
+    zero_result = [g for g in groups if g["zero_count"] == g["count"]][:top_n]
+
+    for name, rows in ((POPULAR_QUERIES_COLLECTION, popular), (ZERO_RESULT_QUERIES_COLLECTION, zero_result)):
+        collection = db[name]
+        if rows:
+            collection.bulk_write([
+                UpdateOne({"_id": g["_id"]}, {"$set": {
+                    "query": g["_id"],
+                    "count": g["count"],
+                    "zero_count": g["zero_count"],
+                    "sessions": g["sessions"],
+                    "avg_latency_ms": round(g["avg_latency_ms"] or 0, 1),
+                    "avg_top_score": g["avg_top_score"],
+                    "last_seen": g["last_seen"],
+                    "rolled_up_at": rolled_up_at,
+                }}, upsert=True)
+                for g in rows
+            ], ordered=False)
+        # 이번 집계에 없는 검색어는 제거
+        collection.delete_many({"rolled_up_at": {"$lt": rolled_up_at}})
+
+    # 점수 임계값 점검용: 결과가 있었던 첫 페이지 요청의 최고 벡터 점수 분포
+    top_scores = sorted(
+        e["top_score"] for e in db[QUERY_LOG_COLLECTION].find(
+            {"created_at": {"$gte": since}, "page": 1, "top_score": {"$ne": None}}, {"_id": 0, "top_score": 1}
+        )
+    )
+
+    return {
+        "queries": len(groups),
+        "events": sum(g["count"] for g in groups),
+        "popular": popular,
+        "zero_result": zero_result,
+        "top_score": {
+            "p10": _percentile(top_scores, 0.1),
+            "p50": _percentile(top_scores, 0.5),
+            "p90": _percentile(top_scores, 0.9),
+        },
+    }
+
+
+def get_stats():
+    with _lock:
+        return {**_stats, "buffered": len(_buffer)}
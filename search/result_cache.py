@@ -0,0 +1,175 @@
+"""
+검색 결과 응답 캐시
+- 키: 코퍼스 버전 + 정규화한 (검색어, 필터, 페이지, 페이지 크기). 정책 수집 시 버전이 올라가 자동 무효화
+  검색어 정규화(소문자/공백)는 키에만 적용하고 검색에는 원래 검색어를 그대로 사용
+- 워커별 TTL LRU 캐시 (필터 탐색처럼 같은 조합이 반복되는 요청을 DB/임베딩 호출 없이 응답)
+- 1페이지 요청 시 다음 페이지들을 백그라운드에서 미리 계산
+- 워커의 첫 검색 요청 때 인기 검색어 상위 N개 1페이지를 백그라운드에서 예열
+- 오류 응답은 캐싱하지 않음
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.corpus import get_corpus_version
+from utils.db import getMongoDbClient
+
+from .query_log import POPULAR_QUERIES_COLLECTION
+from .services import _normalize_page, search_policies
+
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "120"))  # 초
+SEARCH_CACHE_MAX_ENTRIES = 1024
+PREFETCH_PAGES = 2  # 1페이지 요청 시 미리 계산할 다음 페이지 수
+WARM_TOP_N = int(os.getenv("SEARCH_CACHE_WARM_TOP_N", "20"))  # 워커별 예열할 인기 검색어 수
+WARM_PAGE_SIZE = 20  # 검색 화면 기본 페이지 크기
+
+_cache = OrderedDict()  # key -> (result, cached_at)
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "prefetched": 0}
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-prefetch")
+_in_progress = set()
+_warm_state = {"started": False}
+
+
+def normalize_query(query):
+    return " ".join(str(query or "").lower().split())
+
+
+def _is_empty_filter(value):
+    # age=0처럼 0은 유효한 값 (0 == False 이므로 in 비교 대신 타입/동일성으로 확인)
+    if value is None or value is False:
+        return True
+    return isinstance(value, str) and value in ("", "all")
+
+
+def _canonical_filters(filters):
+    """
+    값이 없거나 'all'인 필터는 제외하고 키 순서와 무관한 튜플로 변환
+    """
+    return tuple(sorted(
+        (key, value) for key, value in (filters or {}).items()
+        if not _is_empty_filter(value)
+    ))
+
+
+def _cache_key(version, query, filters, page, page_size):
+    return (version, normalize_query(query), _canonical_filters(filters), page, page_size)
+
+
+def _get(key):
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and now - cached[1] < SEARCH_CACHE_TTL:
+            _cache.move_to_end(key)
+            return cached[0]
+    return None
+
+
+def _put(key, result):
+    with _cache_lock:
+        _cache[key] = (result, time.monotonic())
+        _cache.move_to_end(key)
+        while len(_cache) > SEARCH_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _prefetch(version, query, filters, page, page_size):
+    key = _cache_key(version, query, filters, page, page_size)
+    try:
+        if _get(key) is None:
+            result = search_policies(query=query, filters=filters, page=page, page_size=page_size)
+            if "error" not in result:
+                _put(key, result)
+                with _cache_lock:
+                    _stats["prefetched"] += 1
+    except Exception as e:
+        print(f"[search_cache] prefetch exception {e}")
+    finally:
+        with _cache_lock:
+            _in_progress.discard(key)
+
+
+def _schedule_prefetch(version, query, filters, result):
+    page_size = result.get("page_size") or 0
+    total = result.get("total") or 0
+    for page in range(2, 2 + PREFETCH_PAGES):
+        # total이 하한(total_exact=false)이어도 다음 페이지는 이미 후보에 포함됨
+        if (page - 1) * page_size >= total:
+            break
+        key = _cache_key(version, query, filters, page, page_size)
+        with _cache_lock:
+            cached = _cache.get(key)
+            if key in _in_progress or (cached and time.monotonic() - cached[1] < SEARCH_CACHE_TTL):
+                continue
+            _in_progress.add(key)
+        _executor.submit(_prefetch, version, query, filters, page, page_size)
+
+
+def warm_popular(top_n=WARM_TOP_N):
+    """
+    인기 검색어(search_popular_queries) 상위 top_n개의 1페이지 결과를 미리 계산 (필터 없음)
+    임베딩은 예열 명령이 공유 저장소에 미리 만들어 두므로 대부분 Gemini 호출 없이 처리
+    """
+    version = get_corpus_version()
+    rows = getMongoDbClient()[POPULAR_QUERIES_COLLECTION].find({}, {"query": 1}).sort("count", -1).limit(top_n)
+    scheduled = 0
+    for row in rows:
+        query = row.get("query") or ""
+        if not normalize_query(query):
+            continue
+        key = _cache_key(version, query, {}, 1, WARM_PAGE_SIZE)
+        with _cache_lock:
+            if key in _in_progress or key in _cache:
+                continue
+            _in_progress.add(key)
+        _prefetch(version, query, {}, 1, WARM_PAGE_SIZE)
+        scheduled += 1
+    print(f"[search_cache] warmed popular queries: {scheduled}")
+    return scheduled
+
+
+def _warm_once():
+    with _cache_lock:
+        if _warm_state["started"] or WARM_TOP_N <= 0:
+            return
+        _warm_state["started"] = True
+    _executor.submit(_run_warm)
+
+
+def _run_warm():
+    try:
+        warm_popular()
+    except Exception as e:
+        print(f"[search_cache] warm exception {e}")
+
+
+def cached_search(query="", filters=None, page=1, page_size=20):
+    """
+    search_policies 결과를 캐시에서 반환 (없으면 검색 후 저장). 1페이지면 다음 페이지 미리 계산
+    """
+    _warm_once()
+    page, page_size = _normalize_page(page, page_size)
+    filters = dict(_canonical_filters(filters))
+    version = get_corpus_version()
+    key = _cache_key(version, query, filters, page, page_size)
+
+    result = _get(key)
+    with _cache_lock:
+        _stats["hits" if result is not None else "misses"] += 1
+    if result is None:
+        result = search_policies(query=query, filters=filters, page=page, page_size=page_size)
+        if "error" in result:
+            return result
+        _put(key, result)
+
+    if page == 1:
+        _schedule_prefetch(version, query, filters, result)
+    return result
+
+
+def get_stats():
+    with _cache_lock:
+        return {**_stats, "cached": len(_cache), "prefetching": len(_in_progress)}
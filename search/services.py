@@ -2,24 +2,36 @@
 맞춤정책 검색 서비스
 - Gemini AI 임베딩을 이용한 시맨틱 검색
 - MongoDB Vector Search를 이용한 정책 매칭
+- 로컬 역색인(BM25) 키워드 검색과 RRF로 결합한 하이브리드 순위
 """
 
+import hashlib
 import os
-import re
-from datetime import date
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
 from google import genai
-from utils.db import getMongoDbClient
+from pymongo import ASCENDING
+from utils import llm_gateway, retrieval
+from utils.db import getMongoDbClient, ensure_index
 from django.conf import settings
 
+from . import lexical, prefilter, snippets
+
 # ============================================================================
 # 상수
 # ============================================================================
 
-SCORE_THRESHOLD = 0.855  # 벡터 유사도 임계값 (0.855 미만은 검색 결과에서 제외)
-AMOUNT_TEXT_RE = re.compile(
-    r"(?:월|연|최대|최소)?\s*\d[\d,]*(?:\s*[~\-]\s*\d[\d,]*)?\s*(?:억|만원|천원|원)"
-)
-SUMMARY_SENTENCE_SPLIT_RE = re.compile(r"[.!?]\s+|\n+")
+LEXICAL_CANDIDATES = 50  # 키워드(BM25) 후보 수
+LEXICAL_MIN_SCORE_RATIO = 0.3  # 1위 BM25 점수 대비 이 비율 미만은 흔한 bigram만 겹친 것으로 보고 제외
+# 벡터 후보 창(정책 수). 페이지와 무관하게 고정하고, 요청 페이지가 창을 넘을 때만 2배씩 확장
+# -> 같은 창 안의 페이지들은 같은 후보/같은 RRF 순위를 잘라 쓰므로 페이지 간 중복·누락 없음
+VECTOR_WINDOW_POLICIES = 100
+VECTOR_CHUNKS_PER_POLICY = 2  # 정책당 청크가 여러 개여도 창을 채우도록 청크 limit에 곱하는 여유분
+QUERY_EMBEDDING_MODEL = "gemini-embedding-001"
+QUERY_EMBEDDING_COLLECTION = "search_query_embeddings"  # 워커 간 공유 + 예열 명령이 미리 채움
+QUERY_EMBEDDING_CACHE_MAX = 1024  # 워커별 LRU 항목 수
+QUERY_EMBEDDING_TTL_DAYS = 30
 
 
 # ============================================================================
@@ -45,169 +57,112 @@ def get_genai_client():
     return genai.Client(api_key=api_key)
 
 
-def _to_int_or_none(value):
-    """
-    숫자/문자 값을 int로 변환합니다.
-    변환 불가/빈값은 None을 반환합니다.
-    """
-    if value is None:
-        return None
-
-    raw = str(value).strip().replace(",", "")
-    if raw == "":
-        return None
-
-    try:
-        return int(float(raw))
-    except (TypeError, ValueError):
-        return None
-
-
-def _format_money(value: int):
-    return f"{value:,}원"
-
+_embedding_cache = OrderedDict()  # 검색어 -> 임베딩
+_embedding_lock = threading.Lock()
+_embedding_stats = {"memory_hits": 0, "store_hits": 0, "misses": 0}
 
-def _extract_amount_text(*texts):
-    """
-    텍스트에서 금액 패턴(만원/원 등)을 정규식으로 추출합니다.
-    """
-    for text in texts:
-        if not text:
-            continue
-        match = AMOUNT_TEXT_RE.search(str(text))
-        if match:
-            return " ".join(match.group(0).split())
-    return None
 
+def _embedding_key(query: str):
+    return hashlib.sha1(f"{QUERY_EMBEDDING_MODEL}\n{query}".encode("utf-8")).hexdigest()
 
-def _query_terms(query: str):
-    """
-    쿼리에서 의미 있는 토큰을 추출합니다.
-    """
-    if not query:
-        return []
-    terms = []
-    for token in re.findall(r"[0-9A-Za-z가-힣]+", str(query).lower()):
-        if len(token) >= 2:
-            terms.append(token)
-    return terms
 
+def _request_embedding(query: str):
+    client = get_genai_client()
+    response = llm_gateway.call(
+        "gemini", client.models.embed_content,
+        model=QUERY_EMBEDDING_MODEL,
+        contents=query,
+        dedup_key=llm_gateway.prompt_key(QUERY_EMBEDDING_MODEL, query),
+    )
 
-def _normalize_text(value):
-    if not value:
-        return ""
-    return " ".join(str(value).replace("\u00a0", " ").split())
+    if hasattr(response, "embeddings"):
+        return response.embeddings[0].values
+    elif hasattr(response, "embedding"):
+        return response.embedding.values
+    return response.get("embedding", {}).get("values")
 
 
-def _extractive_summary(text: str, terms: list[str]):
-    """
-    간단한 추출형 요약:
-    - 쿼리 토큰/금액 패턴이 포함된 문장을 우선 선택
-    - 없으면 첫 문장 사용
+def embed_query(query: str):
     """
-    normalized = _normalize_text(text)
-    if not normalized:
-        return None
-
-    raw_sentences = [s.strip() for s in SUMMARY_SENTENCE_SPLIT_RE.split(normalized)]
-    sentences = [s for s in raw_sentences if len(s) >= 8]
-    if not sentences:
-        return normalized[:180]
-
-    best_idx = 0
-    best_score = -1
-    terms_lower = [t.lower() for t in terms]
-
-    for idx, sentence in enumerate(sentences):
-        sentence_lower = sentence.lower()
-        score = 0
-        if terms_lower:
-            score += sum(1 for t in terms_lower if t in sentence_lower)
-        if AMOUNT_TEXT_RE.search(sentence):
-            score += 1
-        if score > best_score:
-            best_score = score
-            best_idx = idx
-
-    summary = sentences[best_idx]
-    if best_idx + 1 < len(sentences):
-        next_sentence = sentences[best_idx + 1]
-        if len(summary) + len(next_sentence) <= 180:
-            summary = f"{summary}. {next_sentence}"
-
-    return summary[:220]
-
-
-def _build_summary_text(policy: dict, terms: list[str]):
+    검색어 임베딩: 워커별 LRU -> search_query_embeddings(공유 저장소) -> Gemini 순으로 조회
     """
-    요약 우선순위:
-    policy_summary -> content_chunk_v3 -> support_content -> content
-    """
-    candidates = [
-        policy.get("policy_summary"),
-        policy.get("content_chunk_v3"),
-        policy.get("support_content"),
-        policy.get("content"),
-    ]
-
-    for candidate in candidates:
-        summary = _extractive_summary(candidate, terms)
-        if summary:
-            return summary
+    with _embedding_lock:
+        cached = _embedding_cache.get(query)
+        if cached is not None:
+            _embedding_cache.move_to_end(query)
+            _embedding_stats["memory_hits"] += 1
+            return cached
+
+    key = _embedding_key(query)
+    collection = getMongoDbClient()[QUERY_EMBEDDING_COLLECTION]
+    try:
+        doc = collection.find_one({"_id": key}, {"values": 1})
+    except Exception as e:
+        print(f"[search] query embedding lookup exception {e}")
+        doc = None
+    if doc and doc.get("values"):
+        values = doc["values"]
+        stat = "store_hits"
+    else:
+        values = list(_request_embedding(query))
+        stat = "misses"
+        try:
+            ensure_index(collection, [("created_at", ASCENDING)], expireAfterSeconds=QUERY_EMBEDDING_TTL_DAYS * 24 * 3600)
+            collection.update_one(
+                {"_id": key},
+                {"$set": {"query": query, "model": QUERY_EMBEDDING_MODEL, "values": values, "created_at": datetime.now()}},
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"[search] query embedding store exception {e}")
 
-    return None
+    with _embedding_lock:
+        _embedding_stats[stat] += 1
+        _embedding_cache[query] = values
+        _embedding_cache.move_to_end(query)
+        while len(_embedding_cache) > QUERY_EMBEDDING_CACHE_MAX:
+            _embedding_cache.popitem(last=False)
+    return values
 
 
-def _build_amount_text(policy: dict):
-    """
-    금액 표기 규칙:
-    - max > 0: min > 0이면 range, 아니면 최대
-    - max == 0 and min > 0: 최소
-    - min == 0 and max == 0: 미표시
-    - min/max 유효하지 않으면 텍스트에서 정규식 추출
-    """
-    earn = policy.get("earn") or {}
-    min_amt = _to_int_or_none(earn.get("min_amt"))
-    max_amt = _to_int_or_none(earn.get("max_amt"))
-
-    if max_amt is not None:
-        if max_amt > 0:
-            if min_amt is not None and min_amt > 0:
-                return f"{_format_money(min_amt)} ~ {_format_money(max_amt)}"
-            return f"최대 {_format_money(max_amt)}"
-
-        if max_amt == 0:
-            if min_amt is not None and min_amt > 0:
-                return f"최소 {_format_money(min_amt)}"
-            return None
-
-    if min_amt is not None and min_amt > 0:
-        return f"최소 {_format_money(min_amt)}"
-
-    return _extract_amount_text(
-        earn.get("etc_content"),
-        policy.get("support_content"),
-    )
+def get_embedding_stats():
+    with _embedding_lock:
+        return {**_embedding_stats, "cached": len(_embedding_cache)}
 
 
-def _enrich_policy_item(item: dict):
+def _enrich_policy_item(item: dict, pattern=None):
     """
-    프론트/평가 공통 사용 필드(doc_id, amount_text, summary_text)를 보강합니다.
+    프론트/평가 공통 사용 필드(doc_id, amount_text, summary_text, summary_highlights)를 보강합니다.
+    요약/금액은 수집 시 계산해 둔 search_snippet을 사용하고, 검색어 의존 부분(문장 선택, 하이라이트)만 계산합니다.
     """
     if "_id" in item and "doc_id" not in item:
         item["doc_id"] = str(item.pop("_id"))
     elif "doc_id" in item:
         item["doc_id"] = str(item["doc_id"])
 
-    item["amount_text"] = _build_amount_text(item)
-    item["summary_text"] = _build_summary_text(item, item.get("_query_terms", []))
-    item.pop("_query_terms", None)
-    item.pop("policy_summary", None)
-    item.pop("content_chunk_v3", None)
-    item.pop("content", None)
+    snippet = item.pop("search_snippet", None) or snippets.build_snippet(item)
+    item["amount_text"] = snippet.get("amount_text")
+    item["summary_text"], item["summary_highlights"] = snippets.summarize(snippet, pattern)
     return item
 
 
+def _fill_missing_snippets(rows):
+    """
+    search_snippet이 없는 정책(백필 전)은 원문으로 계산해 저장 후 사용
+    """
+    missing = [item["_id"] for item in rows if not item.get("search_snippet")]
+    if not missing:
+        return
+    try:
+        filled = snippets.store_snippets({"_id": {"$in": missing}})
+    except Exception as e:
+        print(f"[search] search_snippet fill exception {e}")
+        return
+    for item in rows:
+        if item["_id"] in filled:
+            item["search_snippet"] = filled[item["_id"]]
+
+
 # ============================================================================
 # 2️⃣ 필터 조건 생성 함수들
 # ============================================================================
@@ -373,11 +328,11 @@ def _build_policy_match(filters: dict | None):
                                 }
                             ]
                         },
-                        # Case 3: 기한 정보가 아예 없는 경우 (상시모집으로 간주)
+                        # Case 3: 기한 정보가 아예 없는 경우 (상시모집으로 간주, null도 없음으로 처리)
                         {
                             "$and": [
-                                {"$or": [{"dates.apply_period_end": {"$exists": False}}, {"dates.apply_period_end": ""}]},
-                                {"$or": [{"dates.apply_period": {"$exists": False}}, {"dates.apply_period": ""}]}
+                                {"dates.apply_period_end": {"$in": [None, ""]}},
+                                {"dates.apply_period": {"$in": [None, ""]}}
                             ]
                         }
                     ]
@@ -393,27 +348,6 @@ def _build_policy_match(filters: dict | None):
     return {"$and": conditions}
 
 
-def _lookup_match_from_policy_match(match: dict, prefix: str = "policy_detail"):
-    """
-    일반 필터 조건을 $lookup 후 사용할 조건으로 변환합니다.
-    """
-    if not match:
-        return {}
-
-    mapped = {}
-
-    for key, value in match.items():
-        if key.startswith("$"):
-            if isinstance(value, list):
-                mapped[key] = [_lookup_match_from_policy_match(item, prefix) for item in value]
-            else:
-                mapped[key] = value
-        else:
-            mapped[f"{prefix}.{key}"] = value
-
-    return mapped
-
-
 def _normalize_page(page: int, page_size: int):
     """
     페이지네이션 값을 안전한 범위로 조정합니다.
@@ -427,15 +361,25 @@ def _normalize_page(page: int, page_size: int):
 # 3️⃣ 메인 검색 함수
 # ============================================================================
 
+def _vector_window(page, page_size):
+    """
+    요청 페이지 끝까지 담는 가장 작은 후보 창 (VECTOR_WINDOW_POLICIES * 2^n)
+    """
+    window = VECTOR_WINDOW_POLICIES
+    while window < page * page_size:
+        window *= 2
+    return window
+
+
 def search_policies(query: str = "", filters: dict = None, page: int = 1, page_size: int = 20):
     """
     정책 검색 메인 함수
     - 검색어 없으면: 필터링된 전체 목록 반환
-    - 검색어 있으면: Gemini 임베딩 + Vector Search (score >= SCORE_THRESHOLD)
+    - 검색어 있으면: Vector Search (score >= 보정된 임계값, utils.retrieval) + BM25 키워드 검색을 RRF로 결합
     """
     page, page_size = _normalize_page(page, page_size)
     query = (query or "").strip()
-    terms = _query_terms(query)
+    pattern = snippets.compile_terms(query)
 
     print(f"DEBUG: 검색 시작 - query='{query}', filters={filters}, page={page}", flush=True)
 
@@ -446,9 +390,7 @@ def search_policies(query: str = "", filters: dict = None, page: int = 1, page_s
         "policy_name": 1,
         "category": 1,
         "sub_category": 1,
-        "policy_summary": 1,
-        "content_chunk_v3": 1,
-        "content": 1,
+        "search_snippet": 1,
         "support_content": 1,
         "supervising_agency": 1,
         "dates": 1,
@@ -475,9 +417,8 @@ def search_policies(query: str = "", filters: dict = None, page: int = 1, page_s
                 .limit(page_size)
             )
             rows = list(cursor)
-            for item in rows:
-                item["_query_terms"] = terms
-            results = [_enrich_policy_item(item) for item in rows]
+            _fill_missing_snippets(rows)
+            results = [_enrich_policy_item(item, pattern) for item in rows]
         except Exception as e:
             return {"error": f"목록 조회 실패: {str(e)}"}
 
@@ -487,24 +428,13 @@ def search_policies(query: str = "", filters: dict = None, page: int = 1, page_s
             "page": page,
             "page_size": page_size,
             "total": total,
+            "total_exact": True,
             "results": results,
         }
 
     # ── Case 2: 검색어 있음 (벡터 검색) ────────────────
     try:
-        client = get_genai_client()
-        response = client.models.embed_content(
-            model="gemini-embedding-001",
-            contents=query,
-        )
-
-        if hasattr(response, "embeddings"):
-            query_embedding = response.embeddings[0].values
-        elif hasattr(response, "embedding"):
-            query_embedding = response.embedding.values
-        else:
-            query_embedding = response.get("embedding", {}).get("values")
-
+        query_embedding = embed_query(query)
     except Exception as e:
         print(f"임베딩 생성 오류: {e}")
         return {"error": str(e)}
@@ -514,121 +444,81 @@ def search_policies(query: str = "", filters: dict = None, page: int = 1, page_s
     except Exception as e:
         return {"error": f"DB 연결 실패: {str(e)}"}
 
-    # 유사도 임계값 적용 시 실제 결과가 적을 수 있으므로
-    # numCandidates는 충분히 크게 유지
-    num_candidates = 858  # 전체 문서 수 기준
+    # 코퍼스 전체가 아니라 고정 후보 창(정책 수)만 탐색 (필터는 $vectorSearch 안에서 사전 적용)
+    # numCandidates/임계값은 검색 화면의 지연 시간/재현율 목표와 보정 결과로 결정
+    window = _vector_window(page, page_size)
+    params = retrieval.get_params("search", limit=window * VECTOR_CHUNKS_PER_POLICY)
+    vector_filter = prefilter.build_vector_filter(filters)
 
-    vector_search_stage = {
-        "index": "vector_index_v2",
-        "path": "embedding_gemini_v2",
-        "queryVector": query_embedding,
-        "numCandidates": num_candidates,
-        "limit": num_candidates,
-    }
-
-    pipeline = [
-        {"$vectorSearch": vector_search_stage},
-        # ✅ 유사도 점수 추출 후 임계값 필터링 (0.80 미만 제거)
-        {"$addFields": {"search_score": {"$meta": "vectorSearchScore"}}},
-        {"$match": {"search_score": {"$gte": SCORE_THRESHOLD}}},
+    # 벡터 검색은 정책 id/점수/정렬용 정책명만 반환 (정책 본문은 최종 페이지만 policies에서 조회)
+    vector_pipeline = [
+        retrieval.vector_search_stage("search", query_embedding, params, filter=vector_filter),
         {
-            "$lookup": {
-                "from": "policies",
-                "localField": "policy_id",
-                "foreignField": "_id",
-                "as": "policy_detail",
+            "$project": {
+                "_id": 0,
+                "policy_id": 1,
+                "policy_name": "$metadata.policy_name",
+                "search_score": {"$meta": "vectorSearchScore"},
             }
         },
-        {"$unwind": "$policy_detail"},
+        # ✅ 유사도 임계값 필터링 (임계값 미만 제거)
+        {"$match": {"search_score": {"$gte": params["score_threshold"]}}},
     ]
 
-    if base_match:
-        pipeline.append({"$match": _lookup_match_from_policy_match(base_match)})
-
-    # 키워드 검색 강화: 사용자가 입력한 query가 포함된 정책(이름 또는 키워드)에 가중치를 주거나 결과를 필터링
-    # Vector Search 결과 내역에서 명시적 텍스트 매칭이 있는 경우를 상단으로 끌어올리거나 병합
-    # 키워드 검색 강화: 사용자가 입력한 query가 포함된 정책에 가중치
-    if query:
-        pipeline.extend([
-            {
-                "$addFields": {
-                    "text_match_bonus": {
-                        "$cond": {
-                            "if": {
-                                "$or": [
-                                    {"$regexMatch": {"input": "$policy_detail.policy_name", "regex": query, "options": "i"}},
-                                    {"$regexMatch": {"input": {"$ifNull": ["$policy_detail.keywords", ""]}, "regex": query, "options": "i"}}
-                                ]
-                            },
-                            "then": 0.5,
-                            "else": 0
-                        }
-                    }
-                }
-            },
-            {
-                "$addFields": {
-                    "final_score": {"$add": ["$search_score", "$text_match_bonus"]}
-                }
-            }
-        ])
-
-    # 💡 메모리 한도 초과(32MB 제한)를 막기 위해 정렬($sort) 전에 불필요한 큰 데이터(content 등)를 미리 $project로 제거합니다.
-    pipeline.extend([
-        {
-            "$project": {
-                "_id": 0,
-                "policy_id": "$policy_detail.policy_id",
-                "doc_id": {"$toString": "$policy_detail._id"},
-                "policy_name": "$policy_detail.policy_name",
-                "category": "$policy_detail.category",
-                "sub_category": "$policy_detail.sub_category",
-                "policy_summary": "$policy_detail.policy_summary",
-                "content_chunk_v3": {
-                    "$ifNull": ["$policy_detail.content_chunk_v3", "$content_chunk_v3"]
-                },
-                "content": "$policy_detail.content",
-                "support_content": "$policy_detail.support_content",
-                "supervising_agency": "$policy_detail.supervising_agency",
-                "dates": "$policy_detail.dates",
-                "eligibility": "$policy_detail.eligibility",
-                "application_url": "$policy_detail.application_url",
-                "earn": "$policy_detail.earn",
-                "search_score": 1,
-                "final_score": {"$ifNull": ["$final_score", "$search_score"]} # query가 없을 때를 대비
-            }
-        }
-    ])
+    try:
+        vector_hits = {}
+        vector_chunks = 0
+        for hit in db["policy_vectors"].aggregate(vector_pipeline):
+            vector_chunks += 1
+            # 점수 내림차순이므로 정책별 첫 청크가 최고 점수
+            vector_hits.setdefault(hit.get("policy_id"), hit)
+        # 창 크기만큼의 정책만 사용 (청크 수와 무관하게 페이지 간 같은 후보 집합)
+        truncated = len(vector_hits) > window
+        if truncated:
+            vector_hits = dict(list(vector_hits.items())[:window])
+
+        # 키워드 검색: 정책명/키워드/지원내용/본문 청크 BM25 (정규식 대신 역색인)
+        lexical_hits = lexical.search(query, limit=LEXICAL_CANDIDATES)
+        if lexical_hits:
+            min_lexical = lexical_hits[0][1] * LEXICAL_MIN_SCORE_RATIO
+            lexical_hits = [(doc_id, score) for doc_id, score in lexical_hits if score >= min_lexical]
+        lexical_scores = dict(lexical_hits)
+
+        # 벡터 후보는 이미 필터를 통과했으므로 키워드 전용 후보만 같은 조건으로 확인 (최대 LEXICAL_CANDIDATES건, 정책명만)
+        names = {doc_id: hit.get("policy_name") or "" for doc_id, hit in vector_hits.items()}
+        lexical_only = [doc_id for doc_id in lexical_scores if doc_id not in vector_hits]
+        if lexical_only:
+            lexical_match = {"_id": {"$in": lexical_only}}
+            if base_match:
+                lexical_match = {"$and": [lexical_match, base_match]}
+            for p in db["policies"].find(lexical_match, {"policy_name": 1}):
+                names[p["_id"]] = p.get("policy_name") or ""
+
+        # 벡터 순위와 키워드 순위를 RRF로 결합 (필터를 통과한 후보만)
+        fused = lexical.rrf_fuse(
+            list(vector_hits),
+            [doc_id for doc_id, _score in lexical_hits if doc_id in names],
+        )
+        ranked = sorted(names, key=lambda doc_id: (-fused[doc_id], names[doc_id]))
+        total = len(ranked)
+        # 벡터 후보가 창/limit까지 찼으면 창 밖에 후보가 더 있을 수 있음 (total은 하한)
+        total_exact = not truncated and vector_chunks < params["limit"]
 
-    if query:
-        # query가 있을 때는 계산된 final_score 기준으로 정렬
-        pipeline.append({
-            "$sort": {"final_score": -1}
-        })
-    else:
-        # query가 없으면 (벡터 검색 미수행 시) 이름순 정렬
-        pipeline.append({
-            "$sort": {"policy_name": 1}
-        })
+        page_ids = ranked[skip:skip + page_size]
+        policies = {p["_id"]: p for p in db["policies"].find({"_id": {"$in": page_ids}}, projection)} if page_ids else {}
 
-    pipeline.extend([
-        {
-            "$facet": {
-                "meta": [{"$count": "total"}],
-                "items": [{"$skip": skip}, {"$limit": page_size}],
-            }
-        }
-    ])
+        rows = [policies[doc_id] for doc_id in page_ids if doc_id in policies]
+        _fill_missing_snippets(rows)
 
-    try:
-        aggregated = list(db["policy_vectors"].aggregate(pipeline, allowDiskUse=True))
-        payload = aggregated[0] if aggregated else {"meta": [], "items": []}
-        total = payload["meta"][0]["total"] if payload["meta"] else 0
-        rows = payload["items"]
+        results = []
         for item in rows:
-            item["_query_terms"] = terms
-        results = [_enrich_policy_item(item) for item in rows]
-        print(f"DEBUG: 벡터 검색 결과 total={total} (score>={SCORE_THRESHOLD})", flush=True)
+            doc_id = item["_id"]
+            hit = vector_hits.get(doc_id) or {}
+            item["search_score"] = hit.get("search_score")
+            item["lexical_score"] = round(lexical_scores[doc_id], 4) if doc_id in lexical_scores else None
+            item["final_score"] = fused[doc_id]
+            results.append(_enrich_policy_item(item, pattern))
+        print(f"DEBUG: 하이브리드 검색 결과 total={total} (vector={len(vector_hits)}, lexical={len(lexical_hits)}, exact={total_exact})", flush=True)
     except Exception as e:
         print(f"검색 실행 오류: {e}")
         return {"error": f"검색 실패: {str(e)}"}
@@ -639,5 +529,7 @@ def search_policies(query: str = "", filters: dict = None, page: int = 1, page_s
         "page": page,
         "page_size": page_size,
         "total": total,
+        "total_exact": total_exact,
+        "retrieval": params,
         "results": results,
     }
@@ -0,0 +1,210 @@
+"""
+검색 결과 카드용 요약/금액 문구
+- 정책 수집 시 문장 분리, 금액 추출, 기본 요약을 미리 계산해 policies.search_snippet에 저장
+- 검색 시에는 검색어 토큰을 정규식 하나로 컴파일해 저장된 문장 중 요약 문장 선택 + 하이라이트 위치만 계산
+- search_snippet이 없는 정책(백필 전)은 조회 시 같은 함수로 계산
+"""
+import re
+
+from pymongo import UpdateOne
+
+from utils.db import getMongoDbClient
+
+AMOUNT_TEXT_RE = re.compile(
+    r"(?:월|연|최대|최소)?\s*\d[\d,]*(?:\s*[~\-]\s*\d[\d,]*)?\s*(?:억|만원|천원|원)"
+)
+SUMMARY_SENTENCE_SPLIT_RE = re.compile(r"[.!?]\s+|\n+")
+TERM_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+
+SUMMARY_MIN_SENTENCE_LEN = 8
+SUMMARY_JOIN_MAX_LEN = 180  # 다음 문장을 이어 붙일 수 있는 최대 길이
+SUMMARY_MAX_LEN = 220
+SNIPPET_MAX_SENTENCES = 20  # 검색어 기반 문장 선택 후보로 저장할 문장 수
+
+STORE_BATCH_SIZE = 500
+
+# 백필 시 스니펫 계산에 필요한 policies 필드 (content_chunk_v3는 policy_vectors에서 결합)
+SOURCE_PROJECTION = {"policy_summary": 1, "support_content": 1, "content": 1, "earn": 1}
+
+
+def _to_int_or_none(value):
+    """
+    숫자/문자 값을 int로 변환합니다.
+    변환 불가/빈값은 None을 반환합니다.
+    """
+    if value is None:
+        return None
+
+    raw = str(value).strip().replace(",", "")
+    if raw == "":
+        return None
+
+    try:
+        return int(float(raw))
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_money(value: int):
+    return f"{value:,}원"
+
+
+def _extract_amount_text(*texts):
+    """
+    텍스트에서 금액 패턴(만원/원 등)을 정규식으로 추출합니다.
+    """
+    for text in texts:
+        if not text:
+            continue
+        match = AMOUNT_TEXT_RE.search(str(text))
+        if match:
+            return " ".join(match.group(0).split())
+    return None
+
+
+def _normalize_text(value):
+    if not value:
+        return ""
+    return " ".join(str(value).replace("\u00a0", " ").split())
+
+
+def build_amount_text(policy: dict):
+    """
+    금액 표기 규칙:
+    - max > 0: min > 0이면 range, 아니면 최대
+    - max == 0 and min > 0: 최소
+    - min == 0 and max == 0: 미표시
+    - min/max 유효하지 않으면 텍스트에서 정규식 추출
+    """
+    earn = policy.get("earn") or {}
+    min_amt = _to_int_or_none(earn.get("min_amt"))
+    max_amt = _to_int_or_none(earn.get("max_amt"))
+
+    if max_amt is not None:
+        if max_amt > 0:
+            if min_amt is not None and min_amt > 0:
+                return f"{_format_money(min_amt)} ~ {_format_money(max_amt)}"
+            return f"최대 {_format_money(max_amt)}"
+
+        if max_amt == 0:
+            if min_amt is not None and min_amt > 0:
+                return f"최소 {_format_money(min_amt)}"
+            return None
+
+    if min_amt is not None and min_amt > 0:
+        return f"최소 {_format_money(min_amt)}"
+
+    return _extract_amount_text(
+        earn.get("etc_content"),
+        policy.get("support_content"),
+    )
+
+
+def _compose_summary(sentences, idx):
+    summary = sentences[idx]
+    if idx + 1 < len(sentences):
+        next_sentence = sentences[idx + 1]
+        if len(summary) + len(next_sentence) <= SUMMARY_JOIN_MAX_LEN:
+            summary = f"{summary}. {next_sentence}"
+    return summary[:SUMMARY_MAX_LEN]
+
+
+def build_snippet(policy: dict):
+    """
+    요약 원문 우선순위 policy_summary -> content_chunk_v3 -> support_content -> content 중
+    첫 번째로 내용이 있는 필드를 문장 단위로 나눠 저장용 스니펫 생성
+    - summary_text: 검색어 없이 고른 기본 요약 (금액이 들어간 첫 문장, 없으면 첫 문장)
+    - sentences / amount_idx: 검색어 기반 문장 선택용 후보와 금액 포함 문장 위치
+    """
+    snippet = {"amount_text": build_amount_text(policy), "summary_text": None, "sentences": [], "amount_idx": []}
+
+    for field in ("policy_summary", "content_chunk_v3", "support_content", "content"):
+        normalized = _normalize_text(policy.get(field))
+        if not normalized:
+            continue
+
+        sentences = [
+            s for s in (s.strip() for s in SUMMARY_SENTENCE_SPLIT_RE.split(normalized))
+            if len(s) >= SUMMARY_MIN_SENTENCE_LEN
+        ][:SNIPPET_MAX_SENTENCES]
+        if not sentences:
+            snippet["summary_text"] = normalized[:SUMMARY_JOIN_MAX_LEN]
+            return snippet
+
+        amount_idx = [idx for idx, s in enumerate(sentences) if AMOUNT_TEXT_RE.search(s)]
+        snippet.update({
+            "summary_text": _compose_summary(sentences, amount_idx[0] if amount_idx else 0),
+            "sentences": sentences,
+            "amount_idx": amount_idx,
+        })
+        return snippet
+
+    return snippet
+
+
+def compile_terms(query: str):
+    """
+    검색어 토큰(2글자 이상)을 긴 토큰 우선 alternation 정규식 하나로 컴파일 (토큰이 없으면 None)
+    """
+    terms = {token for token in TERM_RE.findall(str(query or "").lower()) if len(token) >= 2}
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(t) for t in sorted(terms, key=lambda t: (-len(t), t))), re.IGNORECASE)
+
+
+def summarize(snippet: dict, pattern):
+    """
+    저장된 스니펫 + 컴파일된 검색어 패턴 -> (요약 문장, 하이라이트 [start, end] 목록)
+    검색어가 들어간 문장이 없으면 기본 요약 사용
+    """
+    summary = snippet.get("summary_text")
+    sentences = snippet.get("sentences") or []
+    if pattern is None or not sentences:
+        return summary, _highlights(summary, pattern)
+
+    amount_idx = set(snippet.get("amount_idx") or [])
+    best_idx, best_score = None, 0
+    for idx, sentence in enumerate(sentences):
+        hits = len({m.lower() for m in pattern.findall(sentence)})
+        if hits and hits + (idx in amount_idx) > best_score:
+            best_idx, best_score = idx, hits + (idx in amount_idx)
+
+    if best_idx is not None:
+        summary = _compose_summary(sentences, best_idx)
+    return summary, _highlights(summary, pattern)
+
+
+def _highlights(text, pattern):
+    if not text or pattern is None:
+        return []
+    return [[m.start(), m.end()] for m in pattern.finditer(text)]
+
+
+def store_snippets(policy_match=None, db=None):
+    """
+    policies 원문으로 search_snippet을 계산해 저장 (기존 데이터 백필, 백필 전 정책의 조회 시 보충)
+    반환: {정책 _id: 스니펫}
+    """
+    db = db or getMongoDbClient()
+    sources = {p["_id"]: p for p in db["policies"].find(policy_match or {}, SOURCE_PROJECTION)}
+    if not sources:
+        return {}
+
+    chunk_match = {"policy_id": {"$in": list(sources)}} if policy_match else {}
+    for v in db["policy_vectors"].find(chunk_match, {"policy_id": 1, "chunk_id": 1, "content_chunk_v3": 1}).sort("chunk_id", 1):
+        policy = sources.get(v.get("policy_id"))
+        # 수집 시와 같게 첫 청크를 사용
+        if policy is not None and v.get("content_chunk_v3") and "content_chunk_v3" not in policy:
+            policy["content_chunk_v3"] = v["content_chunk_v3"]
+
+    result = {}
+    ops = []
+    for doc_id, policy in sources.items():
+        result[doc_id] = build_snippet(policy)
+        ops.append(UpdateOne({"_id": doc_id}, {"$set": {"search_snippet": result[doc_id]}}))
+        if len(ops) >= STORE_BATCH_SIZE:
+            db["policies"].bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        db["policies"].bulk_write(ops, ordered=False)
+    return result
@@ -51,6 +51,28 @@ function truncateText(text, maxLength = 100) {
     return text.length > maxLength ? `${text.substring(0, maxLength)}...` : text;
 }
 
+/**
+ * 텍스트를 자르고 검색어 위치([start, end] 목록)를 <mark>로 감쌉니다.
+ * @param {string} text
+ * @param {Array<Array<number>>} spans
+ * @param {number} maxLength
+ * @returns {string}
+ */
+function highlightText(text, spans, maxLength = 100) {
+    if (!text) return "";
+    const limit = Math.min(text.length, maxLength);
+    let html = "";
+    let cursor = 0;
+    for (const [start, end] of spans || []) {
+        if (start < cursor || start >= limit) continue;
+        const stop = Math.min(end, limit);
+        html += `${text.substring(cursor, start)}<mark>${text.substring(start, stop)}</mark>`;
+        cursor = stop;
+    }
+    html += text.substring(cursor, limit);
+    return text.length > maxLength ? `${html}...` : html;
+}
+
 /**
  * 텍스트에서 금액(만원/원 등)을 정규식으로 추출합니다.
  * @param {string} text
@@ -178,6 +200,48 @@ async function searchPoliciesAPI(query, filters = {}, page = 1) {
 }
 
 
+/**
+ * 검색어 자동완성 후보 API 호출
+ *
+ * @param {string} prefix - 입력 중인 검색어
+ * @returns {Promise<Array<Object>>} [{text, type}] (에러 시 빈 배열)
+ */
+async function fetchSuggestionsAPI(prefix) {
+    try {
+        const params = new URLSearchParams({ q: prefix });
+        const response = await fetch(`/search/api/suggest?${params.toString()}`);
+        if (!response.ok) return [];
+        const data = await response.json();
+        return data.suggestions || [];
+    } catch (error) {
+        console.error("자동완성 오류:", error);
+        return [];
+    }
+}
+
+/**
+ * 입력값 기준 자동완성 후보를 datalist에 채웁니다.
+ * @param {string} prefix
+ */
+async function updateSuggestions(prefix) {
+    const datalist = document.getElementById("searchSuggestions");
+    if (!datalist) return;
+
+    const trimmed = (prefix || "").trim();
+    const suggestions = trimmed ? await fetchSuggestionsAPI(trimmed) : [];
+
+    // 응답을 기다리는 동안 입력이 바뀌었으면 이전 결과는 버림
+    if ((document.getElementById("searchInput")?.value || "").trim() !== trimmed) return;
+
+    datalist.innerHTML = "";
+    suggestions.forEach((item) => {
+        const option = document.createElement("option");
+        option.value = item.text;
+        datalist.appendChild(option);
+    });
+}
+
+
 // ============================================================================
 // 2️⃣ 검색 실행 및 필터 수집
 // ============================================================================
@@ -234,7 +298,9 @@ async function performSearch(page = 1) {
 
             const resultCount = document.getElementById("resultCount");
             if (resultCount) {
-                resultCount.textContent = `전체 ${result.total}개 정책`;
+                // total_exact=false: 뒤 페이지 후보를 아직 탐색하지 않아 total은 하한
+                const suffix = result.total_exact === false ? "+" : "";
+                resultCount.textContent = `전체 ${result.total}${suffix}개 정책`;
             }
 
             renderPagination(result.total, result.page, result.page_size);
@@ -269,8 +335,9 @@ function displaySearchResults(policies) {
         const detailUrl = policy.policy_id ? `/policy/?id=${encodeURIComponent(policy.policy_id)}` : "#";
         const amountText = getAmountText(policy);
         const ddayLabel = getDdayLabel(policy);
-        const summaryBase = policy.summary_text || policy.support_content || policy.content || "";
-        const supportSummary = truncateText(summaryBase, 100) || "내용 없음";
+        const supportSummary = policy.summary_text
+            ? highlightText(policy.summary_text, policy.summary_highlights, 100)
+            : truncateText(policy.support_content || policy.content || "", 100) || "내용 없음";
         const isClosed = ddayLabel === "마감";
 
         return `
@@ -0,0 +1,162 @@
+"""
+검색어 자동완성 (typeahead)
+- 정책명, 키워드, 서브카테고리, 인기 검색어(search_popular_queries)로 후보를 만들고
+  후보의 각 단어 시작 위치부터의 문자열을 정렬 배열에 넣어 bisect로 접두어 범위를 찾고 범위 안에서 상위 N개 선택
+- 워커별 메모리 색인. 요청 처리 중에는 Mongo/LLM을 호출하지 않음
+  (최초 1회만 동기 구축, 이후 코퍼스 버전이 바뀌거나 REFRESH_INTERVAL이 지나면 백그라운드에서 다시 구축하고
+  그동안은 이전 색인으로 응답)
+- 수집(import) 시 refresh()로 해당 워커에 즉시 반영
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from utils.corpus import get_corpus_version
+from utils.db import getMongoDbClient
+
+from .facets import split_tokens
+from .query_log import POPULAR_MIN_COUNT, POPULAR_MIN_SESSIONS, POPULAR_QUERIES_COLLECTION
+
+REFRESH_INTERVAL = 3600  # 초. 코퍼스 버전이 그대로여도 인기 검색어 집계 반영을 위해 주기적으로 재구축
+POPULAR_QUERIES_LIMIT = 500
+POPULAR_WEIGHT = 3  # 인기 검색어 1회 = 정책 3건에 해당하는 가중치
+SUGGEST_LIMIT = 8
+PREFIX_END = "\U0010ffff"  # 접두어 범위 끝 (어떤 문자보다 큰 값)
+
+# 후보 종류별 우선순위 (같은 가중치면 인기 검색어 > 키워드 > 서브카테고리 > 정책명)
+KIND_ORDER = {"query": 0, "keyword": 1, "category": 2, "policy": 3}
+
+
+def normalize(text):
+    return " ".join(str(text or "").lower().split())
+
+
+class SuggestIndex:
+    def __init__(self, entries):
+        """
+        entries: {표시 문자열: (종류, 가중치)}
+        """
+        self.terms = []  # (표시 문자열, 종류, 가중치)
+        keys = []
+        for text, (kind, weight) in entries.items():
+            term_idx = len(self.terms)
+            self.terms.append((text, kind, weight))
+            normalized = normalize(text)
+            # 단어 중간에서 입력을 시작해도 찾도록 각 단어 시작 위치부터의 접미 문자열을 색인
+            starts = [0] + [i + 1 for i, ch in enumerate(normalized) if ch == " "]
+            for start in starts:
+                keys.append((normalized[start:], term_idx))
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.term_ids = [term_idx for _, term_idx in keys]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        # 접두어로 시작하는 키 전체 범위 (짧은 접두어에서도 정렬 순서상 뒤쪽 후보를 놓치지 않음)
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, start)
+        matched = set(self.term_ids[start:end])
+
+        ranked = heapq.nsmallest(
+            limit,
+            (self.terms[idx] for idx in matched),
+            key=lambda term: (-term[2], KIND_ORDER.get(term[1], 9), len(term[0]), term[0]),
+        )
+        return [{"text": text, "type": kind} for text, kind, _weight in ranked]
+
+
+def build_entries(db=None):
+    """
+    정책 텍스트 필드와 인기 검색어로 자동완성 후보 {표시 문자열: (종류, 가중치)} 생성
+    가중치: 해당 후보를 가진 정책 수 (인기 검색어는 검색 횟수 * POPULAR_WEIGHT)
+    """
+    db = db or getMongoDbClient()
+    counts = {kind: Counter() for kind in KIND_ORDER}
+
+    for p in db["policies"].find({}, {"_id": 0, "policy_name": 1, "keywords": 1, "sub_categories": 1, "sub_category": 1}):
+        if p.get("policy_name"):
+            counts["policy"][" ".join(str(p["policy_name"]).split())] += 1
+        counts["keyword"].update(set(split_tokens(p.get("keywords"))))
+        counts["category"].update(set(split_tokens(p.get("sub_categories")) + split_tokens(p.get("sub_category"))))
+
+    # rollup 기준을 다시 확인 (기준 도입 전에 집계된 문서나 기준을 낮춘 뒤 남은 문서는 노출하지 않음)
+    popular_match = {"count": {"$gte": POPULAR_MIN_COUNT}, "sessions": {"$gte": POPULAR_MIN_SESSIONS}}
+    popular_fields = {"_id": 0, "query": 1, "count": 1, "zero_count": 1}
+    for q in db[POPULAR_QUERIES_COLLECTION].find(popular_match, popular_fields).sort("count", -1).limit(POPULAR_QUERIES_LIMIT):
+        if q.get("query") and int(q.get("zero_count") or 0) < int(q.get("count") or 0):
+            counts["query"][normalize(q["query"])] += int(q.get("count") or 0) * POPULAR_WEIGHT
+
+    entries = {}
+    # 같은 문자열이 여러 종류에 있으면 가중치는 합치고 종류는 우선순위가 높은 쪽으로 표시
+    for kind in sorted(KIND_ORDER, key=KIND_ORDER.get):
+        for text, weight in counts[kind].items():
+            if text in entries:
+                entries[text] = (entries[text][0], entries[text][1] + weight)
+            else:
+                entries[text] = (kind, weight)
+    return entries
+
+
+_index = SuggestIndex({})
+_state = {"version": None, "built_at": 0.0, "building": False}
+_lock = threading.Lock()
+
+
+def refresh(version=None):
+    """
+    자동완성 색인 다시 구축 (정책 수집 직후, 코퍼스 버전 변경 시)
+    """
+    global _index
+    version = get_corpus_version() if version is None else version
+    index = SuggestIndex(build_entries())
+    with _lock:
+        _index = index
+        _state["version"] = version
+        _state["built_at"] = time.monotonic()
+        _state["building"] = False
+    print(f"[search_suggest] refreshed version:{version}, terms:{len(index)}, keys:{len(index.keys)}")
+    return index
+
+
+def _refresh_in_background(version):
+    try:
+        refresh(version)
+    except Exception as e:
+        print(f"[search_suggest] refresh exception {e}")
+        with _lock:
+            _state["building"] = False
+
+
+def _ensure_fresh():
+    version = get_corpus_version()
+    with _lock:
+        fresh = _state["version"] == version and time.monotonic() - _state["built_at"] < REFRESH_INTERVAL
+        if fresh or _state["building"]:
+            return
+        _state["building"] = True
+        first = _state["version"] is None
+
+    if first:
+        _refresh_in_background(version)
+    else:
+        threading.Thread(target=_refresh_in_background, args=(version,), name="search-suggest-refresh", daemon=True).start()
+
+
+def suggest(prefix, limit=SUGGEST_LIMIT):
+    try:
+        _ensure_fresh()
+    except Exception as e:
+        print(f"[search_suggest] sync exception {e}")
+    return _index.search(prefix, limit)
+
+
+def get_stats():
+    return {"terms": len(_index), "keys": len(_index.keys), "version": _state["version"]}
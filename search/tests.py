@@ -1,3 +1,80 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import mongomock
+from django.test import SimpleTestCase
+
+from search import prefilter
+from search.services import _build_policy_match
+
+PAST = "20000101"
+FUTURE = "29991231"
+
+# openOnly 경계 사례: (이름, dates)
+OPEN_ONLY_CASES = [
+    ("end_future", {"apply_period_end": FUTURE}),
+    ("end_past", {"apply_period_end": PAST}),
+    ("end_past_period_future", {"apply_period_end": PAST, "apply_period": f"{PAST} ~ {FUTURE}"}),
+    ("end_future_period_past", {"apply_period_end": FUTURE, "apply_period": f"{PAST} ~ {PAST}"}),
+    ("period_future", {"apply_period": f"{PAST} ~ {FUTURE}"}),
+    ("period_past", {"apply_period": f"{PAST} ~ {PAST}"}),
+    ("period_without_end", {"apply_period": "상시"}),
+    ("no_dates", {}),
+    ("empty_strings", {"apply_period_end": "", "apply_period": ""}),
+    ("nulls", {"apply_period_end": None, "apply_period": None}),
+    ("closed_type", {"apply_period_type": "마감", "apply_period_end": FUTURE}),
+]
+
+
+_Parser = mongomock.aggregate._Parser
+_handle_string_operator = _Parser._handle_string_operator
+_handle_project_operator = _Parser._handle_project_operator
+
+
+# mongomock 4.x와 MongoDB 동작 차이 보충 (목록 조회 조건의 apply_period 파싱 평가용)
+def _handle_string_operator_with_trim(parser, operator, values):
+    # $trim 미구현
+    if operator == "$trim":
+        value = parser.parse(values["input"])
+        return value.strip() if isinstance(value, str) else value
+    return _handle_string_operator(parser, operator, values)
+
+
+def _handle_project_operator_with_missing(parser, operator, values):
+    # null 또는 범위 밖 $arrayElemAt: MongoDB는 null/missing을 반환하지만 mongomock은 예외
+    if operator == "$arrayElemAt":
+        array, index = (parser.parse(v) for v in values)
+        if array is None or not -len(array) <= index < len(array):
+            return None
+    return _handle_project_operator(parser, operator, values)
+
+
+class OpenOnlyPrefilterTests(SimpleTestCase):
+    """
+    openOnly 필터: 벡터 사전 필터(policy_vectors.metadata)와 목록 조회 조건(policies)이 같은 정책을 고르는지 확인
+    """
+
+    def setUp(self):
+        for name, handler in (
+            ("_handle_string_operator", _handle_string_operator_with_trim),
+            ("_handle_project_operator", _handle_project_operator_with_missing),
+        ):
+            patcher = mock.patch.object(_Parser, name, handler)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.db = mongomock.MongoClient().db
+        for name, dates in OPEN_ONLY_CASES:
+            policy = {"_id": name, "dates": dates}
+            self.db["policies"].insert_one(policy)
+            self.db["policy_vectors"].insert_one({"policy_id": name, "metadata": prefilter.build_vector_metadata(policy)})
+
+    def test_vector_filter_matches_policy_match(self):
+        filters = {"openOnly": True}
+        from_policies = {p["_id"] for p in self.db["policies"].find(_build_policy_match(filters))}
+        from_vectors = {v["policy_id"] for v in self.db["policy_vectors"].find(prefilter.build_vector_filter(filters))}
+
+        self.assertEqual(from_vectors, from_policies)
+        self.assertEqual(from_policies, {
+            "end_future", "end_past_period_future", "end_future_period_past", "period_future",
+            "no_dates", "empty_strings", "nulls",
+        })
@@ -18,4 +18,8 @@ urlpatterns = [
     path("api/filter-options", views.filter_options_api, name="filter_options_api"),
     # 검색 API
     path("api/search", views.search_policies_api, name="search_policies_api"),
+    # 자동완성 API
+    path("api/suggest", views.suggest_api, name="search_suggest_api"),
+    # 검색 지표 API
+    path("api/stats", views.search_stats_api, name="search_stats_api"),
 ]
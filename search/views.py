@@ -4,16 +4,23 @@
 - 정책 검색 API 응답
 """
 
-from collections import Counter
+import hashlib
+from time import perf_counter
 
 from django.http import JsonResponse
 from django.shortcuts import render
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 
-from .services import search_policies
-from utils.db import getMongoDbClient
+from utils import retrieval
+from utils.auth import get_login_user_id, staff_required
 
-MIN_JOB_STATUS_COUNT = 20
+from . import facets, lexical, query_log, result_cache, suggest
+from .services import get_embedding_stats
+
+FILTER_OPTIONS_MAX_AGE = 300  # 초. 만료 후에는 ETag로 재검증 (정책 수집 주기보다 충분히 짧게)
+SUGGEST_MAX_AGE = 60  # 초. 같은 접두어 재입력 시 브라우저 캐시 사용
+SUGGEST_MAX_LIMIT = 20
 
 
 # ============================================================================
@@ -44,79 +51,24 @@ def index(request):
 # 2️⃣ 필터 옵션 API
 # ============================================================================
 
+def _filter_options_etag(request):
+    try:
+        return facets.get_facets()["etag"]
+    except Exception as error:
+        print(f"Filter Options ETag Error: {error}", flush=True)
+        return None
+
+
 @require_http_methods(["GET"])
+@cache_control(public=True, max_age=FILTER_OPTIONS_MAX_AGE)
+@condition(etag_func=_filter_options_etag)
 def filter_options_api(request):
     """
     카테고리/서브카테고리/지역/직업상태 필터 옵션을 반환합니다.
-    현재 UI 정책상 상위 카테고리는 일자리/교육으로 고정합니다.
+    수집 시 미리 계산해 둔 search_facets 문서를 사용하며, If-None-Match가 일치하면 304를 반환합니다.
     """
     try:
-        db = getMongoDbClient()
-        policies = db["policies"]
-
-        def split_tokens(value):
-            if value is None:
-                return []
-            if isinstance(value, list):
-                raw = value
-            else:
-                raw = str(value).split(",")
-
-            tokens = []
-            for item in raw:
-                token = str(item).strip()
-                if token:
-                    tokens.append(token)
-            return tokens
-
-        categories = ["일자리", "교육"]
-        sub_categories = {}
-
-        for category in categories:
-            raw_values = policies.distinct(
-                "sub_category",
-                {"category": {"$regex": category}}
-            )
-
-            cleaned = set()
-            for value in raw_values:
-                for token in split_tokens(value):
-                    cleaned.add(token)
-
-            sub_categories[category] = sorted(cleaned)
-
-        job_counter = Counter()
-        region_counter = Counter()
-        for doc in policies.find({}, {"job_type": 1, "region": 1, "_id": 0}):
-            for token in split_tokens(doc.get("job_type")):
-                job_counter[token] += 1
-            for token in split_tokens(doc.get("region")):
-                region_counter[token] += 1
-
-        # UI에서는 이미 fallback OR(제한없음)을 사용하므로 직업 상태 옵션에서는 제외
-        job_statuses = [
-            token for token, _count in sorted(
-                job_counter.items(),
-                key=lambda x: (-x[1], x[0])
-            )
-            if token != "제한없음" and _count >= MIN_JOB_STATUS_COUNT
-        ]
-
-        # UI에서 특정 지역 선택 시 '전국'은 자동 포함되므로 옵션 목록에서는 제외
-        regions = [
-            token for token, _count in sorted(
-                region_counter.items(),
-                key=lambda x: (-x[1], x[0])
-            )
-            if token != "전국"
-        ]
-
-        return JsonResponse({
-            "categories": categories,
-            "sub_categories": sub_categories,
-            "job_statuses": job_statuses,
-            "regions": regions,
-        })
+        return JsonResponse(facets.get_facets()["facets"])
     except Exception as error:
         print(f"Filter Options API Error: {error}", flush=True)
         return JsonResponse({"error": "Failed to load filter options."}, status=500)
@@ -126,6 +78,34 @@ def filter_options_api(request):
 # 3️⃣ 검색 API
 # ============================================================================
 
+def _session_hash(request):
+    """
+    인기 검색어 집계용 요청자 구분 값 (로그인 id > 세션 키 > IP를 해시해서만 기록)
+    검색만으로 세션을 새로 만들지는 않습니다.
+    """
+    raw = get_login_user_id(request) or request.session.session_key or request.META.get("REMOTE_ADDR") or ""
+    return hashlib.sha256(str(raw).encode("utf-8")).hexdigest()[:16] if raw else None
+
+
+def _log_query(request, result, query, filters, page, latency_ms):
+    """검색 이벤트를 질의 로그 버퍼에 추가합니다. (DB 기록은 배치로 비동기 처리)"""
+    try:
+        scores = [item.get("search_score") for item in result.get("results", []) if item.get("search_score") is not None]
+        query_log.record(
+            # 인기 검색어 집계는 캐시 키와 같은 정규화 검색어 기준
+            query=result_cache.normalize_query(result.get("query", query)),
+            filters=result.get("filters", filters),
+            page=result.get("page", page),
+            total=result.get("total"),
+            latency_ms=latency_ms,
+            top_score=max(scores) if scores else None,
+            error="error" in result,
+            session=_session_hash(request),
+        )
+    except Exception as error:
+        print(f"Search Query Log Error: {error}", flush=True)
+
+
 @require_http_methods(["GET"])
 def search_policies_api(request):
     """검색어/필터/페이지 정보를 받아 정책 검색 결과를 반환합니다."""
@@ -164,7 +144,10 @@ def search_policies_api(request):
         page = _to_int(request.GET.get("page"), 1)
         page_size = _to_int(request.GET.get("page_size"), 20)
 
-        result = search_policies(query=query, filters=filters, page=page, page_size=page_size)
+        # 같은 조합은 캐시에서 응답 (코퍼스 버전 + 짧은 TTL), 1페이지면 다음 페이지 미리 계산
+        started = perf_counter()
+        result = result_cache.cached_search(query=query, filters=filters, page=page, page_size=page_size)
+        _log_query(request, result, query, filters, page, (perf_counter() - started) * 1000)
 
         if "error" in result:
             return JsonResponse(result, status=500)
@@ -174,3 +157,35 @@ def search_policies_api(request):
     except Exception as error:
         print(f"Search API Error: {error}", flush=True)
         return JsonResponse({"error": "Internal Server Error"}, status=500)
+
+
+# ============================================================================
+# 4️⃣ 자동완성 API
+# ============================================================================
+
+@require_http_methods(["GET"])
+@cache_control(public=True, max_age=SUGGEST_MAX_AGE)
+def suggest_api(request):
+    """입력 중인 검색어(q)의 자동완성 후보를 반환합니다. 메모리 색인만 사용합니다."""
+    prefix = request.GET.get("q", "")
+    limit = min(max(_to_int(request.GET.get("limit"), suggest.SUGGEST_LIMIT), 1), SUGGEST_MAX_LIMIT)
+    try:
+        return JsonResponse({"query": prefix, "suggestions": suggest.suggest(prefix, limit)})
+    except Exception as error:
+        print(f"Suggest API Error: {error}", flush=True)
+        return JsonResponse({"query": prefix, "suggestions": []})
+
+
+@require_http_methods(["GET"])
+@staff_required
+def search_stats_api(request):
+    """검색 응답/임베딩 캐시 적중률, 키워드/자동완성 색인 상태, 질의 로그 버퍼 상태, 벡터 검색 보정 상태를 반환합니다."""
+    data = {
+        "result_cache": result_cache.get_stats(),
+        "lexical": lexical.get_stats(),
+        "suggest": suggest.get_stats(),
+        "query_embedding": get_embedding_stats(),
+        "query_log": query_log.get_stats(),
+        "retrieval": retrieval.get_stats(),
+    }
+    return JsonResponse({"status": "success", "data": data}, json_dumps_params={"ensure_ascii": False})
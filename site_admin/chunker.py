@@ -0,0 +1,169 @@
+"""
+정책 본문 패시지 청크
+- 수집 시 정책마다 템플릿 문장(정책명/지역/관심분야/키워드/설명) 청크 1개(chunk_id 1)만 임베딩하던 것에 더해
+  본문 필드(content, support_content, eligibility.text, required_docs_text)를 문장 단위로 겹쳐 나눈 패시지를
+  chunk_id 2부터 같은 policy_vectors에 저장 (embedding_gemini_v3, content_chunk_v3, metadata는 템플릿 청크와 동일)
+- 임베딩은 여러 정책의 패시지를 모아 EMBED_BATCH_SIZE 단위로 요청
+- 정책 단위 점수는 청크 점수의 최댓값 (추천 $group / utils.local_vectors 참고)
+- 패시지는 embedding_gemini_v3만 만들므로 추천(v3) 전용. 검색/챗봇은 embedding_gemini_v2로 검색하고
+  챗봇 질의는 다른 모델(OpenAI) 임베딩이라 같은 패시지 벡터를 쓸 수 없어 템플릿 청크만 대상
+- 키워드(BM25) 색인과 검색 카드 요약은 템플릿 청크만 사용
+"""
+import re
+from datetime import datetime
+
+from utils.db import getMongoDbClient
+
+TEMPLATE_CHUNK_ID = 1
+PASSAGE_FIELDS = [
+    ("content", "정책 설명"),
+    ("support_content", "지원 내용"),
+    ("eligibility.text", "추가 자격 조건"),
+    ("required_docs_text", "제출 서류"),
+]
+PASSAGE_MAX_CHARS = 400
+PASSAGE_OVERLAP_CHARS = 100  # 앞 패시지 끝 문장을 이만큼까지 다음 패시지 앞에 반복
+PASSAGE_MIN_CHARS = 20  # 이보다 짧은 필드는 템플릿 청크로 충분하다고 보고 건너뜀
+MAX_PASSAGES_PER_POLICY = 12
+EMBED_BATCH_SIZE = 100  # Gemini batchEmbedContents 요청당 최대 텍스트 수
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _get_path(doc, path):
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def _sentences(text):
+    sentences = []
+    for raw in SENTENCE_SPLIT_RE.split(str(text or "").replace("\u00a0", " ")):
+        sentence = " ".join(raw.split())
+        if not sentence:
+            continue
+        # 한 문장이 너무 길면 겹치는 고정 길이 구간으로 자름
+        step = PASSAGE_MAX_CHARS - PASSAGE_OVERLAP_CHARS
+        while len(sentence) > PASSAGE_MAX_CHARS:
+            sentences.append(sentence[:PASSAGE_MAX_CHARS])
+            sentence = sentence[step:]
+        sentences.append(sentence)
+    return sentences
+
+
+def split_passages(text):
+    """
+    문장 단위로 PASSAGE_MAX_CHARS까지 묶고, 앞 패시지의 끝 문장들(PASSAGE_OVERLAP_CHARS 이내)을 다음 패시지 앞에 겹침
+    """
+    passages, current = [], []
+    for sentence in _sentences(text):
+        if current and len(" ".join(current + [sentence])) > PASSAGE_MAX_CHARS:
+            passages.append(" ".join(current))
+            overlap = []
+            for prev in reversed(current):
+                candidate = [prev] + overlap
+                if len(" ".join(candidate)) > PASSAGE_OVERLAP_CHARS or len(" ".join(candidate + [sentence])) > PASSAGE_MAX_CHARS:
+                    break
+                overlap.insert(0, prev)
+            current = overlap
+        current.append(sentence)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def build_passages(policy):
+    """
+    정책 문서 -> [(원본 필드, 임베딩할 패시지 텍스트)]
+    패시지 앞에 정책명과 필드 이름을 붙여 패시지만으로도 어느 정책의 어떤 내용인지 드러나게 함
+    """
+    name = " ".join(str(policy.get("policy_name") or "").split())
+    passages, seen = [], set()
+    for field, label in PASSAGE_FIELDS:
+        text = _get_path(policy, field)
+        if not text or len(str(text).strip()) < PASSAGE_MIN_CHARS:
+            continue
+        for passage in split_passages(text):
+            if passage in seen:
+                continue
+            seen.add(passage)
+            passages.append((field, f"정책명 : {name}\n{label} : {passage}"))
+    return passages[:MAX_PASSAGES_PER_POLICY]
+
+
+def embed_in_batches(texts, embed_fn, batch_size=EMBED_BATCH_SIZE):
+    """
+    embed_fn(텍스트 목록) -> 임베딩 목록 을 batch_size 단위로 호출해 순서대로 이어 붙임
+    """
+    embeddings = []
+    for start in range(0, len(texts), batch_size):
+        embeddings.extend(embed_fn(texts[start:start + batch_size]))
+    return embeddings
+
+
+def build_passage_docs(data_docs, template_vector_docs, embed_fn, inserted_at=None):
+    """
+    정책 문서들의 패시지 청크를 한 번에 임베딩해 policy_vectors 문서로 변환
+    metadata(검색 필터 필드 포함)는 같은 정책의 템플릿 청크에서 복사
+    """
+    inserted_at = inserted_at or datetime.now()
+    metadata_by_id = {
+        v["policy_id"]: v.get("metadata") or {}
+        for v in template_vector_docs if v.get("chunk_id") == TEMPLATE_CHUNK_ID
+    }
+
+    pending = []  # (정책 _id, chunk_id, 원본 필드, 텍스트)
+    for doc in data_docs:
+        if doc["_id"] not in metadata_by_id:
+            continue
+        for offset, (field, text) in enumerate(build_passages(doc)):
+            pending.append((doc["_id"], TEMPLATE_CHUNK_ID + 1 + offset, field, text))
+    if not pending:
+        return []
+
+    embeddings = embed_in_batches([text for *_rest, text in pending], embed_fn)
+    return [
+        {
+            "policy_id": policy_id,
+            "chunk_id": chunk_id,
+            "source_field": field,
+            "metadata": metadata_by_id[policy_id],
+            "inserted_at": inserted_at,
+            "content_chunk_v3": text,
+            "embedding_gemini_v3": embedding,
+        }
+        for (policy_id, chunk_id, field, text), embedding in zip(pending, embeddings)
+    ]
+
+
+def store_passages(embed_fn, policy_match=None, missing_only=False, db=None):
+    """
+    기존 정책의 패시지 청크를 다시 만들어 저장 (백필, 본문 수정 반영)
+    정책의 기존 패시지(chunk_id > 1)는 지우고 새로 넣음. 반환: (정책 수, 패시지 수)
+    """
+    db = db or getMongoDbClient()
+    vectors = db["policy_vectors"]
+    projection = {"policy_name": 1, **{field: 1 for field, _label in PASSAGE_FIELDS}}
+    policies = list(db["policies"].find(policy_match or {}, projection))
+    if missing_only:
+        done = set(vectors.distinct("policy_id", {
+            "policy_id": {"$in": [p["_id"] for p in policies]},
+            "chunk_id": {"$gt": TEMPLATE_CHUNK_ID},
+        }))
+        policies = [p for p in policies if p["_id"] not in done]
+    if not policies:
+        return 0, 0
+
+    templates = list(vectors.find(
+        {"policy_id": {"$in": [p["_id"] for p in policies]}, "chunk_id": TEMPLATE_CHUNK_ID},
+        {"policy_id": 1, "chunk_id": 1, "metadata": 1},
+    ))
+    passage_docs = build_passage_docs(policies, templates, embed_fn)
+
+    policy_ids = list({v["policy_id"] for v in templates})
+    vectors.delete_many({"policy_id": {"$in": policy_ids}, "chunk_id": {"$gt": TEMPLATE_CHUNK_ID}})
+    if passage_docs:
+        vectors.insert_many(passage_docs)
+    return len(policy_ids), len(passage_docs)
@@ -3,6 +3,13 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 from requests.exceptions import Timeout, ConnectionError
 from django.conf import settings
 from utils.db import getMongoDbClient
+from utils.corpus import bump_corpus_version
+from search import facets as search_facets
+from search import lexical as search_lexical
+from search import prefilter as search_prefilter
+from search import snippets as search_snippets
+from search import suggest as search_suggest
+from main import ai_cache
 from datetime import datetime
 from bson import ObjectId
 # from sentence_transformers import SentenceTransformer
@@ -11,6 +18,7 @@ import google.generativeai as genai
 import site_admin.preprocess.codes as codes
 import site_admin.preprocess.sub_categories as sub_categories
 import site_admin.preprocess.submit_document as submit_document
+import site_admin.chunker as chunker
 
 # API 정보
 API_INFO = {
@@ -162,12 +170,15 @@ def transform_api_data_for_db_insert(api_list):
                 # 점(.)을 기준으로 경로 분리 (예: 'dates.apply_period' -> ['dates', 'apply_period'])
                 keys = mongo_path.split('.')
                 set_nested_value(doc, keys, item[api_key])
-        
+
+        # 검색 결과 카드용 요약/금액 문구 미리 계산 (검색 시에는 검색어 하이라이트만 계산)
+        doc["search_snippet"] = search_snippets.build_snippet({**doc, "content_chunk_v3": original_text_list[i]})
+
         data_docs.append(doc)
     
         vector_doc = {
                 "policy_id": doc_id,  # 위와 동일한 ID 사용
-                "chunk_id": 1,
+                "chunk_id": chunker.TEMPLATE_CHUNK_ID,
                 # "content_chunk": original_text_list[i],
                 # "embedding_e5": embedding_e5[i].tolist(),
                 # "embedding_gemini": embedding_gemini[i],
@@ -185,7 +196,9 @@ def transform_api_data_for_db_insert(api_list):
                     "eligibility": {
                         "age_min": doc.get('min_amt', None),
                         "age_max": doc.get('max_amt', None)
-                    }
+                    },
+                    # 검색 필터용 필드 ($vectorSearch.filter로 사전 필터링)
+                    **search_prefilter.build_vector_metadata(doc)
                 },
                 "inserted_at": current_time,
                 "content_chunk_v3": original_text_list[i],
@@ -193,6 +206,16 @@ def transform_api_data_for_db_insert(api_list):
             }
         vector_docs.append(vector_doc)
 
+    # 본문 필드 패시지 청크 (chunk_id 2~). 실패해도 템플릿 청크만으로 저장하고 build_policy_passages로 보충
+    try:
+        passage_docs = chunker.build_passage_docs(
+            data_docs, vector_docs, lambda texts: get_Embedding_gemini(texts, "document"), current_time
+        )
+        vector_docs.extend(passage_docs)
+        print(f"[transform_api_data_for_db_insert] passages: {len(passage_docs)}")
+    except Exception as e:
+        print(f"[transform_api_data_for_db_insert] passage exception {e}")
+
     return data_docs, vector_docs
 
 # 몽고DB에 데이터 저장하는 함수
@@ -208,6 +231,27 @@ def save_data_to_mongodb(data_docs, vector_docs):
 
     print(f"[save_data_to_mongodb] result: {data_result.acknowledged}, {vector_result.acknowledged}")
 
+    # 코퍼스가 바뀌었으므로 버전을 올려 답변/검색 캐시 무효화
+    version = bump_corpus_version()
+
+    # 현재 워커의 키워드 검색 색인에 바로 반영 (다른 워커는 버전 변경 시 변경분 동기화)
+    try:
+        search_lexical.add_documents(data_docs, vector_docs)
+    except Exception as e:
+        print(f"[save_data_to_mongodb] lexical index exception {e}")
+
+    # 검색 필터 옵션(facet) 다시 계산 (실패해도 조회 시 버전 비교로 다시 계산됨)
+    try:
+        search_facets.refresh_facets(version)
+    except Exception as e:
+        print(f"[save_data_to_mongodb] search facets exception {e}")
+
+    # 검색어 자동완성 색인 다시 구축 (다른 워커는 버전 변경 시 백그라운드로 갱신)
+    try:
+        search_suggest.refresh(version)
+    except Exception as e:
+        print(f"[save_data_to_mongodb] search suggest exception {e}")
+
     return data_result.acknowledged
 
 # 데이터 전처리
@@ -279,6 +323,10 @@ def fetch_policy_data(page_num, page_size):
 
         print(f"[fetch_policy_data] success : {insert_result}")
 
+        # 새 정책의 AI 요약 캐시 미리 생성 (사용자가 첫 조회 시 생성 대기하지 않도록)
+        if insert_result:
+            ai_cache.warm_policies_in_background(data_docs)
+
         return insert_result
     except Exception as e:
         print(f"[fetch_policy_data] exception : {e}")
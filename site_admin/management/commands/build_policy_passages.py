@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from site_admin import chunker
+from site_admin.data import get_Embedding_gemini
+from utils.corpus import bump_corpus_version
+
+
+class Command(BaseCommand):
+    help = ("정책 본문(content, support_content, eligibility.text, required_docs_text)을 겹치는 패시지로 나눠 "
+            "임베딩하고 policy_vectors에 chunk_id 2부터 저장합니다. (기존 정책 백필, 본문 수정 반영)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing-only", action="store_true", help="패시지 청크가 없는 정책만 처리")
+        parser.add_argument("--policy-id", action="append", dest="policy_ids", help="특정 정책(policies.policy_id)만 처리")
+
+    def handle(self, *args, **options):
+        policy_match = {}
+        if options["policy_ids"]:
+            policy_match["policy_id"] = {"$in": options["policy_ids"]}
+
+        policies, passages = chunker.store_passages(
+            lambda texts: get_Embedding_gemini(texts, "document"),
+            policy_match,
+            missing_only=options["missing_only"],
+        )
+        if passages:
+            # 벡터 코퍼스가 바뀌었으므로 로컬 벡터 인덱스/검색 캐시 무효화
+            bump_corpus_version()
+        self.stdout.write(self.style.SUCCESS(f"패시지 청크 저장: 정책 {policies}건, 패시지 {passages}개"))
@@ -20,4 +20,5 @@ urlpatterns = [
     path("summary-cache/", views.summary_cache_page, name="summary_cache_page"),
     path("api/summary-cache/list/", views.get_summary_cache_list, name="summary_cache_list"),
     path("api/summary-cache/update/", views.update_summary_cache, name="summary_cache_update"),
+    path("api/summary-cache/regenerate/", views.regenerate_summary_cache, name="summary_cache_regenerate"),
 ]
\ No newline at end of file
@@ -8,6 +8,9 @@ import boto3
 from django.conf import settings
 from bson import ObjectId
 from utils.db import getMongoDbClient
+from utils.corpus import bump_corpus_version
+from site_admin.chunker import TEMPLATE_CHUNK_ID
+from main import ai_cache
 
 def dashboard(request):
     return render(request, "dashboard.html", {})
@@ -90,7 +93,10 @@ def get_keyword_data(request):
         page_size = request.GET.get('size')
         search_text = request.GET.get('search_text')
 
-        find_text = {"metadata.policy_name": {"$regex": search_text, "$options": "i"}} if search_text else {}
+        # 정책당 템플릿 청크 1건만 표시 (본문 패시지 청크는 편집 시 함께 갱신)
+        find_text = {"chunk_id": TEMPLATE_CHUNK_ID}
+        if search_text:
+            find_text["metadata.policy_name"] = {"$regex": search_text, "$options": "i"}
         find_field = {"policy_id": 1, 
                       "metadata.policy_name": 1, 
                       "content_chunk_v2": 1, 
@@ -122,8 +128,13 @@ def set_keyword_data(request):
         db = getMongoDbClient()
         policy_vectors = db["policy_vectors"]
 
-        result = policy_vectors.update_one(
-            {"_id": ObjectId(id)},
+        # 같은 정책의 모든 청크(템플릿 + 본문 패시지) metadata를 함께 갱신
+        chunk = policy_vectors.find_one({"_id": ObjectId(id)}, {"policy_id": 1})
+        if not chunk:
+            return JsonResponse({"status": "error", "message": "해당 벡터 문서가 없습니다."}, status=404)
+
+        result = policy_vectors.update_many(
+            {"policy_id": chunk["policy_id"]},
             {
                 "$set": {
                     "metadata.region": region.split(","),
@@ -136,6 +147,9 @@ def set_keyword_data(request):
         )
 
         print(f"Updated document count: {result.modified_count}")
+        if result.modified_count:
+            # 벡터 metadata가 바뀌었으므로 로컬 벡터 인덱스/검색 캐시 무효화
+            bump_corpus_version()
 
         return JsonResponse({"status": "success", "data": {"modified_count": result.modified_count}}, json_dumps_params={'ensure_ascii': False}, safe=False)
     except Exception as e:
@@ -266,16 +280,32 @@ def summary_cache_page(request):
     return render(request, "summary_cache.html", {})
 
 
+# 관리 화면에서 편집하는 캐시 종류 (정책당 1건). 서류별 질문(form_fields)은 doc_name 하위 키가 있어 제외
+ADMIN_CACHE_KINDS = ("summary", "simulation")
+
+
+def _get_ai_cache_spec(kind):
+    """요청의 kind(summary/simulation)에 해당하는 캐시 설정, 없으면 None"""
+    kind = kind or "summary"
+    if kind not in ADMIN_CACHE_KINDS:
+        return None
+    return ai_cache.CACHE_KINDS[kind]
+
+
 @csrf_exempt
 def get_summary_cache_list(request):
-    """policy_summary_cache 목록 조회 (검색 + 페이지네이션)"""
+    """정책 AI 캐시(요약/시뮬레이션) 목록 조회 (검색 + 페이지네이션)"""
     try:
+        spec = _get_ai_cache_spec(request.GET.get("kind"))
+        if spec is None:
+            return JsonResponse({"status": "error", "message": "알 수 없는 캐시 종류입니다."}, status=400)
+
         page = int(request.GET.get("page", 1))
         page_size = int(request.GET.get("page_size", 20))
         search = request.GET.get("search", "").strip()
 
         db = getMongoDbClient()
-        col = db["policy_summary_cache"]
+        col = db[spec["collection"]]
 
         query = {}
         if search:
@@ -289,11 +319,12 @@ def get_summary_cache_list(request):
             .limit(page_size)
         )
 
-        # datetime → str 변환
+        # datetime → str 변환, 화면에서는 종류와 관계없이 items로 편집
         for item in items:
             for key in ("generated_at", "edited_at"):
                 if item.get(key):
                     item[key] = str(item[key])
+            item["items"] = item.pop(spec["field"], None) or []
 
         return JsonResponse({"status": "success", "total": total, "items": items},
                             json_dumps_params={"ensure_ascii": False})
@@ -303,7 +334,7 @@ def get_summary_cache_list(request):
 
 @csrf_exempt
 def update_summary_cache(request):
-    """관리자가 수정한 items를 policy_summary_cache에 저장"""
+    """관리자가 수정한 items를 정책 AI 캐시(요약/시뮬레이션)에 저장"""
     if request.method != "POST":
         return JsonResponse({"status": "error", "message": "POST only"}, status=405)
     try:
@@ -311,14 +342,17 @@ def update_summary_cache(request):
         body = json.loads(request.body)
         policy_id = body.get("policy_id")
         items = body.get("items")
+        spec = _get_ai_cache_spec(body.get("kind"))
 
+        if spec is None:
+            return JsonResponse({"status": "error", "message": "알 수 없는 캐시 종류입니다."}, status=400)
         if not policy_id or not isinstance(items, list):
             return JsonResponse({"status": "error", "message": "policy_id와 items가 필요합니다."}, status=400)
 
         db = getMongoDbClient()
-        result = db["policy_summary_cache"].update_one(
+        result = db[spec["collection"]].update_one(
             {"policy_id": policy_id},
-            {"$set": {"items": items, "is_edited": True, "edited_at": datetime.now()}},
+            {"$set": {spec["field"]: items, "is_edited": True, "edited_at": datetime.now()}},
             upsert=False,
         )
 
@@ -328,3 +362,29 @@ def update_summary_cache(request):
         return JsonResponse({"status": "success", "modified": result.modified_count})
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+
+@csrf_exempt
+def regenerate_summary_cache(request):
+    """AI로 다시 생성해 캐시를 덮어씀 (수동 수정 내용 포함)"""
+    if request.method != "POST":
+        return JsonResponse({"status": "error", "message": "POST only"}, status=405)
+    try:
+        body = json.loads(request.body)
+        policy_id = body.get("policy_id")
+        kind = body.get("kind") or "summary"
+
+        if _get_ai_cache_spec(kind) is None:
+            return JsonResponse({"status": "error", "message": "알 수 없는 캐시 종류입니다."}, status=400)
+        if not policy_id:
+            return JsonResponse({"status": "error", "message": "policy_id가 필요합니다."}, status=400)
+
+        db = getMongoDbClient()
+        policy = db["policies"].find_one({"policy_id": policy_id})
+        if not policy:
+            return JsonResponse({"status": "error", "message": "정책 정보를 찾을 수 없습니다."}, status=404)
+
+        ai_cache.regenerate(kind, policy)
+        return JsonResponse({"status": "success"})
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
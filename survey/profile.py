@@ -0,0 +1,127 @@
+"""
+사용자 설문 프로필 조회 서비스
+- identity(user_id 또는 anon_id)당 "현재 프로필" 문서 하나 (save_profile이 upsert)
+- identity + 갱신 시각 복합 인덱스로 조회 (과거 중복 문서가 남아 있어도 최신 1건을 인덱스로 바로 찾음)
+- 워커별 TTL LRU 캐시, 프로필 저장 시 무효화
+  (조회 중에 무효화되면 조회 결과를 캐시에 넣지 않도록 identity별 세대 값을 비교)
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from utils.auth import get_anon_id, get_login_user_id
+from utils.db import getMongoDbClient, ensure_index
+
+PROFILE_CACHE_TTL = 30  # 초. 다른 워커에서 수정한 프로필은 최대 이 시간 뒤 반영
+# 프로필 없음(설문 전)은 짧게만 캐싱: 다른 워커에서 설문 저장 직후 추천 요청이 와도 바로 보이도록
+PROFILE_MISS_CACHE_TTL = 1
+PROFILE_CACHE_MAX_ENTRIES = 2048
+PROFILE_SORT = [("updated_at", DESCENDING), ("created_at", DESCENDING)]
+
+_cache = OrderedDict()  # (key_field, value) -> (profile, cached_at)
+_cache_lock = threading.Lock()
+# (key_field, value) -> 마지막 무효화 세대. 전역 증가 값이라 항목이 정리된 뒤에도 같은 값이 다시 나오지 않음
+_generations = OrderedDict()
+_generation_seq = itertools.count(1)
+_stats = {"hits": 0, "misses": 0, "invalidations": 0, "stale_skips": 0}
+
+
+def _get_collection():
+    db = getMongoDbClient()
+    user_profiles = db["user_profiles"]
+    for key_field in ("user_id", "anon_id"):
+        ensure_index(user_profiles, [(key_field, ASCENDING), *PROFILE_SORT])
+    return user_profiles
+
+
+def get_profile_filter(request):
+    """
+    로그인 O  -> user_id(ObjectId) 기준
+    로그인 X  -> anon_id(session) 기준
+    """
+    user_id = get_login_user_id(request)
+    if user_id:
+        try:
+            return {"user_id": ObjectId(str(user_id))}
+        except Exception:
+            # 혹시 ObjectId 문자열이 아닐 경우(거의 없음)
+            return {"user_id": str(user_id)}
+
+    return {"anon_id": get_anon_id(request)}
+
+
+def _cache_key(profile_filter):
+    if "user_id" in profile_filter:
+        return ("user_id", str(profile_filter["user_id"]))
+    return ("anon_id", str(profile_filter.get("anon_id")))
+
+
+def get_current_profile(profile_filter):
+    """
+    identity의 현재 프로필 (없으면 None). 설문 전 사용자는 PROFILE_MISS_CACHE_TTL 동안만 캐싱
+    """
+    key = _cache_key(profile_filter)
+    now = time.monotonic()
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        ttl = PROFILE_CACHE_TTL if cached and cached[0] is not None else PROFILE_MISS_CACHE_TTL
+        if cached and now - cached[1] < ttl:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return cached[0]
+        generation = _generations.get(key)
+
+    profile = _get_collection().find_one(profile_filter, sort=PROFILE_SORT)
+
+    with _cache_lock:
+        _stats["misses"] += 1
+        if _generations.get(key) != generation:
+            # 조회하는 동안 save_profile이 무효화함: 이전 프로필일 수 있으므로 캐시하지 않음
+            _stats["stale_skips"] += 1
+            return profile
+        _cache[key] = (profile, now)
+        _cache.move_to_end(key)
+        while len(_cache) > PROFILE_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+    return profile
+
+
+def get_request_profile(request):
+    return get_current_profile(get_profile_filter(request))
+
+
+def invalidate(profile_filter):
+    key = _cache_key(profile_filter)
+    with _cache_lock:
+        _cache.pop(key, None)
+        _generations[key] = next(_generation_seq)
+        _generations.move_to_end(key)
+        while len(_generations) > PROFILE_CACHE_MAX_ENTRIES:
+            _generations.popitem(last=False)
+        _stats["invalidations"] += 1
+
+
+def save_profile(profile_filter, fields):
+    """
+    identity의 현재 프로필 upsert 후 캐시 무효화
+    """
+    now = datetime.now(timezone.utc)
+    result = _get_collection().update_one(
+        profile_filter,
+        {"$set": {**profile_filter, **fields, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+    )
+    invalidate(profile_filter)
+    return result
+
+
+def get_stats():
+    with _cache_lock:
+        return {**_stats, "cached": len(_cache)}
@@ -2,7 +2,11 @@ import re
 import os
 import google.generativeai as genai  
 
+from utils import local_vectors, retrieval
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 또는 settings.GEMINI_API_KEY
+# atlas: $vectorSearch + $group, local: 워커 메모리 행렬로 정책별 max-sim (utils.local_vectors)
+VECTOR_BACKEND = os.getenv("RECOMMEND_VECTOR_BACKEND", "atlas")
 
 def _strip_emoji(text: str) -> str:
     if not isinstance(text, str):
@@ -72,16 +76,26 @@ def embed_query_gemini(text: str) -> list[float]:
     emb = result["embedding"]
     return emb
 
-def build_prefilter_region_only(profile: dict) -> dict | None:
+def build_region_scope(profile: dict) -> list[str] | None:
     """
-    MongoDB $vectorSearch.filter용 region 조건만 생성
+    추천 대상 지역 목록
     - 사용자가 지역 선택: [region, "전국"] 허용
-    - region이 비었거나 "전국": 필터 없음 (None)
+    - region이 비었거나 "전국": 제한 없음 (None)
     """
     region = (profile.get("region") or "").strip()
 
     if region and region != "전국":
-        return {"metadata.region": {"$in": [region, "전국"]}}
+        return [region, "전국"]
+
+    return None
+
+def build_prefilter_region_only(profile: dict) -> dict | None:
+    """
+    MongoDB $vectorSearch.filter용 region 조건만 생성 (build_region_scope 기준)
+    """
+    regions = build_region_scope(profile)
+    if regions:
+        return {"metadata.region": {"$in": regions}}
 
     return None
 
@@ -90,24 +104,14 @@ def vector_search_policies(
     query_vec: list[float],
     topk: int = 10,
     prefilter: dict | None = None,
-    numCandidates: int = 300,
-    limit_chunks: int = 200,   # 웹에서는 조금 넉넉히 (0개 방지에 도움)
+    params: dict | None = None,   # retrieval.get_params("recommend") 결과 (없으면 기본 목표로 계산)
     snippet_len: int = 200,
 ):
     if len(query_vec) != 3072:
         raise ValueError(f"Gemini embedding dim mismatch: {len(query_vec)} (expected 3072)")
 
-    stage = {
-        "$vectorSearch": {
-            "index": "vector_index_v2",
-            "path": "embedding_gemini_v3",
-            "queryVector": query_vec,
-            "numCandidates": numCandidates,
-            "limit": limit_chunks,
-        }
-    }
-    if prefilter:
-        stage["$vectorSearch"]["filter"] = prefilter
+    params = params or retrieval.get_params("recommend")
+    stage = retrieval.vector_search_stage("recommend", query_vec, params, filter=prefilter)
 
     pipeline = [
         stage,
@@ -123,6 +127,7 @@ def vector_search_policies(
         }},
 
         {"$sort": {"score": -1}},
+        *([{"$match": {"score": {"$gte": params["score_threshold"]}}}] if params["score_threshold"] is not None else []),
 
         {"$group": {
             "_id": "$policy_id",
@@ -157,3 +162,50 @@ def vector_search_policies(
     return list(db.policy_vectors.aggregate(pipeline, allowDiskUse=True))
 
 
+def local_search_policies(
+    db,
+    query_vec: list[float],
+    topk: int = 10,
+    regions: list[str] | None = None,
+    params: dict | None = None,
+    snippet_len: int = 200,
+):
+    """
+    vector_search_policies와 같은 형태의 결과를 워커 메모리 인덱스로 계산
+    정책 점수 = 템플릿 청크와 본문 패시지 청크 중 최고 점수 (전수 계산이라 numCandidates 불필요)
+    """
+    if len(query_vec) != 3072:
+        raise ValueError(f"Gemini embedding dim mismatch: {len(query_vec)} (expected 3072)")
+
+    params = params or retrieval.get_params("recommend")
+    hits = local_vectors.search(
+        retrieval.SITES["recommend"]["path"], query_vec,
+        topk=topk, regions=regions, score_threshold=params["score_threshold"],
+    )
+    if not hits:
+        return []
+
+    # 최종 topk 정책의 최고 점수 청크와 정책 문서만 조회
+    chunks = {
+        (v["policy_id"], v.get("chunk_id")): v
+        for v in db.policy_vectors.find(
+            {"$or": [{"policy_id": policy_id, "chunk_id": chunk_id} for policy_id, _score, chunk_id in hits]},
+            {"policy_id": 1, "chunk_id": 1, "metadata": 1, "content_chunk_v3": 1},
+        )
+    }
+    policies = {p["_id"]: p for p in db.policies.find({"_id": {"$in": [policy_id for policy_id, *_rest in hits]}})}
+
+    results = []
+    for policy_id, score, chunk_id in hits:
+        chunk = chunks.get((policy_id, chunk_id)) or {}
+        item = {
+            "policy_id": policy_id,
+            "score": score,
+            "reason_snippet": (chunk.get("content_chunk_v3") or "")[:snippet_len],
+            "chunk_id": chunk_id,
+            "metadata": chunk.get("metadata"),
+        }
+        if policy_id in policies:
+            item["policy"] = policies[policy_id]
+        results.append(item)
+    return results
@@ -3,7 +3,10 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
-from .recommend import build_query_text, embed_query_gemini, vector_search_policies, build_prefilter_region_only
+from .recommend import (
+    VECTOR_BACKEND, build_query_text, embed_query_gemini, vector_search_policies, local_search_policies,
+    build_prefilter_region_only, build_region_scope,
+)
 
 
 import time, hashlib, random
@@ -15,8 +18,10 @@ from pymongo import MongoClient
 from pathlib import Path
 from bson import ObjectId
 
-from utils.cookie import get_cookie
-from utils.jwt import decode_access_token, TokenError
+from utils import retrieval
+from utils.auth import get_login_user_id
+from . import profile as profile_service
+from .profile import get_profile_filter
 
 # Create your views here.
 
@@ -45,45 +50,13 @@ def get_db():
 # --------------------------------------------------
 # 사용자 식별 (JWT 쿠키 로그인 우선, 아니면 anon_id)
 # --------------------------------------------------
-def get_anon_id(request):
-    """
-    로그인 없을 때 사용자 구분용 ID (세션 기반)
-    """
-    anon_id = request.session.get("anon_id")
-    if not anon_id:
-        anon_id = str(uuid.uuid4())
-        request.session["anon_id"] = anon_id
-    return anon_id
-
 def get_login_user_id_from_cookie(request):
     """
     JWT access 토큰(쿠키)에서 payload['sub'](user_id)를 꺼냄
     - 로그인 상태면 sub가 ObjectId 문자열로 들어있음(현재 jwt.py 기준)
+    - 같은 요청에서 이미 확인한 결과가 있으면 재사용
     """
-    access = get_cookie(request, settings.AUTH_COOKIE["ACCESS_NAME"])
-    if not access:
-        return None
-
-    try:
-        payload = decode_access_token(access)
-        return payload.get("sub")
-    except TokenError:
-        return None
-
-def get_profile_filter(request):
-    """
-    로그인 O  -> user_id(ObjectId) 기준
-    로그인 X  -> anon_id(session) 기준
-    """
-    user_id = get_login_user_id_from_cookie(request)
-    if user_id:
-        try:
-            return {"user_id": ObjectId(str(user_id))}
-        except Exception:
-            # 혹시 ObjectId 문자열이 아닐 경우(거의 없음)
-            return {"user_id": str(user_id)}
-
-    return {"anon_id": get_anon_id(request)}
+    return get_login_user_id(request)
 
 
 def _hash_text(s: str) -> str:
@@ -162,7 +135,6 @@ def save_survey_answers(request):
         profile_filter = get_profile_filter(request)
 
         doc = {
-            **profile_filter,  # ✅ user_id 또는 anon_id가 들어감
             "age": answers.get("1"),
             "purpose": answers.get("2"),  
             "region": answers.get("3"),
@@ -170,7 +142,6 @@ def save_survey_answers(request):
             "education_status": answers.get("5"),
             "job_status": answers.get("6"),
             "income_level": answers.get("7"),
-            "updated_at": datetime.now(timezone.utc),
         }
 
         # ✅ 연결 확인 로그
@@ -178,11 +149,8 @@ def save_survey_answers(request):
         print("✅ Mongo ping:", ping)
         print("✅ user_profiles filter:", profile_filter)
 
-        result = db.user_profiles.update_one(
-            profile_filter,
-            {"$set": doc, "$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
-            upsert=True,
-        )
+        # ✅ user_id 또는 anon_id 기준 현재 프로필 upsert (프로필 캐시도 무효화)
+        result = profile_service.save_profile(profile_filter, doc)
 
         return JsonResponse(
             {
@@ -216,9 +184,7 @@ def recommend_policies(request):
         profile_filter = get_profile_filter(request)
 
         # ✅ 가장 최근 프로필 1개 가져오기 (updated_at 우선, 없으면 created_at)
-        profile = db.user_profiles.find_one(
-            profile_filter, sort=[("updated_at", -1), ("created_at", -1)]
-        )
+        profile = profile_service.get_current_profile(profile_filter)
         if not profile:
             return JsonResponse({"ok": False, "error": "설문 정보가 없어요."}, status=400)
 
@@ -231,8 +197,12 @@ def recommend_policies(request):
         query_vec = embed_query_gemini(query_text)
         t2 = time.perf_counter()
 
-        prefilter = build_prefilter_region_only(profile)
-        hits = vector_search_policies(db, query_vec, topk=topk, prefilter=prefilter)
+        params = retrieval.get_params("recommend")
+        if VECTOR_BACKEND == "local":
+            hits = local_search_policies(db, query_vec, topk=topk, regions=build_region_scope(profile), params=params)
+        else:
+            prefilter = build_prefilter_region_only(profile)
+            hits = vector_search_policies(db, query_vec, topk=topk, prefilter=prefilter, params=params)
         t3 = time.perf_counter()
 
         items = []
@@ -266,6 +236,7 @@ def recommend_policies(request):
                 "updated_at": profile.get("updated_at"),
             },
             "query_text": query_text,
+            "retrieval": {**params, "backend": VECTOR_BACKEND},
             "items": items,
         }, json_dumps_params={"ensure_ascii": False})
 
@@ -1,9 +1,15 @@
 """
 JWT 인증 데코레이터 및 미들웨어.
+- 요청당 한 번만 토큰을 검증하고 결과를 request에 저장 (resolve_identity)
+- access 토큰 재발급 시 새 쿠키는 미들웨어가 응답에 한 번에 세팅
 """
+import uuid
 from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from bson import ObjectId
 from django.conf import settings
+from django.http import JsonResponse
+from django.utils.functional import SimpleLazyObject
 from .jwt import TokenError, TokenExpiredError, decode_access_token, token_refresh, invalidate_refresh_token
 from .json import error_response
 from .db import getMongoDbClient
@@ -48,6 +54,95 @@ def _set_user_from_payload(request, payload):
     request.user_name = payload["name"]
 
 
+def resolve_identity(request):
+    """
+    요청의 로그인 정보를 한 번만 확인하고 결과 재사용
+    반환: {"payload": dict | None, "new_token": dict | None}
+    """
+    identity = getattr(request, "_jwt_identity", None)
+    if identity is not None:
+        return identity
+
+    payload, new_token = _get_valid_payload(request)
+    identity = {"payload": payload, "new_token": new_token}
+    request._jwt_identity = identity
+
+    request.is_authenticated = False
+    request.user_id = None
+    request.email = None
+    if payload:
+        _set_user_from_payload(request, payload)
+
+    return identity
+
+
+def get_login_user_id(request):
+    """
+    로그인 사용자 id (payload['sub']), 비로그인이면 None
+    """
+    payload = resolve_identity(request)["payload"]
+    return payload.get("sub") if payload else None
+
+
+def get_anon_id(request):
+    """
+    로그인 없을 때 사용자 구분용 ID (세션 기반, 필요할 때만 생성)
+    """
+    anon_id = request.session.get("anon_id")
+    if not anon_id:
+        anon_id = str(uuid.uuid4())
+        request.session["anon_id"] = anon_id
+    return anon_id
+
+
+def _build_jwt_user(request):
+    payload = resolve_identity(request)["payload"]
+    if not payload:
+        return {}
+    return {"user_id": payload["sub"], "email": payload["email"], "name": payload["name"]}
+
+
+# 인증 미들웨어
+class JWTAuthenticationMiddleware:
+    """
+    request.jwt_user를 지연 객체로 붙이고 (처음 사용할 때 한 번만 토큰 검증),
+    요청 처리 중 access 토큰이 재발급되었으면 응답에 쿠키 세팅
+    동기/비동기 모두 지원 (ASGI에서 async 뷰 앞에 sync 어댑터가 끼지 않도록)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        self._prepare(request)
+        response = self.get_response(request)
+        return self._finish(request, response)
+
+    async def __acall__(self, request):
+        self._prepare(request)
+        response = await self.get_response(request)
+        return self._finish(request, response)
+
+    def _prepare(self, request):
+        request._jwt_middleware = True
+        request.jwt_user = SimpleLazyObject(lambda: _build_jwt_user(request))
+
+    def _finish(self, request, response):
+        identity = getattr(request, "_jwt_identity", None)
+        if identity and identity["new_token"]:
+            set_login_cookie(response, identity["new_token"])
+
+        return response
+
+
 # 인증 데코레이터
 def login_check(view_func):
     """
@@ -56,28 +151,34 @@ def login_check(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
 
-        request.is_authenticated = False
-        request.user_id = None
-        request.email = None
+        # access 토큰 확인 및 만료시 재발급 처리, request 에다가 사용자 정보 세팅 (요청당 한 번)
+        identity = resolve_identity(request)
 
-        # access 토큰 확인 및 만료시 재발급 처리
-        payload, new_token = _get_valid_payload(request)
-        if not payload:
-            return view_func(request, *args, **kwargs)
-        
-        # request 에다가 사용자 정보 세팅
-        _set_user_from_payload(request, payload)
-
-        # access 토큰 재발급 되었으면 쿠키 세팅
+        # access 토큰 재발급 되었으면 쿠키 세팅 (미들웨어가 있으면 미들웨어에서 세팅)
         response = view_func(request, *args, **kwargs)
-        if new_token:
-            set_login_cookie(response, new_token)
+        if identity["new_token"] and not getattr(request, "_jwt_middleware", False):
+            set_login_cookie(response, identity["new_token"])
 
         return response
 
     return wrapper
 
 
+def staff_required(view_func):
+    """
+    운영 지표 API 보호: Django 관리자(/admin/) 로그인 세션의 스태프 계정만 허용, 그 외 403
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        user = getattr(request, "user", None)
+        if not (user and user.is_active and user.is_staff):
+            return JsonResponse({"status": "error", "message": "관리자 권한이 필요합니다."}, status=403,
+                                json_dumps_params={"ensure_ascii": False})
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
 def require_methods(*methods):
     """
     허용된 HTTP 메서드만 통과시키는 데코레이터.
@@ -0,0 +1,55 @@
+"""
+정책 코퍼스 버전 관리.
+- 정책 데이터 import 시 버전을 올리고, 각 캐시는 이 버전을 키에 포함해 자동 무효화
+"""
+import time
+from datetime import datetime
+from pymongo import ReturnDocument
+from .db import getMongoDbClient
+
+CORPUS_META_COLLECTION = "corpus_meta"
+CORPUS_VERSION_ID = "policy_corpus"
+VERSION_CHECK_INTERVAL = 30  # 초 단위. 매 요청마다 DB 조회하지 않도록 워커별로 짧게 캐싱
+
+_version_cache = {"version": None, "checked_at": 0.0}
+
+
+def get_corpus_version() -> int:
+    """
+    현재 코퍼스 버전 조회 (워커별 VERSION_CHECK_INTERVAL 동안 캐싱)
+    """
+    now = time.monotonic()
+    if _version_cache["version"] is not None and now - _version_cache["checked_at"] < VERSION_CHECK_INTERVAL:
+        return _version_cache["version"]
+
+    try:
+        db = getMongoDbClient()
+        doc = db[CORPUS_META_COLLECTION].find_one({"_id": CORPUS_VERSION_ID}, {"version": 1})
+        version = int(doc.get("version", 0)) if doc else 0
+    except Exception as e:
+        print(f"[get_corpus_version] exception {e}")
+        version = _version_cache["version"] or 0
+
+    _version_cache["version"] = version
+    _version_cache["checked_at"] = now
+    return version
+
+
+def bump_corpus_version() -> int:
+    """
+    정책 데이터가 바뀌었을 때 코퍼스 버전 증가
+    """
+    db = getMongoDbClient()
+    doc = db[CORPUS_META_COLLECTION].find_one_and_update(
+        {"_id": CORPUS_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    version = int(doc.get("version", 0))
+
+    _version_cache["version"] = version
+    _version_cache["checked_at"] = time.monotonic()
+
+    print(f"[bump_corpus_version] version: {version}")
+    return version
@@ -1,3 +1,5 @@
+import time
+
 import pymongo # pip install pymongo
 from django.conf import settings
 
@@ -21,3 +23,31 @@ def getMongoDbClient():
 def getMongoDbClientByName(db_name):
     client = MongoSingleton()
     return client[db_name]
+
+# 인덱스 생성은 워커별로 컬렉션/키 조합당 한 번만 시도
+# 실패하면 요청마다 재시도하지 않도록 실패 시각 기준 백오프 (연속 실패 시 두 배씩, 최대 ENSURE_INDEX_MAX_BACKOFF)
+ENSURE_INDEX_BACKOFF = 30  # 초
+ENSURE_INDEX_MAX_BACKOFF = 600  # 초
+_ensured_indexes = set()
+_failed_indexes = {}  # index_key -> (다음 재시도 시각, 연속 실패 횟수)
+
+def ensure_index(collection, keys, **kwargs):
+    """
+    create_index를 프로세스당 한 번만 호출 (이미 있으면 MongoDB가 무시)
+    실패한 조합은 백오프 시간이 지날 때까지 다시 시도하지 않음
+    """
+    index_key = (collection.full_name, repr(keys), repr(sorted(kwargs.items())))
+    if index_key in _ensured_indexes:
+        return
+    failed = _failed_indexes.get(index_key)
+    if failed and time.monotonic() < failed[0]:
+        return
+    try:
+        collection.create_index(keys, **kwargs)
+        _ensured_indexes.add(index_key)
+        _failed_indexes.pop(index_key, None)
+    except Exception as e:
+        failures = (failed[1] if failed else 0) + 1
+        backoff = min(ENSURE_INDEX_MAX_BACKOFF, ENSURE_INDEX_BACKOFF * 2 ** (failures - 1))
+        _failed_indexes[index_key] = (time.monotonic() + backoff, failures)
+        print(f"[ensure_index] {collection.name} {keys} exception {e} (retry in {backoff}s)")
@@ -1,16 +1,31 @@
 # PyJWT를 이용한 JWT 발급 / 검증 유틸리티
+import threading
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
 
 import jwt
 from django.conf import settings
-from accounts.db import get_user_by_id
-from .db import getMongoDbClient
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from accounts.db import get_user_by_id_cached
+from .db import getMongoDbClient, ensure_index
 
 SECRET = settings.SECRET_KEY
 ALGORITHM = 'HS256'
 ACCESS_EXPIRE  = settings.AUTH_COOKIE["ACCESS_EXPIRE"]
 REFRESH_EXPIRE = settings.AUTH_COOKIE["REFRESH_EXPIRE"]
+REVOKED_REFRESH_INTERVAL = 30  # 초. 다른 워커에서 무효화된 토큰을 로컬 목록에 반영하는 주기
+REVOKED_SYNC_OVERLAP = timedelta(seconds=5)  # 서버 간 시각 차이를 고려해 조금 겹쳐서 조회
+REFRESH_GRACE_SECONDS = 10  # 초. 같은 워커에 같은 refresh 토큰으로 동시에 들어온 재발급 요청에는 이 시간 동안 같은 새 토큰을 돌려줌
+
+# 무효화된 refresh 토큰 jti -> 만료 시각 (워커별 로컬 사본)
+_revoked = {"jtis": {}, "loaded_at": 0.0, "synced_until": None}
+_revoked_lock = threading.Lock()
+
+# 사용된 refresh 토큰 jti -> (유예 만료 monotonic 시각, 새 토큰 쌍) (워커별 메모리에만 보관)
+_grace = {}
+_grace_lock = threading.Lock()
 
 # 토큰 생성
 def _build_payload(user, token_type: str, lifetime: timedelta) -> dict:
@@ -72,17 +87,106 @@ def decode_access_token(token: str) -> dict:
 def decode_refresh_token(token: str) -> dict:
     payload = decode_token(token, expected_type='refresh')
 
-    # 블랙리스트 확인 (로그아웃된 토큰)
-    db = getMongoDbClient()
-    invalidated_token = db['invalidated_token']
-    token_exist_count = invalidated_token.count_documents({"jti":payload.get('jti')})
-
-    if token_exist_count > 0:
+    # 블랙리스트 확인 (로그아웃된 토큰). DB 대신 주기적으로 동기화되는 로컬 목록 사용
+    if is_revoked_jti(payload.get('jti')):
         raise TokenError('이미 무효화된 토큰입니다.')
 
     return payload
 
 # 블랙리스트
+def _get_invalidated_collection():
+    db = getMongoDbClient()
+    invalidated_token = db['invalidated_token']
+    ensure_index(invalidated_token, [("jti", ASCENDING)], unique=True)
+    # 토큰 만료 시각이 지나면 Mongo TTL로 자동 삭제 (만료 토큰은 서명 검증에서 이미 거절됨)
+    ensure_index(invalidated_token, [("expired_at", ASCENDING)], expireAfterSeconds=0)
+    return invalidated_token
+
+
+def _sync_revoked_jtis():
+    """
+    마지막 동기화 이후 무효화된 jti를 로컬 목록에 반영 (REVOKED_REFRESH_INTERVAL 주기)
+    """
+    now = time.monotonic()
+    if now - _revoked["loaded_at"] < REVOKED_REFRESH_INTERVAL:
+        return
+
+    with _revoked_lock:
+        if now - _revoked["loaded_at"] < REVOKED_REFRESH_INTERVAL:
+            return
+
+        sync_started = datetime.now(tz=timezone.utc)
+        query = {"expired_at": {"$gt": sync_started}}
+        if _revoked["synced_until"] is not None:
+            query["invalidated_at"] = {"$gte": _revoked["synced_until"] - REVOKED_SYNC_OVERLAP}
+
+        try:
+            docs = _get_invalidated_collection().find(query, {"_id": 0, "jti": 1, "expired_at": 1})
+            jtis = _revoked["jtis"]
+            for doc in docs:
+                jtis[doc["jti"]] = doc["expired_at"]
+
+            # 만료된 토큰은 목록에서 정리
+            naive_now = sync_started.replace(tzinfo=None)
+            for jti in [jti for jti, expired_at in jtis.items() if expired_at.replace(tzinfo=None) <= naive_now]:
+                jtis.pop(jti, None)
+
+            _revoked["synced_until"] = sync_started
+        except Exception as e:
+            print(f"[jwt] revoked jti sync exception {e}")
+
+        _revoked["loaded_at"] = now
+
+
+def is_revoked_jti(jti) -> bool:
+    _sync_revoked_jtis()
+    return jti in _revoked["jtis"]
+
+
+def _revoke_payload(payload) -> bool:
+    """
+    jti를 블랙리스트에 등록. 이미 등록되어 있으면 False (jti unique 인덱스로 확인과 등록을 한 번에 처리)
+    """
+    expired_at = datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
+
+    try:
+        _get_invalidated_collection().insert_one({
+            "user_id" : payload["sub"],
+            "jti" : payload["jti"],
+            "expired_at" : expired_at,
+            "invalidated_at" : datetime.now(tz=timezone.utc)
+        })
+        revoked = True
+    except DuplicateKeyError:
+        revoked = False
+
+    _revoked["jtis"][payload["jti"]] = expired_at
+    return revoked
+
+
+def _store_grace_token(jti, token) -> None:
+    """
+    사용된 refresh 토큰(jti)으로 발급한 새 토큰 쌍을 REFRESH_GRACE_SECONDS 동안 워커 메모리에 보관
+    토큰은 DB 등 공유 저장소에 남기지 않음
+    """
+    now = time.monotonic()
+    with _grace_lock:
+        for old_jti in [k for k, (deadline, _token) in _grace.items() if deadline <= now]:
+            _grace.pop(old_jti, None)
+        _grace[jti] = (now + REFRESH_GRACE_SECONDS, token)
+
+
+def _get_grace_token(jti):
+    """
+    유예 시간 안에 이 워커에서 같은 jti로 발급한 새 토큰 쌍, 없으면 None
+    """
+    with _grace_lock:
+        cached = _grace.get(jti)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
 def invalidate_refresh_token(token: str) -> None:
     """
     Refresh Token을 블랙리스트에 등록 (로그아웃).
@@ -93,40 +197,56 @@ def invalidate_refresh_token(token: str) -> None:
     except TokenError:
         return  # 이미 무효 → 무시
 
-    expired_at = datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
-
-    db = getMongoDbClient()
-    invalidated_token = db['invalidated_token']
-    invalidated_token.insert_one({
-        "user_id" : payload["sub"],
-        "jti" : payload["jti"],
-        "expired_at" : expired_at
-    })
+    _revoke_payload(payload)
 
 def token_refresh(refresh_token):
     """
     유효한 Refresh Token으로 새 Access Token 발급
+    refresh 토큰은 한 번만 사용 가능. 같은 워커에 동시에 들어온 같은 토큰의 재발급 요청(여러 탭/병렬 요청)에는
+    REFRESH_GRACE_SECONDS 동안 먼저 발급한 토큰 쌍을 그대로 돌려줌
+    다른 워커에서 먼저 사용된 경우는 거절 (해당 요청만 비로그인으로 처리되고, 브라우저는 먼저 끝난 응답의 새 쿠키를 사용)
     """
-    # refresh 토큰 복호화
+    # refresh 토큰 복호화 (무효화 여부는 유예 토큰과 함께 아래에서 확인)
     try:
-        payload = decode_refresh_token(refresh_token)
+        payload = decode_token(refresh_token, expected_type='refresh')
     except TokenError as e:
         print("[token_refresh] decode error")
         return False, None
 
-    # 사용자 조회
+    jti = payload.get('jti')
+    token = _get_grace_token(jti)
+    if token:
+        return True, token
+    if is_revoked_jti(jti):
+        print("[token_refresh] refresh token already used")
+        return False, None
+
+    # 사용자 조회 (짧은 TTL 캐시)
     try:
-        user = get_user_by_id(payload['sub'])
+        user = get_user_by_id_cached(payload['sub'])
     except Exception as e:
         print("[token_refresh] user db error")
         return False, None
 
-    # 새로운 토큰 발급
-    invalidate_refresh_token(refresh_token)
-    new_access_token = generate_access_token(user)
-    new_refresh_token = generate_refresh_token(user)
+    if not user:
+        print("[token_refresh] user not found")
+        return False, None
+
+    # 새로운 토큰을 먼저 만들어 두고 사용 처리 직후 바로 유예 목록에 등록 (동시 요청이 거절되는 구간 최소화)
+    token = {"access" : generate_access_token(user),
+             "refresh" : generate_refresh_token(user)}
+
+    # 기존 refresh 토큰 사용 처리. 다른 요청/워커에서 이미 사용했다면 재발급 거절
+    try:
+        if not _revoke_payload(payload):
+            token = _get_grace_token(jti)
+            if token:
+                return True, token
+            print("[token_refresh] refresh token already used")
+            return False, None
+    except Exception as e:
+        print("[token_refresh] invalidated_token db error")
+        return False, None
 
-    token = {"access" : new_access_token,
-             "refresh" : new_refresh_token}
-    
-    return True, token
\ No newline at end of file
+    _store_grace_token(jti, token)
+    return True, token
@@ -0,0 +1,322 @@
+"""
+외부 LLM 호출 공용 게이트웨이.
+- 제공자(provider)별 동시 호출 수 제한 (세마포어)
+- 동일 프롬프트 동시 요청은 한 번만 호출하고 결과 공유 (single-flight, 프롬프트 해시 키)
+  합류한 요청도 같은 대기 시간 제한을 받고, 합류한 요청의 취소는 다른 요청에 전파되지 않음
+- 대기열이 가득 차거나 대기 시간이 길어지면 즉시 거절 (LLMGatewayBusy)
+- 대기 시간/거절/중복 제거 지표 제공
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from time import perf_counter
+
+PROVIDER_CONCURRENCY = {
+    "openai": int(os.getenv("LLM_OPENAI_CONCURRENCY", "16")),
+    "gemini": int(os.getenv("LLM_GEMINI_CONCURRENCY", "8")),
+}
+QUEUE_FACTOR = int(os.getenv("LLM_QUEUE_FACTOR", "4"))  # 대기 허용 수 = 동시 호출 수 × QUEUE_FACTOR
+ACQUIRE_TIMEOUT = float(os.getenv("LLM_ACQUIRE_TIMEOUT", "5"))  # 초
+
+
+class LLMGatewayBusy(Exception):
+    """동시 호출 한도/대기열 초과로 호출을 거절할 때 발생"""
+    pass
+
+
+class _ProviderLimiter:
+    def __init__(self, name, concurrency):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = concurrency * QUEUE_FACTOR
+        self._sem = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self._async_waiters = []  # (이벤트 루프, asyncio.Future): 슬롯 반환 시 깨움
+        self.stats = {
+            "calls": 0,
+            "rejected": 0,
+            "deduplicated": 0,
+            "errors": 0,
+            "queue_time_total_ms": 0.0,
+            "queue_time_max_ms": 0.0,
+        }
+
+    def _on_acquired(self, waited):
+        waited_ms = waited * 1000
+        with self._lock:
+            self.in_flight += 1
+            self.stats["calls"] += 1
+            self.stats["queue_time_total_ms"] += waited_ms
+            self.stats["queue_time_max_ms"] = max(self.stats["queue_time_max_ms"], waited_ms)
+
+    def _reject(self, reason):
+        with self._lock:
+            self.stats["rejected"] += 1
+        raise LLMGatewayBusy(f"{self.name} 호출이 몰려 요청을 처리할 수 없습니다. ({reason})")
+
+    def try_acquire_now(self):
+        if self._sem.acquire(blocking=False):
+            self._on_acquired(0.0)
+            return True
+        return False
+
+    def acquire(self):
+        if self.try_acquire_now():
+            return
+
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                saturated = True
+            else:
+                saturated = False
+                self.waiting += 1
+        if saturated:
+            self._reject("queue full")
+
+        started = perf_counter()
+        try:
+            acquired = self._sem.acquire(timeout=ACQUIRE_TIMEOUT)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        if not acquired:
+            self._reject("queue timeout")
+        self._on_acquired(perf_counter() - started)
+
+    async def aacquire(self):
+        """
+        비동기 대기: 스레드를 점유하지 않고 슬롯 반환 알림(Future)을 기다렸다가 non-blocking으로 다시 시도
+        세마포어는 await 이후 동기 구간에서만 잡으므로 취소(CancelledError) 시 슬롯이 새지 않음
+        """
+        if self.try_acquire_now():
+            return
+
+        with self._lock:
+            saturated = self.waiting >= self.max_queue
+            if not saturated:
+                self.waiting += 1
+        if saturated:
+            self._reject("queue full")
+
+        loop = asyncio.get_running_loop()
+        started = perf_counter()
+        try:
+            while True:
+                waiter = loop.create_future()
+                with self._lock:
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    # 등록 후 다시 시도해 그 사이의 반환 알림을 놓치지 않음
+                    if self._sem.acquire(blocking=False):
+                        break
+                    remaining = ACQUIRE_TIMEOUT - (perf_counter() - started)
+                    if remaining <= 0:
+                        self._reject("queue timeout")
+                    try:
+                        await asyncio.wait_for(waiter, remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                finally:
+                    with self._lock:
+                        if (loop, waiter) in self._async_waiters:
+                            self._async_waiters.remove((loop, waiter))
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+        self._on_acquired(perf_counter() - started)
+
+    def release(self, failed=False):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.stats["errors"] += 1
+            waiters = self._async_waiters
+            self._async_waiters = []
+        self._sem.release()
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # 이미 닫힌 이벤트 루프
+                pass
+
+    def snapshot(self):
+        with self._lock:
+            calls = self.stats["calls"]
+            return {
+                **self.stats,
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "queue_time_avg_ms": round(self.stats["queue_time_total_ms"] / calls, 2) if calls else 0.0,
+            }
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_limiters = {name: _ProviderLimiter(name, limit) for name, limit in PROVIDER_CONCURRENCY.items()}
+_inflight = {}  # dedup_key -> _Inflight
+_inflight_lock = threading.Lock()
+
+
+def _get_limiter(provider):
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        raise ValueError(f"등록되지 않은 LLM provider입니다: {provider}")
+    return limiter
+
+
+def prompt_key(*parts) -> str:
+    """
+    모델명/프롬프트/옵션으로 single-flight 키 생성
+    """
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Inflight:
+    """
+    single-flight 항목. started: 소유 요청이 슬롯을 잡으면 완료, result: 호출 결과
+    두 Future 모두 등록 시 RUNNING으로 바꿔 대기 중인 요청의 취소가 공유 Future를 취소하지 않도록 함
+    """
+    def __init__(self):
+        self.started = Future()
+        self.result = Future()
+        self.started.set_running_or_notify_cancel()
+        self.result.set_running_or_notify_cancel()
+
+
+def _set_future(future, result=None, error=None):
+    if future.done():
+        return
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        # 다른 경로에서 먼저 완료된 경우
+        pass
+
+
+def _join_inflight(provider, dedup_key):
+    """
+    같은 키로 진행 중인 호출이 있으면 (entry, False), 없으면 새로 등록 후 (entry, True)
+    """
+    with _inflight_lock:
+        entry = _inflight.get(dedup_key)
+        if entry is not None:
+            _limiters[provider].stats["deduplicated"] += 1
+            return entry, False
+        entry = _Inflight()
+        _inflight[dedup_key] = entry
+        return entry, True
+
+
+def _finish_inflight(dedup_key, entry, result=None, error=None):
+    with _inflight_lock:
+        if _inflight.get(dedup_key) is entry:
+            _inflight.pop(dedup_key, None)
+    _set_future(entry.started)
+    _set_future(entry.result, result=result, error=error)
+
+
+def _wait_joined(limiter, entry):
+    """
+    진행 중인 같은 호출의 결과 대기. 소유 요청이 ACQUIRE_TIMEOUT 안에 슬롯을 잡지 못하면 소유 요청과 같이 거절
+    """
+    try:
+        entry.started.result(timeout=ACQUIRE_TIMEOUT)
+    except FutureTimeoutError:
+        limiter._reject("queue timeout")
+    return entry.result.result()
+
+
+async def _await_joined(limiter, entry):
+    # shield: 이 요청이 취소(클라이언트 연결 끊김)되어도 공유 Future와 다른 대기 요청에는 영향 없음
+    try:
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(entry.started)), ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        limiter._reject("queue timeout")
+    return await asyncio.shield(asyncio.wrap_future(entry.result))
+
+
+def call(provider, fn, *args, dedup_key=None, **kwargs):
+    """
+    동기 LLM 호출 (Django 동기 뷰/관리 명령용)
+    """
+    limiter = _get_limiter(provider)
+
+    entry = None
+    if dedup_key:
+        entry, is_owner = _join_inflight(provider, dedup_key)
+        if not is_owner:
+            return _wait_joined(limiter, entry)
+
+    try:
+        limiter.acquire()
+        if entry is not None:
+            _set_future(entry.started)
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+        finally:
+            limiter.release(failed)
+    except BaseException as e:
+        # 취소(CancelledError) 포함, 대기 중인 요청들이 멈추지 않도록 반드시 결과 전달
+        if entry is not None:
+            _finish_inflight(dedup_key, entry, error=e)
+        raise
+
+    if entry is not None:
+        _finish_inflight(dedup_key, entry, result=result)
+    return result
+
+
+async def acall(provider, coro_fn, *args, dedup_key=None, **kwargs):
+    """
+    비동기 LLM 호출 (async 뷰/LangGraph 노드용). 슬롯 대기 중에도 이벤트 루프를 막지 않음
+    """
+    limiter = _get_limiter(provider)
+
+    entry = None
+    if dedup_key:
+        entry, is_owner = _join_inflight(provider, dedup_key)
+        if not is_owner:
+            return await _await_joined(limiter, entry)
+
+    try:
+        await limiter.aacquire()
+        if entry is not None:
+            _set_future(entry.started)
+        failed = True
+        try:
+            result = await coro_fn(*args, **kwargs)
+            failed = False
+        finally:
+            limiter.release(failed)
+    except BaseException as e:
+        # 취소(CancelledError) 포함, 대기 중인 요청들이 멈추지 않도록 반드시 결과 전달
+        if entry is not None:
+            _finish_inflight(dedup_key, entry, error=e)
+        raise
+
+    if entry is not None:
+        _finish_inflight(dedup_key, entry, result=result)
+    return result
+
+
+def get_stats():
+    return {name: limiter.snapshot() for name, limiter in _limiters.items()}
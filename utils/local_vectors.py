@@ -0,0 +1,140 @@
+"""
+워커 메모리 벡터 검색 (정책 단위 max-sim)
+- policy_vectors의 한 임베딩 필드를 정책 순으로 정렬해 정규화한 float32 행렬 하나로 적재 (코퍼스 버전별 1회)
+- 질의 1건 = 행렬-벡터 곱 1번 + np.maximum.reduceat(청크 점수, 정책별 시작 오프셋)로 정책별 최고 점수
+  -> 정책당 청크(패시지)가 늘어도 추가 비용은 곱셈 행 수만큼
+- 점수는 Atlas cosine vectorSearchScore와 같은 (1 + cos) / 2 척도 (점수 임계값을 그대로 사용)
+- 메모리: 청크당 차원 * 4바이트 (3072차원이면 약 12KB). 사용 여부는 호출 측 설정으로 선택
+"""
+import threading
+
+import numpy as np
+
+from .corpus import get_corpus_version
+from .db import getMongoDbClient
+
+VECTOR_COLLECTION = "policy_vectors"
+LOAD_BATCH_SIZE = 1000
+
+
+class PolicyVectorIndex:
+    def __init__(self, policy_ids, offsets, matrix, chunk_ids, regions):
+        """
+        policy_ids: 정책 _id 목록 (오프셋 순서)
+        offsets: 정책별 첫 청크 행 번호 (np.int64, 오름차순)
+        matrix: (청크 수, 차원) 정규화한 float32 행렬
+        chunk_ids: 행별 policy_vectors chunk_id
+        regions: 정책별 metadata.region 집합 (지역 사전 필터용)
+        """
+        self.policy_ids = policy_ids
+        self.offsets = offsets
+        self.matrix = matrix
+        self.chunk_ids = chunk_ids
+        self.regions = regions
+        self.position = {policy_id: idx for idx, policy_id in enumerate(policy_ids)}
+
+    def __len__(self):
+        return len(self.policy_ids)
+
+    def search(self, query_vector, topk=10, regions=None, score_threshold=None):
+        """
+        정책별 최고 청크 점수 상위 topk -> [(policy_id, score, chunk_id)]
+        regions가 있으면 metadata.region이 겹치는 정책만 ($vectorSearch.filter $in과 같은 의미)
+        """
+        if not self.policy_ids:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        chunk_scores = self.matrix @ (query / norm)
+        policy_scores = (1.0 + np.maximum.reduceat(chunk_scores, self.offsets)) / 2.0
+
+        if regions:
+            allowed = set(regions)
+            mask = np.fromiter((bool(r & allowed) for r in self.regions), dtype=bool, count=len(self.regions))
+            policy_scores = np.where(mask, policy_scores, -np.inf)
+        if score_threshold is not None:
+            policy_scores = np.where(policy_scores >= score_threshold, policy_scores, -np.inf)
+
+        k = min(topk, int(np.isfinite(policy_scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-policy_scores, k - 1)[:k]
+        top = top[np.argsort(-policy_scores[top], kind="stable")]
+
+        ends = np.append(self.offsets[1:], len(self.chunk_ids))
+        results = []
+        for idx in top:
+            start = self.offsets[idx]
+            best_row = start + int(np.argmax(chunk_scores[start:ends[idx]]))
+            results.append((self.policy_ids[idx], float(policy_scores[idx]), self.chunk_ids[best_row]))
+        return results
+
+
+def build_index(path, db=None):
+    """
+    policy_vectors에서 path 임베딩이 있는 청크를 정책별로 묶어 인덱스 생성
+    """
+    db = db or getMongoDbClient()
+    cursor = (
+        db[VECTOR_COLLECTION]
+        .find({path: {"$exists": True}}, {"policy_id": 1, "chunk_id": 1, "metadata.region": 1, path: 1})
+        .sort([("policy_id", 1), ("chunk_id", 1)])
+        .batch_size(LOAD_BATCH_SIZE)
+    )
+
+    policy_ids, offsets, regions, chunk_ids, rows = [], [], [], [], []
+    for doc in cursor:
+        vector = doc.get(path)
+        if not vector:
+            continue
+        if not policy_ids or policy_ids[-1] != doc["policy_id"]:
+            policy_ids.append(doc["policy_id"])
+            offsets.append(len(rows))
+            regions.append(set((doc.get("metadata") or {}).get("region") or []))
+        chunk_ids.append(doc.get("chunk_id"))
+        rows.append(vector)
+
+    if not rows:
+        return PolicyVectorIndex([], np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32), [], [])
+
+    matrix = np.asarray(rows, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+    return PolicyVectorIndex(policy_ids, np.asarray(offsets, dtype=np.int64), matrix, chunk_ids, regions)
+
+
+_indexes = {}  # path -> (corpus version, PolicyVectorIndex)
+_lock = threading.Lock()
+
+
+def get_index(path):
+    """
+    코퍼스 버전이 바뀌었을 때만 다시 적재 (적재 중 동시 요청은 한 번만 적재하도록 잠금)
+    """
+    version = get_corpus_version()
+    cached = _indexes.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with _lock:
+        cached = _indexes.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        index = build_index(path)
+        _indexes[path] = (version, index)
+        print(f"[local_vectors] loaded path:{path}, version:{version}, policies:{len(index)}, chunks:{len(index.chunk_ids)}")
+        return index
+
+
+def search(path, query_vector, topk=10, regions=None, score_threshold=None):
+    return get_index(path).search(query_vector, topk=topk, regions=regions, score_threshold=score_threshold)
+
+
+def get_stats():
+    return {
+        path: {"version": version, "policies": len(index), "chunks": len(index.chunk_ids)}
+        for path, (version, index) in _indexes.items()
+    }
@@ -0,0 +1,267 @@
+"""
+벡터 검색 파라미터 설정
+- 호출 지점(site)별로 지연 시간/재현율 목표만 선언하고 numCandidates, limit, 점수 임계값은 여기서 계산
+- numCandidates: 재현율 목표에 맞는 limit 배수 -> 지연 시간 예산, 코퍼스(site 임베딩 필드가 있는 청크 수), Atlas 상한으로 제한
+- 점수 임계값: train_dataset 라벨로 오프라인 보정한 값(retrieval_calibration)을 우선 사용, 없으면 기본값
+- 응답에 실제 사용한 파라미터를 함께 기록할 수 있도록 get_params()가 dict로 반환
+"""
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from .corpus import get_corpus_version
+from .db import getMongoDbClient
+
+VECTOR_INDEX = "vector_index_v2"
+VECTOR_COLLECTION = "policy_vectors"
+CALIBRATION_COLLECTION = "retrieval_calibration"
+CALIBRATION_CACHE_TTL = 300  # 초. 다른 프로세스(보정 명령)에서 저장한 값은 최대 이 시간 뒤 반영
+CALIBRATION_LIMIT = 200  # 보정 시 질의당 확인할 상위 청크 수
+CALIBRATION_MIN_COVERAGE = 0.8  # 상위 CALIBRATION_LIMIT 안에서 점수를 얻은 정답 비율이 이보다 낮으면 저장하지 않음
+
+NUM_CANDIDATES_MAX = 10000  # Atlas numCandidates 상한
+# 지연 시간 모델: 고정 비용 + 후보 1,000개당 비용 (운영 클러스터 측정값으로 조정)
+VECTOR_BASE_MS = float(os.getenv("RETRIEVAL_VECTOR_BASE_MS", "30"))
+VECTOR_MS_PER_1K_CANDIDATES = float(os.getenv("RETRIEVAL_VECTOR_MS_PER_1K", "25"))
+# 재현율 목표 -> numCandidates / limit 배수 (HNSW 근사 검색 기준, Atlas 권장 10~20배)
+RECALL_CANDIDATE_FACTORS = [(0.8, 2.5), (0.9, 5), (0.95, 10), (0.99, 20)]
+
+# 호출 지점별 목표
+# - latency_ms: 벡터 검색 단계 지연 시간 예산
+# - recall: 정답 정책이 후보/임계값을 통과해야 하는 비율 목표
+# - limit: 기본 반환 청크 수 (호출 측에서 페이지 크기 등으로 지정 가능)
+# - default_threshold: 보정 전 점수 임계값 (None이면 보정 결과와 무관하게 임계값 없이 순위만 사용)
+# - 본문 패시지 청크(site_admin.chunker)는 embedding_gemini_v3에만 있어 recommend에서만 검색됨
+SITES = {
+    "search": {
+        "path": "embedding_gemini_v2",
+        "latency_ms": 300,
+        "recall": 0.95,
+        "limit": 60,
+        "default_threshold": 0.855,
+    },
+    "recommend": {
+        "path": "embedding_gemini_v3",
+        "latency_ms": 400,
+        "recall": 0.9,
+        "limit": 200,
+        "default_threshold": None,
+    },
+    "chat": {
+        "path": "embedding_gemini_v2",
+        "latency_ms": 150,
+        "recall": 0.8,
+        "limit": 20,
+        "default_threshold": None,
+    },
+}
+
+_corpus = {"version": None, "chunks": {}}  # chunks: 임베딩 필드(path) -> 청크 수
+_calibration = {"loaded_at": 0.0, "docs": {}}
+_lock = threading.Lock()
+
+
+def _candidate_factor(recall):
+    for level, factor in RECALL_CANDIDATE_FACTORS:
+        if recall <= level:
+            return factor
+    return RECALL_CANDIDATE_FACTORS[-1][1]
+
+
+def _latency_max_candidates(latency_ms):
+    budget = max(latency_ms - VECTOR_BASE_MS, 0)
+    return int(budget / VECTOR_MS_PER_1K_CANDIDATES * 1000)
+
+
+def get_corpus_chunks(path):
+    """
+    임베딩 필드(path)가 있는 벡터 청크 수 (코퍼스 버전별, 필드별로 한 번만 조회)
+    본문 패시지 청크처럼 일부 임베딩에만 있는 청크가 있어 컬렉션 전체 문서 수와 다를 수 있음
+    """
+    version = get_corpus_version()
+    with _lock:
+        if _corpus["version"] == version and path in _corpus["chunks"]:
+            return _corpus["chunks"][path]
+        stale = _corpus["chunks"].get(path)
+    try:
+        chunks = getMongoDbClient()[VECTOR_COLLECTION].count_documents({path: {"$exists": True}})
+    except Exception as e:
+        print(f"[retrieval] corpus size exception {e}")
+        return stale
+    with _lock:
+        if _corpus["version"] != version:
+            _corpus["version"] = version
+            _corpus["chunks"] = {}
+        _corpus["chunks"][path] = chunks
+    return chunks
+
+
+def get_calibration(site):
+    """
+    site의 보정 결과 문서 (없으면 None). 워커별 CALIBRATION_CACHE_TTL 동안 캐싱
+    """
+    now = time.monotonic()
+    with _lock:
+        if now - _calibration["loaded_at"] < CALIBRATION_CACHE_TTL:
+            return _calibration["docs"].get(site)
+    try:
+        docs = {doc["_id"]: doc for doc in getMongoDbClient()[CALIBRATION_COLLECTION].find({})}
+    except Exception as e:
+        print(f"[retrieval] calibration load exception {e}")
+        docs = _calibration["docs"]
+    with _lock:
+        _calibration["docs"] = docs
+        _calibration["loaded_at"] = now
+    return docs.get(site)
+
+
+def get_params(site, limit=None):
+    """
+    site 목표와 코퍼스 크기, 보정 결과로 계산한 벡터 검색 파라미터
+    반환 dict는 응답/로그에 그대로 기록
+    """
+    spec = SITES[site]
+    limit = int(limit or spec["limit"])
+    chunks = get_corpus_chunks(spec["path"])
+
+    num_candidates = math.ceil(limit * _candidate_factor(spec["recall"]))
+    num_candidates = min(num_candidates, _latency_max_candidates(spec["latency_ms"]), NUM_CANDIDATES_MAX)
+    if chunks:
+        # 코퍼스보다 많이 요청해도 의미가 없음 (이 경우 사실상 전수 검색)
+        num_candidates = min(num_candidates, chunks)
+        limit = min(limit, chunks)
+    num_candidates = max(num_candidates, limit)
+
+    calibration = get_calibration(site)
+    if calibration and calibration.get("score_threshold") is not None and spec["default_threshold"] is not None:
+        score_threshold = calibration["score_threshold"]
+        threshold_source = "calibrated"
+    else:
+        score_threshold = spec["default_threshold"]
+        threshold_source = "default"
+
+    return {
+        "site": site,
+        "limit": limit,
+        "num_candidates": num_candidates,
+        "score_threshold": score_threshold,
+        "threshold_source": threshold_source,
+        "corpus_chunks": chunks,
+        "targets": {"latency_ms": spec["latency_ms"], "recall": spec["recall"]},
+    }
+
+
+def vector_search_stage(site, query_vector, params, filter=None):
+    """
+    get_params() 결과로 $vectorSearch 단계 구성
+    """
+    stage = {
+        "index": VECTOR_INDEX,
+        "path": SITES[site]["path"],
+        "queryVector": query_vector,
+        "numCandidates": params["num_candidates"],
+        "limit": params["limit"],
+    }
+    if filter:
+        stage["filter"] = filter
+    return {"$vectorSearch": stage}
+
+
+def _best_scores(db, site, query_vector, num_candidates, limit):
+    """
+    정책별 최고 점수 {policy_id 문자열: score} (점수 내림차순 순위 포함)
+    """
+    pipeline = [
+        vector_search_stage(site, query_vector, {"num_candidates": num_candidates, "limit": limit}),
+        {"$project": {"_id": 0, "policy_id": 1, "score": {"$meta": "vectorSearchScore"}}},
+    ]
+    best = {}
+    for hit in db[VECTOR_COLLECTION].aggregate(pipeline):
+        best.setdefault(str(hit.get("policy_id")), hit.get("score") or 0.0)
+    return best
+
+
+def calibrate(site, embed_fn, max_queries=None, db=None):
+    """
+    train_dataset 라벨(label[].policy_id, is_negative)로 site 파라미터 보정
+    - 점수 임계값: 정답 정책 최고 점수의 (1 - recall 목표) 분위수 -> 정답의 recall 목표 비율이 임계값을 통과
+    - 후보 재현율: 현재 numCandidates/limit로 찾은 정답 비율 (전수에 가까운 검색 대비)
+    - 전수에 가까운 검색 상위에도 없는 정답은 분위수에서 빼고 coverage/candidate_recall로만 보고
+    결과는 retrieval_calibration에 저장 (점수를 얻은 정답이 CALIBRATION_MIN_COVERAGE 미만이면 저장하지 않음)
+    """
+    db = db or getMongoDbClient()
+    spec = SITES[site]
+    params = get_params(site)
+    chunks = params["corpus_chunks"] or CALIBRATION_LIMIT
+    exhaustive_candidates = min(chunks, NUM_CANDIDATES_MAX)
+    exhaustive_limit = min(chunks, CALIBRATION_LIMIT)
+
+    positive_scores, negative_scores = [], []
+    found, total_positive, queries = 0, 0, 0
+    missing = 0
+    cursor = db["train_dataset"].find({}, {"query": 1, "label": 1})
+    if max_queries:
+        cursor = cursor.limit(max_queries)
+
+    for sample in cursor:
+        labels = sample.get("label") or []
+        positives = {str(l.get("policy_id")) for l in labels if not l.get("is_negative")}
+        negatives = {str(l.get("policy_id")) for l in labels if l.get("is_negative")} - positives
+        if not sample.get("query") or not positives:
+            continue
+
+        query_vector = embed_fn(sample["query"])
+        best = _best_scores(db, site, query_vector, exhaustive_candidates, exhaustive_limit)
+        configured = _best_scores(db, site, query_vector, params["num_candidates"], params["limit"])
+
+        queries += 1
+        total_positive += len(positives)
+        found += sum(1 for policy_id in positives if policy_id in configured)
+        # 전수 검색 상위 안에도 없는 정답은 실제 점수를 모르므로 분위수에서 제외
+        positive_scores.extend(best[policy_id] for policy_id in positives if policy_id in best)
+        missing += sum(1 for policy_id in positives if policy_id not in best)
+        negative_scores.extend(best[policy_id] for policy_id in negatives if policy_id in best)
+
+    coverage = len(positive_scores) / total_positive if total_positive else 0.0
+    if not positive_scores or coverage < CALIBRATION_MIN_COVERAGE:
+        print(f"[retrieval] calibration skipped site:{site}, positives:{total_positive}, scored:{len(positive_scores)}")
+        return None
+
+    positive_scores.sort()
+    threshold = positive_scores[min(len(positive_scores) - 1, int(len(positive_scores) * (1 - spec["recall"])))]
+    passed_negatives = sum(1 for score in negative_scores if score >= threshold)
+    passed = sum(1 for score in positive_scores if score >= threshold)
+
+    doc = {
+        "_id": site,
+        "score_threshold": round(threshold, 4),
+        # 점수를 얻은 정답 기준 통과율, 전체 정답 기준은 threshold_recall * coverage
+        "threshold_recall": round(passed / len(positive_scores), 4),
+        "coverage": round(coverage, 4),
+        "missing_positives": missing,
+        "negative_pass_rate": round(passed_negatives / len(negative_scores), 4) if negative_scores else None,
+        "candidate_recall": round(found / total_positive, 4) if total_positive else None,
+        "num_candidates": params["num_candidates"],
+        "limit": params["limit"],
+        "queries": queries,
+        "positives": total_positive,
+        "negatives": len(negative_scores),
+        "corpus_chunks": params["corpus_chunks"],
+        "corpus_version": get_corpus_version(),
+        "calibrated_at": datetime.now(),
+    }
+    db[CALIBRATION_COLLECTION].replace_one({"_id": site}, doc, upsert=True)
+    with _lock:
+        _calibration["docs"][site] = doc
+    return doc
+
+
+def get_stats():
+    with _lock:
+        calibration = {
+            site: {"score_threshold": doc.get("score_threshold"), "calibrated_at": doc.get("calibrated_at")}
+            for site, doc in _calibration["docs"].items()
+        }
+        return {"corpus_chunks": dict(_corpus["chunks"]), "calibration": calibration}